@@ -0,0 +1,158 @@
+# analytics.py
+"""
+Question-bank analytics for the dashboard.
+
+Counts live in small per-day summary tables (migration 9):
+
+  stats_skill_daily     (day, skill)            -> JDs asking for the skill
+  stats_jd_daily        (day, domain, seniority) -> JDs
+  stats_question_daily  (day, skill, qtype)      -> questions
+
+Triggers on jds, skills and questions keep them current as save_jd,
+save_questions and delete_jd run, in the same transaction as the write.
+The day is the JD's / question's created_at date and skills are keyed by
+their canonical skill_dict name (so "Python" and "python3" count as one),
+so dashboard reads scan days x keys rows however many JDs are stored.
+
+rebuild() recomputes everything from the base tables; check() compares the
+stored counts with a fresh aggregation without changing anything:
+
+    python analytics.py --db jd_prep.db --check
+    python analytics.py --db jd_prep.db --rebuild
+"""
+from datetime import datetime, timedelta
+
+import db_skeleton as db
+
+# table -> (key columns, count column); fresh aggregations are db.ANALYTICS_SELECT
+TABLES = {
+    "stats_skill_daily": (("day", "skill"), "jds"),
+    "stats_jd_daily": (("day", "domain", "seniority"), "jds"),
+    "stats_question_daily": (("day", "skill", "qtype"), "questions"),
+}
+
+
+def _since(days):
+    return (datetime.utcnow() - timedelta(days=days)).date().isoformat()
+
+
+def rebuild(conn) -> dict:
+    """Recompute every summary table from the base tables; returns row counts."""
+    with conn:
+        for sql in db.ANALYTICS_REBUILD:
+            conn.execute(sql)
+    return {t: conn.execute(f"SELECT count(*) FROM {t}").fetchone()[0] for t in TABLES}
+
+
+def check(conn) -> dict:
+    """
+    Differences between stored and freshly aggregated counts, per table:
+    {table: [(key, stored, expected), ...]}. Empty lists mean consistent.
+    """
+    out = {}
+    for table, (keys, count_col) in TABLES.items():
+        stored = {tuple(r[:-1]): r[-1] for r in conn.execute(f"SELECT {', '.join(keys)}, {count_col} FROM {table}")}
+        expected = {tuple(r[:-1]): r[-1] for r in conn.execute(db.ANALYTICS_SELECT[table])}
+        out[table] = [
+            (k, stored.get(k, 0), expected.get(k, 0))
+            for k in sorted(set(stored) | set(expected))
+            if stored.get(k, 0) != expected.get(k, 0)
+        ]
+    return out
+
+
+def totals(conn, days: int = 30) -> dict:
+    """JDs, questions and distinct skills created in the window."""
+    since = _since(days)
+    (jds,) = conn.execute("SELECT coalesce(sum(jds), 0) FROM stats_jd_daily WHERE day >= ?", (since,)).fetchone()
+    (questions,) = conn.execute(
+        "SELECT coalesce(sum(questions), 0) FROM stats_question_daily WHERE day >= ?", (since,)
+    ).fetchone()
+    (skills,) = conn.execute("SELECT count(DISTINCT skill) FROM stats_skill_daily WHERE day >= ?", (since,)).fetchone()
+    return {"jds": jds, "questions": questions, "skills": skills}
+
+
+def skill_frequency(conn, days: int = 30, limit: int = 20) -> list:
+    """Most requested skills in the window: [{skill, jds}]."""
+    cur = conn.execute(
+        """SELECT skill, sum(jds) AS n FROM stats_skill_daily WHERE day >= ?
+           GROUP BY skill ORDER BY n DESC, skill LIMIT ?""",
+        (_since(days), limit),
+    )
+    return [{"skill": s, "jds": n} for s, n in cur.fetchall()]
+
+
+def _distribution(conn, column, days):
+    cur = conn.execute(
+        f"""SELECT {column}, sum(jds) AS n FROM stats_jd_daily WHERE day >= ?
+            GROUP BY {column} ORDER BY n DESC, {column}""",
+        (_since(days),),
+    )
+    return [{column: v or "unknown", "jds": n} for v, n in cur.fetchall()]
+
+
+def domain_distribution(conn, days: int = 30) -> list:
+    return _distribution(conn, "domain", days)
+
+
+def seniority_distribution(conn, days: int = 30) -> list:
+    return _distribution(conn, "seniority", days)
+
+
+def questions_per_skill(conn, days: int = 30, limit: int = 20) -> list:
+    """Questions generated per skill in the window, split by type: [{skill, technical, behavioral, total}]."""
+    cur = conn.execute(
+        """SELECT skill,
+                  sum(CASE WHEN qtype = 'technical' THEN questions ELSE 0 END),
+                  sum(CASE WHEN qtype = 'behavioral' THEN questions ELSE 0 END),
+                  sum(questions) AS n
+           FROM stats_question_daily WHERE day >= ?
+           GROUP BY skill ORDER BY n DESC, skill LIMIT ?""",
+        (_since(days), limit),
+    )
+    cols = ["skill", "technical", "behavioral", "total"]
+    return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+def skill_trends(conn, days: int = 30, top: int = 5) -> dict:
+    """Daily JD counts for the window's top skills: {day: {skill: jds}}."""
+    skills = [r["skill"] for r in skill_frequency(conn, days=days, limit=top)]
+    if not skills:
+        return {}
+    marks = ",".join("?" * len(skills))
+    cur = conn.execute(
+        f"""SELECT day, skill, jds FROM stats_skill_daily
+            WHERE day >= ? AND skill IN ({marks}) ORDER BY day""",
+        (_since(days), *skills),
+    )
+    table = {}
+    for day, skill, n in cur.fetchall():
+        table.setdefault(day, {s: 0 for s in skills})[skill] = n
+    return table
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild or check the analytics summary tables.")
+    parser.add_argument("--db", default=db.DB_PATH, help="SQLite database path")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the tables from jds/skills/questions")
+    parser.add_argument("--check", action="store_true", help="report rows that differ from a fresh aggregation")
+    args = parser.parse_args(argv)
+    conn = db.init_db(args.db)
+    if args.rebuild:
+        counts = rebuild(conn)
+        print("Rebuilt " + ", ".join(f"{t}: {n} rows" for t, n in counts.items()))
+    if args.check or not args.rebuild:
+        diffs = check(conn)
+        bad = sum(len(d) for d in diffs.values())
+        for table, rows in diffs.items():
+            for key, stored, expected in rows[:20]:
+                print(f"{table} {key}: stored {stored}, expected {expected}")
+        print("Consistent" if not bad else f"{bad} rows differ; run with --rebuild")
+        return 1 if bad else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
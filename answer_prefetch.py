@@ -0,0 +1,131 @@
+# answer_prefetch.py
+"""
+Background precomputation of sample answers.
+
+After a JD is saved, prefetch(pool, jd_id) queues every question without a
+stored answer. A small process-wide worker pool (MAX_WORKERS) generates them
+at low priority: before each call a worker steps aside while interactive
+requests are queued in llm_core.TRAFFIC. Jobs can be cancelled per JD.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import db_skeleton as db
+import llm_core
+import prompts
+from db_pool import read_conn, write_conn
+
+MAX_WORKERS = 2
+YIELD_SLEEP = 0.5      # seconds to wait while interactive calls are queued
+MAX_YIELD = 30.0
+
+
+class _Job:
+    def __init__(self, jd_id, total):
+        self.jd_id = jd_id
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.running = 0
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def count(self, field, delta=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    @property
+    def finished(self):
+        if self.running:
+            return False
+        return self.cancelled.is_set() or self.done + self.failed >= self.total
+
+
+class AnswerPrefetcher:
+    def __init__(self, max_workers=MAX_WORKERS, generate=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="answer-prefetch")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._generate = generate
+
+    def _answer(self, prompt):
+        if self._generate is not None:
+            return self._generate(prompt)
+        import jd_logic  # imported lazily: jd_logic is the caller-facing module
+        return jd_logic.generate_answer(prompt)
+
+    def prefetch(self, pool, jd_id) -> int:
+        """Queue answers for a JD's unanswered questions. Returns how many were queued."""
+        with read_conn(pool) as conn:
+            targets = db.get_unanswered_questions(conn, jd_id)
+        job = _Job(jd_id, len(targets))
+        with self._lock:
+            old = self._jobs.get(jd_id)
+            if old is not None and not old.finished:
+                return 0  # already running
+            self._jobs[jd_id] = job
+        for t in targets:
+            self._executor.submit(self._run_one, pool, job, t["question_id"], t["prompt"])
+        return len(targets)
+
+    def _run_one(self, pool, job, question_id, prompt):
+        job.count("running")
+        try:
+            if job.cancelled.is_set():
+                return
+            self._answer_one(pool, job, question_id, prompt)
+        finally:
+            job.count("running", -1)
+
+    def _answer_one(self, pool, job, question_id, prompt):
+        # low priority: let queued interactive requests go first
+        waited = 0.0
+        while llm_core.TRAFFIC.stats()["queue_depth"] > 0 and waited < MAX_YIELD:
+            if job.cancelled.is_set():
+                return
+            time.sleep(YIELD_SLEEP)
+            waited += YIELD_SLEEP
+        try:
+            with read_conn(pool) as conn:
+                if db.get_answers(conn, [question_id]):
+                    job.count("done")  # answered meanwhile (e.g. by a user click)
+                    return
+            answer = self._answer(prompt)
+            if not answer or not answer.strip():
+                job.count("failed")
+                return
+            with write_conn(pool) as conn:
+                db.save_answer(conn, question_id, answer, llm_core.model_for_route("answer"),
+                               prompts.ANSWER_PROMPT_VERSION, source="prefetch")
+            job.count("done")
+        except Exception as e:
+            print("ANSWER PREFETCH ERROR:", e)
+            job.count("failed")
+
+    def cancel(self, jd_id):
+        with self._lock:
+            job = self._jobs.get(jd_id)
+        if job is not None:
+            job.cancelled.set()
+
+    def status(self, jd_id):
+        """{"total", "done", "failed", "cancelled", "finished"} or None."""
+        with self._lock:
+            job = self._jobs.get(jd_id)
+        if job is None:
+            return None
+        return {"total": job.total, "done": job.done, "failed": job.failed,
+                "cancelled": job.cancelled.is_set(), "finished": job.finished}
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+def get_prefetcher() -> AnswerPrefetcher:
+    """Process-wide prefetcher shared by all sessions."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = AnswerPrefetcher()
+        return _prefetcher
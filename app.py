@@ -1,6 +1,7 @@
 # app.py
 import streamlit as st
-import db_skeleton as db
+import db_pool
+import jobs
 from ui_components import render_sidebar
 from ui_views import view_upload_jd, view_practice, view_dashboard
 
@@ -17,18 +18,20 @@ def main():
 
     # Init
     render_sidebar()
-    if "conn" not in st.session_state:
-        st.session_state.conn = db.init_db()
+    # One pool per process, shared by every session
+    pool = db_pool.get_pool()
+    # Background JD workers, started once per process
+    jobs.ensure_worker(pool)
 
     # Routing
     tab = st.sidebar.radio("Navigation", ["Upload JD", "Practice", "Dashboard"])
     
     if tab == "Upload JD":
-        view_upload_jd(st.session_state.conn)
+        view_upload_jd(pool)
     elif tab == "Practice":
-        view_practice(st.session_state.conn)
+        view_practice(pool)
     else:
-        view_dashboard(st.session_state.conn)
+        view_dashboard(pool)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,104 @@
+# benchmarks/bench_db.py
+"""
+Storage microbenchmark: per-row inserts on an unindexed schema (the old
+db_skeleton behaviour) vs. the current executemany + indexes + WAL layer.
+
+    python benchmarks/bench_db.py --jds 10000 --questions 40
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db_skeleton as db
+
+
+def _legacy_save(conn, jd_id_title, jd_text, skills, questions):
+    """Row-at-a-time inserts as done before the executemany rewrite."""
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT INTO jds (title, jd_text, domain, seniority, summary, created_at) VALUES (?, ?, '', '', '', '')",
+        (jd_id_title, jd_text),
+    )
+    jd_id = cur.lastrowid
+    for s in skills:
+        cur.execute("INSERT INTO skills (jd_id, skill) VALUES (?, ?)", (jd_id, s))
+    conn.commit()
+    for q in questions:
+        cur.execute(
+            "INSERT INTO questions (jd_id, skill, qtype, prompt, created_at) VALUES (?, ?, ?, ?, '')",
+            (jd_id, q["skill"], q["qtype"], q["prompt"]),
+        )
+    conn.commit()
+    return jd_id
+
+
+def run(mode, n_jds, n_questions, n_reads, seed=0):
+    rnd = random.Random(seed)
+    path = os.path.join(tempfile.mkdtemp(), f"bench_{mode}.db")
+    conn = db.init_db(path)
+    if mode == "legacy":
+        conn.execute("DROP INDEX IF EXISTS idx_skills_jd_id")
+        conn.execute("DROP INDEX IF EXISTS idx_questions_jd_id")
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("PRAGMA synchronous = FULL")
+
+    skills = [f"skill{i}" for i in range(6)]
+    questions = [{"skill": skills[i % 6], "qtype": "technical", "prompt": f"Question {i} " + "x" * 80}
+                 for i in range(n_questions)]
+    jd_text = "lorem ipsum " * 200
+
+    t0 = time.perf_counter()
+    for i in range(n_jds):
+        if mode == "legacy":
+            _legacy_save(conn, f"JD {i}", jd_text, skills, questions)
+        else:
+            jd_id = db.save_jd(conn, f"JD {i}", jd_text, skills)
+            db.save_questions(conn, jd_id, questions)
+    write_s = time.perf_counter() - t0
+
+    ids = [rnd.randint(1, n_jds) for _ in range(n_reads)]
+    t0 = time.perf_counter()
+    for jd_id in ids:
+        db.get_skills_for_jd(conn, jd_id)
+        db.get_questions_for_jd(conn, jd_id)
+    read_s = time.perf_counter() - t0
+
+    search_ms = None
+    if mode == "current":
+        terms = ["Question 17", "JD 1234", "lorem ipsum", "Question 3"]
+        t0 = time.perf_counter()
+        for term in terms * 5:
+            db.search(conn, term)
+        search_ms = (time.perf_counter() - t0) / (len(terms) * 5) * 1000
+
+    t0 = time.perf_counter()
+    for jd_id in ids[:50]:
+        db.delete_jd(conn, jd_id)
+    delete_s = time.perf_counter() - t0
+
+    conn.close()
+    return {"mode": mode, "write_s": write_s, "read_ms_per_jd": read_s / n_reads * 1000,
+            "delete_ms_per_jd": delete_s / min(50, n_reads) * 1000, "search_ms": search_ms}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jds", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    print(f"{args.jds} JDs x {args.questions} questions = {args.jds * args.questions} question rows")
+    print(f"{'mode':<8} {'write (s)':>10} {'read ms/JD':>11} {'delete ms/JD':>13} {'search ms':>10}")
+    for mode in ("legacy", "current"):
+        r = run(mode, args.jds, args.questions, args.reads)
+        search = f"{r['search_ms']:.2f}" if r["search_ms"] is not None else "-"
+        print(f"{r['mode']:<8} {r['write_s']:>10.2f} {r['read_ms_per_jd']:>11.3f} {r['delete_ms_per_jd']:>13.3f} {search:>10}")
+
+
+if __name__ == "__main__":
+    main()
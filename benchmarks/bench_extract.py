@@ -0,0 +1,72 @@
+# benchmarks/bench_extract.py
+"""
+Document extraction benchmark over a corpus of sample JD files.
+
+    python benchmarks/bench_extract.py ./sample_jds
+
+For every PDF/DOCX/TXT file, reports sequential (inline) vs. page-parallel
+extraction time and the cost of a cached re-extraction (a Streamlit rerun).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import doc_extract
+
+
+def _timed(name, data):
+    doc_extract.clear_cache()
+    t0 = time.perf_counter()
+    text = doc_extract.extract_text(name, data).text
+    return time.perf_counter() - t0, len(text)
+
+
+def bench_file(path):
+    name = os.path.basename(path)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    parallel_min = doc_extract.PARALLEL_MIN_PAGES
+    doc_extract.PARALLEL_MIN_PAGES = 10 ** 9
+    seq_s, chars = _timed(name, data)
+    doc_extract.PARALLEL_MIN_PAGES = parallel_min
+    par_s, _ = _timed(name, data)
+
+    t0 = time.perf_counter()
+    doc_extract.extract_text(name, data)
+    cached_s = time.perf_counter() - t0
+    return {"file": name, "kb": len(data) / 1024, "chars": chars,
+            "sequential_ms": seq_s * 1000, "parallel_ms": par_s * 1000, "cached_ms": cached_s * 1000}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JD text extraction.")
+    parser.add_argument("corpus", help="Directory of sample PDF/DOCX/TXT files")
+    args = parser.parse_args(argv)
+
+    files = sorted(
+        os.path.join(args.corpus, f) for f in os.listdir(args.corpus)
+        if doc_extract.file_extension(f) in doc_extract.SUPPORTED_EXTENSIONS
+    )
+    if not files:
+        print("No supported files found.")
+        return 1
+
+    # warm up the process pool so its start-up cost is not charged to the first file
+    doc_extract._get_pool().submit(len, b"").result()
+
+    print(f"{'file':<32} {'KB':>8} {'chars':>8} {'seq ms':>9} {'par ms':>9} {'cached ms':>10}")
+    rows = [bench_file(p) for p in files]
+    for r in rows:
+        print(f"{r['file'][:32]:<32} {r['kb']:>8.1f} {r['chars']:>8} {r['sequential_ms']:>9.1f} "
+              f"{r['parallel_ms']:>9.1f} {r['cached_ms']:>10.3f}")
+    seq = sum(r["sequential_ms"] for r in rows)
+    par = sum(r["parallel_ms"] for r in rows)
+    print(f"\nTotal sequential {seq:.0f} ms, parallel {par:.0f} ms ({seq / par if par else 0:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
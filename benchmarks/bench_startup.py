@@ -0,0 +1,106 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start and first-request latency.
+
+Each measurement runs in a fresh interpreter so module caches do not hide
+import cost:
+
+  import.<module>_ms  time to import an app module (ui_views needs streamlit)
+  sdk.<module>_ms     time to import a heavy dependency on its own
+  first_request       import jd_logic -> configure_llm -> first generate_answer
+                      (fake backend, so only client setup and SDK import count)
+  reconfigure_ms      a repeat configure_llm() call, as on every button click
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_MODULES = ["doc_extract", "llm_core", "jd_logic", "ui_views"]
+SDK_MODULES = ["google.genai", "PyPDF2", "docx"]
+
+_IMPORT_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0)
+"""
+
+_FIRST_REQUEST_SNIPPET = """
+import os, time, json
+os.environ.setdefault("GEMINI_API_KEY", "bench-key")
+os.environ["LLM_CACHE_DISABLED"] = "1"
+t0 = time.perf_counter()
+import jd_logic, llm_core, fake_gemini
+t1 = time.perf_counter()
+llm_core.configure_llm()
+t2 = time.perf_counter()
+llm_core.configure_llm()
+t3 = time.perf_counter()
+if llm_core.LLM_CLIENT is not None:
+    llm_core.LLM_CLIENT.models = fake_gemini.FakeClient().models
+else:
+    llm_core.LLM_CLIENT = fake_gemini.FakeClient()
+jd_logic.generate_answer("Explain eventual consistency.")
+t4 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "configure_ms": (t2 - t1) * 1000,
+                  "reconfigure_ms": (t3 - t2) * 1000, "first_call_ms": (t4 - t3) * 1000,
+                  "total_ms": (t4 - t0) * 1000}))
+"""
+
+
+def _run(snippet):
+    # run from a scratch directory: the jd_prep.db / llm_cache.db files the
+    # snippet opens (migrations, telemetry) must not touch the checkout's
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run([sys.executable, "-c", snippet], cwd=cwd, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        return None
+    return out.stdout.strip().splitlines()[-1]
+
+
+def import_time_ms(module, repeat):
+    samples = []
+    for _ in range(repeat):
+        line = _run(_IMPORT_SNIPPET.format(module=module))
+        if line is None:
+            return None  # not installed here
+        samples.append(float(line) * 1000)
+    return statistics.median(samples)
+
+
+def first_request(repeat):
+    runs = []
+    for _ in range(repeat):
+        line = _run(_FIRST_REQUEST_SNIPPET)
+        if line is None:
+            return None
+        runs.append(json.loads(line))
+    return {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+
+
+def run(repeat=5):
+    return {
+        "import": {f"{m}_ms": import_time_ms(m, repeat) for m in APP_MODULES},
+        "sdk": {f"{m}_ms": import_time_ms(m, repeat) for m in SDK_MODULES},
+        "first_request": first_request(repeat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and first-request latency.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# benchmarks/run_benchmarks.py
+"""
+Scenario benchmarks against the local fake Gemini backend.
+
+    python benchmarks/run_benchmarks.py --out results.json
+    python benchmarks/run_benchmarks.py --out new.json --compare results.json
+
+Scenarios:
+  parse     _parse_json_from_text on large, wrapped, truncated and malformed output
+  pipeline  skills -> questions -> save (run_jd_pipeline) with simulated latency,
+            two-call vs single-call extraction
+  answers   generate_answer with a repeat-heavy question mix (cache off vs on)
+  db        db_skeleton writes/reads/search at scale (see bench_db.py)
+  hedging   generate_answer on a long-tailed backend, hedging off vs on (llm_router)
+  startup   import time and first-request latency in fresh interpreters (see bench_startup.py)
+
+Results are written as JSON so runs can be compared between releases; with
+--compare, any timing metric more than --tolerance slower exits non-zero.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import db_skeleton as db
+import llm_core
+import jd_logic
+import telemetry
+import fake_gemini
+from llm_cache import LLMCache
+from llm_router import ModelRouter, Route, ROUTES
+import bench_db
+import bench_startup
+
+
+def _stats_ms(samples):
+    ordered = sorted(samples)
+    def pct(p):
+        return ordered[max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))] * 1000
+    return {"mean_ms": statistics.fmean(ordered) * 1000, "p50_ms": pct(50), "p95_ms": pct(95), "n": len(ordered)}
+
+
+def bench_parse(iterations):
+    questions = json.loads(fake_gemini.canned_questions("Generate 200 interview questions"))
+    clean = json.dumps(questions, indent=2)
+    cases = {
+        "clean_large": clean,
+        "wrapped_large": "Sure! Here are your questions:\n```json\n" + clean + "\n```\nGood luck!",
+        "truncated_large": clean[: int(len(clean) * 0.8)],
+        "malformed": "I'm sorry, I can't help with that. {not: json} [also, not]",
+    }
+    out = {}
+    for name, text in cases.items():
+        samples = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            try:
+                llm_core._parse_json_from_text(text)
+            except ValueError:
+                pass
+            samples.append(time.perf_counter() - t0)
+        out[name] = _stats_ms(samples)
+    return out
+
+
+def bench_pipeline(n_jds, median_latency, workers):
+    client = fake_gemini.FakeClient(latency=fake_gemini.LogNormalLatency(median=median_latency, sigma=0.4))
+    llm_core.LLM_CLIENT = client
+    conn = db.init_db(":memory:")
+    jd_text = "Senior Data Engineer. Python, SQL, Airflow, Docker, Kubernetes, AWS.\n" * 30
+    out = {}
+    for mode, key in (("two_call", "per_jd"), ("single", "per_jd_single")):
+        calls_before = client.calls
+        samples = []
+        for i in range(n_jds):
+            t0 = time.perf_counter()
+            jd_logic.run_jd_pipeline(conn, f"Data Engineer {i}", jd_text, max_workers=workers, reuse_bank=False,
+                                     mode=mode)
+            samples.append(time.perf_counter() - t0)
+        out[key] = _stats_ms(samples)
+        out["llm_calls" if mode == "two_call" else "llm_calls_single"] = client.calls - calls_before
+    return out
+
+
+def bench_answers(n_requests, distinct, median_latency):
+    rnd = random.Random(1)
+    prompts = [f"Explain trade-off number {i} in distributed caching." for i in range(distinct)]
+    mix = [rnd.choice(prompts) for _ in range(n_requests)]
+    out = {}
+    for label, cache_on in (("cache_off", False), ("cache_on", True)):
+        client = fake_gemini.FakeClient(latency=fake_gemini.LogNormalLatency(median=median_latency, sigma=0.4))
+        llm_core.LLM_CLIENT = client
+        llm_core.LLM_CACHE_ENABLED = cache_on
+        llm_core.LLM_CACHE = LLMCache(os.path.join(tempfile.mkdtemp(), "cache.db"))
+        samples = []
+        for q in mix:
+            t0 = time.perf_counter()
+            jd_logic.generate_answer(q)
+            samples.append(time.perf_counter() - t0)
+        out[label] = {**_stats_ms(samples), "llm_calls": client.calls}
+    return out
+
+
+def bench_hedging(n_requests, median_latency):
+    out = {}
+    llm_core.LLM_CACHE_ENABLED = False
+    for label, hedge in (("hedge_off", False), ("hedge_on", True)):
+        client = fake_gemini.FakeClient(latency=fake_gemini.LogNormalLatency(median=median_latency, sigma=1.0))
+        llm_core.LLM_CLIENT = client
+        routes = {name: Route(r.name, r.tier, r.temperature, r.max_output_tokens, hedge=hedge)
+                  for name, r in ROUTES.items()}
+        llm_core.ROUTER = ModelRouter(routes=routes)
+        samples = []
+        for i in range(n_requests):
+            t0 = time.perf_counter()
+            jd_logic.generate_answer(f"Explain trade-off number {i}.")
+            samples.append(time.perf_counter() - t0)
+        stats = llm_core.ROUTER.stats().get("answer", {})
+        out[label] = {**_stats_ms(samples), "p99_ms": sorted(samples)[int(0.99 * (len(samples) - 1))] * 1000,
+                      "llm_calls": client.calls, "hedged": stats.get("hedged", 0),
+                      "hedge_wins": stats.get("hedge_wins", 0)}
+    return out
+
+
+def run_all(args):
+    # keep benchmark telemetry out of jd_prep.db
+    tmp_db = os.path.join(tempfile.mkdtemp(), "bench_metrics.db")
+    db.init_db(tmp_db)
+    telemetry.get_writer(tmp_db)
+    llm_core.LLM_CACHE_ENABLED = False
+
+    results = {}
+    selected = args.scenarios.split(",")
+    if "parse" in selected:
+        results["parse"] = bench_parse(args.parse_iterations)
+    if "pipeline" in selected:
+        results["pipeline"] = bench_pipeline(args.jds, args.latency, args.workers)
+    if "answers" in selected:
+        results["answers"] = bench_answers(args.answers, args.distinct_answers, args.latency)
+    if "hedging" in selected:
+        results["hedging"] = bench_hedging(args.hedge_requests, args.latency)
+    if "db" in selected:
+        results["db"] = bench_db.run("current", args.db_jds, 40, 200)
+    if "startup" in selected:
+        results["startup"] = bench_startup.run(args.startup_repeat)
+    return results
+
+
+def _flatten(d, prefix=""):
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            out.update(_flatten(v, key))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = v
+    return out
+
+
+def compare(new, old, tolerance):
+    """Timing metrics (…_ms / …_s) that regressed by more than tolerance."""
+    new_flat, old_flat = _flatten(new["scenarios"]), _flatten(old["scenarios"])
+    regressions = []
+    for key, value in sorted(new_flat.items()):
+        if not (key.endswith("_ms") or key.endswith("_s")) or key not in old_flat or not old_flat[key]:
+            continue
+        ratio = value / old_flat[key]
+        if ratio > 1 + tolerance:
+            regressions.append((key, old_flat[key], value, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run scenario benchmarks against a fake Gemini backend.")
+    parser.add_argument("--scenarios", default="parse,pipeline,answers,hedging,db,startup")
+    parser.add_argument("--out", default="bench_results.json", help="Where to write JSON results")
+    parser.add_argument("--compare", help="Previous results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown ratio (0.2 = 20%%)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Median fake LLM latency in seconds")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--jds", type=int, default=5)
+    parser.add_argument("--answers", type=int, default=100)
+    parser.add_argument("--distinct-answers", type=int, default=20)
+    parser.add_argument("--parse-iterations", type=int, default=200)
+    parser.add_argument("--db-jds", type=int, default=1000)
+    parser.add_argument("--hedge-requests", type=int, default=200)
+    parser.add_argument("--startup-repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "scenarios": run_all(args),
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["scenarios"], indent=2))
+    print(f"\nWrote {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        regressions = compare(report, old, args.tolerance)
+        for key, before, after, ratio in regressions:
+            print(f"REGRESSION {key}: {before:.2f} -> {after:.2f} ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print("No regressions beyond tolerance.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
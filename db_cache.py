@@ -0,0 +1,108 @@
+# db_cache.py
+"""
+Cached reads over db_skeleton getters for the Streamlit views.
+
+Every rerun used to hit SQLite for the JD list, the selected JD and a page
+of questions. Results are now kept in a small in-process LRU keyed by the
+getter, its arguments and a generation number per table. save_jd,
+save_questions, delete_jd and save_answer bump the generations of the
+tables they touch (db_skeleton.WRITE_LISTENERS), so the next read after a
+write misses and reloads. Writes made by another process (a separate
+`python jobs.py` worker) are not seen by the listener; TTL bounds how long
+such an entry can be served.
+
+Callers get copies, so mutating a returned row never changes the cache.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+import db_skeleton as db
+from db_pool import read_conn
+
+TTL = 30.0          # seconds
+MAX_ENTRIES = 512
+
+# tables each cached getter reads
+DEPENDS = {
+    "list_jds": ("jds",),
+    "list_jd_titles": ("jds",),
+    "get_jd": ("jds",),
+    "get_skills_for_jd": ("jds",),
+    "count_questions_for_jd": ("questions",),
+    "get_questions_for_jd": ("questions",),
+    "get_answers": ("answers",),
+    "search": ("jds", "questions"),
+}
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_generation = {t: 0 for deps in DEPENDS.values() for t in deps}
+STATS = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def invalidate(*tables):
+    """Drop cached reads of the given tables (all tables when none are given)."""
+    with _lock:
+        for t in tables or list(_generation):
+            if t in _generation:
+                _generation[t] += 1
+        STATS["invalidations"] += 1
+
+db.WRITE_LISTENERS.append(invalidate)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def cached_read(target, name, *args, **kwargs):
+    """db_skeleton.<name>(conn, *args, **kwargs) through the cache; target is a pool or connection."""
+    deps = DEPENDS[name]
+    with _lock:
+        gens = tuple(_generation[t] for t in deps)
+        key = (getattr(target, "path", id(target)), name, args, tuple(sorted(kwargs.items())), gens)
+        hit = _entries.get(key)
+        if hit is not None and time.monotonic() - hit[0] < TTL:
+            _entries.move_to_end(key)
+            STATS["hits"] += 1
+            return copy.deepcopy(hit[1])
+        STATS["misses"] += 1
+
+    with read_conn(target) as conn:
+        value = getattr(db, name)(conn, *args, **kwargs)
+
+    with _lock:
+        _entries[key] = (time.monotonic(), value)
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return copy.deepcopy(value)
+
+
+# --- Cached getters (same signatures as db_skeleton, with a pool instead of a connection) ---
+def list_jds(target, limit=50, before_id=None, title_filter=""):
+    return cached_read(target, "list_jds", limit=limit, before_id=before_id, title_filter=title_filter)
+
+def list_jd_titles(target):
+    return cached_read(target, "list_jd_titles")
+
+def get_jd(target, jd_id):
+    return cached_read(target, "get_jd", jd_id)
+
+def get_skills_for_jd(target, jd_id):
+    return cached_read(target, "get_skills_for_jd", jd_id)
+
+def count_questions_for_jd(target, jd_id):
+    return cached_read(target, "count_questions_for_jd", jd_id)
+
+def get_questions_for_jd(target, jd_id, limit=None, offset=0):
+    return cached_read(target, "get_questions_for_jd", jd_id, limit=limit, offset=offset)
+
+def get_answers(target, question_ids):
+    return cached_read(target, "get_answers", tuple(question_ids))
+
+def search(target, query, limit=20):
+    return cached_read(target, "search", query, limit=limit)
@@ -0,0 +1,191 @@
+# db_pool.py
+"""
+Process-wide SQLite connection manager.
+
+One pool per database file is shared by every Streamlit session in the
+process. Reads check out one of a bounded set of read-only connections;
+writes go through a single writer connection guarded by a lock, so writers
+queue in Python instead of spinning on "database is locked".
+The plain db_skeleton functions run unchanged on whatever connection is
+checked out:
+
+    pool = get_pool()
+    with pool.reader() as conn:
+        jds = db.get_jds(conn)
+    with pool.writer() as conn:
+        db.save_questions(conn, jd_id, questions)
+"""
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import db_skeleton as db
+
+DEFAULT_MAX_READERS = 8
+DEFAULT_BUSY_TIMEOUT = 5.0  # seconds
+_WAIT_SAMPLES = 1000
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class _WaitStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=_WAIT_SAMPLES)
+
+    def add(self, secs):
+        self.count += 1
+        self.total += secs
+        self.max = max(self.max, secs)
+        self.samples.append(secs)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)] if ordered else 0.0
+        return {
+            "checkouts": self.count,
+            "avg_wait_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p95_wait_ms": p95 * 1000,
+            "max_wait_ms": self.max * 1000,
+        }
+
+
+class ConnectionPool:
+    def __init__(self, path=db.DB_PATH, max_readers=DEFAULT_MAX_READERS,
+                 busy_timeout=DEFAULT_BUSY_TIMEOUT, checkout_timeout=None):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.checkout_timeout = checkout_timeout if checkout_timeout is not None else busy_timeout
+        # An in-memory DB is private to its connection, so everything uses the writer
+        self.max_readers = 0 if path == ":memory:" else max_readers
+
+        self._writer = db.init_db(path)
+        self._writer.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+        self._write_lock = threading.RLock()
+
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._open_lock = threading.Lock()
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._read_waits = _WaitStats()
+        self._write_waits = _WaitStats()
+
+    def _open_reader(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _acquire_reader(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._open_lock:
+            if self._opened < self.max_readers:
+                self._opened += 1
+                return self._open_reader()
+        try:
+            return self._idle.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"No read connection available after {self.checkout_timeout}s")
+
+    @contextmanager
+    def reader(self):
+        """Check out a read-only connection (re-entrant within a thread)."""
+        if self.max_readers == 0:
+            with self.writer() as conn:
+                yield conn
+            return
+
+        held = getattr(self._local, "reader", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        t0 = time.perf_counter()
+        conn = self._acquire_reader()
+        with self._stats_lock:
+            self._read_waits.add(time.perf_counter() - t0)
+        self._local.reader, self._local.depth = conn, 0
+        try:
+            yield conn
+        finally:
+            self._local.reader = None
+            self._idle.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Exclusive access to the single writer connection."""
+        t0 = time.perf_counter()
+        if not self._write_lock.acquire(timeout=self.checkout_timeout):
+            raise PoolTimeout(f"Writer busy for more than {self.checkout_timeout}s")
+        with self._stats_lock:
+            self._write_waits.add(time.perf_counter() - t0)
+        try:
+            yield self._writer
+        finally:
+            self._write_lock.release()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "readers_open": self._opened,
+                "readers_idle": self._idle.qsize(),
+                "max_readers": self.max_readers,
+                "read": self._read_waits.summary(),
+                "write": self._write_waits.summary(),
+            }
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._write_lock:
+            self._writer.close()
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_pool(path=db.DB_PATH, **kwargs) -> ConnectionPool:
+    """Return the process-wide pool for path, creating it on first use."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(path)
+        if pool is None:
+            pool = _POOLS[path] = ConnectionPool(path, **kwargs)
+        return pool
+
+
+@contextmanager
+def read_conn(target):
+    """Yield a connection for reads from either a pool or a plain connection."""
+    if isinstance(target, ConnectionPool):
+        with target.reader() as conn:
+            yield conn
+    else:
+        yield target
+
+
+@contextmanager
+def write_conn(target):
+    """Yield a connection for writes from either a pool or a plain connection."""
+    if isinstance(target, ConnectionPool):
+        with target.writer() as conn:
+            yield conn
+    else:
+        yield target
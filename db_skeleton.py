@@ -8,6 +8,8 @@ LLM stubs left as NotImplemented for Task 2+.
 # --- Imports ---
 import sqlite3
 import json
+import dedup
+import skill_dict
 from typing import Any, List, Dict
 from typing import List, Dict, Any
 from datetime import datetime
@@ -16,12 +18,404 @@ from datetime import datetime
 DB_PATH = "jd_prep.db"
 DEFAULT_MODEL = "gemini-2.5-flash"  # your selected Gemini model for later tasks
 
+# Canonical skill name of a skills / questions row (alias t): its skill_dict
+# entry, or the lower-cased text for rows without a skill_id
+def _skill_key(t: str) -> str:
+    return f"coalesce((SELECT name FROM skill_dict WHERE id = {t}.skill_id), lower(trim(coalesce({t}.skill, ''))))"
+
+# Analytics aggregates recomputed from the base tables, keyed by summary table
+# (migration 11 backfill, analytics.rebuild and analytics.check)
+ANALYTICS_SELECT = {
+    "stats_skill_daily": f"""SELECT substr(j.created_at, 1, 10), {_skill_key('s')}, count(DISTINCT s.jd_id)
+       FROM skills s JOIN jds j ON j.id = s.jd_id GROUP BY 1, 2""",
+    "stats_jd_daily": """SELECT substr(created_at, 1, 10), lower(trim(coalesce(domain, ''))), lower(trim(coalesce(seniority, ''))), count(*)
+       FROM jds GROUP BY 1, 2, 3""",
+    "stats_question_daily": f"""SELECT substr(created_at, 1, 10), {_skill_key('questions')}, lower(trim(coalesce(qtype, ''))), count(*)
+       FROM questions GROUP BY 1, 2, 3""",
+}
+ANALYTICS_REBUILD = [f"DELETE FROM {t}" for t in ANALYTICS_SELECT] + [
+    f"INSERT INTO {t} {sql}" for t, sql in ANALYTICS_SELECT.items()
+]
+
+# Migration 9 backfill (text skill keys, before skill_dict existed)
+_ANALYTICS_REBUILD_V9 = [
+    "DELETE FROM stats_skill_daily",
+    "DELETE FROM stats_jd_daily",
+    "DELETE FROM stats_question_daily",
+    """INSERT INTO stats_skill_daily (day, skill, jds)
+       SELECT substr(j.created_at, 1, 10), lower(trim(s.skill)), count(*)
+       FROM skills s JOIN jds j ON j.id = s.jd_id GROUP BY 1, 2""",
+    """INSERT INTO stats_jd_daily (day, domain, seniority, jds)
+       SELECT substr(created_at, 1, 10), lower(trim(coalesce(domain, ''))), lower(trim(coalesce(seniority, ''))), count(*)
+       FROM jds GROUP BY 1, 2, 3""",
+    """INSERT INTO stats_question_daily (day, skill, qtype, questions)
+       SELECT substr(created_at, 1, 10), lower(trim(coalesce(skill, ''))), lower(trim(coalesce(qtype, ''))), count(*)
+       FROM questions GROUP BY 1, 2, 3""",
+]
+
+# Schema migrations, applied in order on top of the base tables in init_db.
+# PRAGMA user_version records the last applied version, so existing
+# jd_prep.db files are upgraded in place. Append new entries; never edit old ones.
+MIGRATIONS = [
+    (1, [
+        # covering index: get_skills_for_jd is answered from the index alone
+        "CREATE INDEX IF NOT EXISTS idx_skills_jd_id ON skills(jd_id, id, skill)",
+        # get_questions_for_jd + ON DELETE CASCADE lookups from delete_jd
+        "CREATE INDEX IF NOT EXISTS idx_questions_jd_id ON questions(jd_id)",
+    ]),
+    (2, [
+        # FTS5 indexes over JD text and question prompts (external content,
+        # so the text is not stored twice), kept in sync by triggers
+        """CREATE VIRTUAL TABLE IF NOT EXISTS jds_fts USING fts5(
+            title, jd_text, summary, content='jds', content_rowid='id', tokenize='porter unicode61')""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+            prompt, content='questions', content_rowid='id', tokenize='porter unicode61')""",
+        """CREATE TRIGGER IF NOT EXISTS jds_fts_ai AFTER INSERT ON jds BEGIN
+            INSERT INTO jds_fts(rowid, title, jd_text, summary) VALUES (new.id, new.title, new.jd_text, new.summary);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS jds_fts_ad AFTER DELETE ON jds BEGIN
+            INSERT INTO jds_fts(jds_fts, rowid, title, jd_text, summary) VALUES ('delete', old.id, old.title, old.jd_text, old.summary);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS jds_fts_au AFTER UPDATE ON jds BEGIN
+            INSERT INTO jds_fts(jds_fts, rowid, title, jd_text, summary) VALUES ('delete', old.id, old.title, old.jd_text, old.summary);
+            INSERT INTO jds_fts(rowid, title, jd_text, summary) VALUES (new.id, new.title, new.jd_text, new.summary);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS questions_fts_ai AFTER INSERT ON questions BEGIN
+            INSERT INTO questions_fts(rowid, prompt) VALUES (new.id, new.prompt);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS questions_fts_ad AFTER DELETE ON questions BEGIN
+            INSERT INTO questions_fts(questions_fts, rowid, prompt) VALUES ('delete', old.id, old.prompt);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS questions_fts_au AFTER UPDATE ON questions BEGIN
+            INSERT INTO questions_fts(questions_fts, rowid, prompt) VALUES ('delete', old.id, old.prompt);
+            INSERT INTO questions_fts(rowid, prompt) VALUES (new.id, new.prompt);
+        END""",
+        # index rows that existed before this migration
+        "INSERT INTO jds_fts(jds_fts) VALUES ('rebuild')",
+        "INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')",
+    ]),
+    (3, [
+        # near-duplicate links + MinHash/LSH index (see dedup.py);
+        # run `python dedup.py` once to index questions saved before this
+        "ALTER TABLE questions ADD COLUMN canonical_id INTEGER REFERENCES questions(id) ON DELETE SET NULL",
+        "CREATE INDEX IF NOT EXISTS idx_questions_canonical ON questions(canonical_id)",
+        """CREATE TABLE IF NOT EXISTS question_minhash (
+            question_id INTEGER PRIMARY KEY,
+            sig BLOB NOT NULL,
+            FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+        )""",
+        """CREATE TABLE IF NOT EXISTS question_lsh (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_question_lsh_bucket ON question_lsh(band, bucket)",
+        "CREATE INDEX IF NOT EXISTS idx_question_lsh_qid ON question_lsh(question_id)",
+    ]),
+    (4, [
+        # question bank lookups by normalized skill (see get_bank_questions)
+        "CREATE INDEX IF NOT EXISTS idx_questions_skill_norm ON questions(lower(trim(skill)), canonical_id)",
+    ]),
+    (5, [
+        # per-call LLM telemetry (see telemetry.py)
+        """CREATE TABLE IF NOT EXISTS llm_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts TEXT NOT NULL,
+            call_site TEXT NOT NULL,
+            model TEXT,
+            prompt_chars INTEGER,
+            response_chars INTEGER,
+            prompt_tokens INTEGER,
+            output_tokens INTEGER,
+            total_tokens INTEGER,
+            latency_ms REAL,
+            cache_status TEXT,
+            ok INTEGER,
+            parse_status TEXT,
+            jd_tokens_original INTEGER,
+            jd_tokens_compacted INTEGER
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_llm_metrics_ts ON llm_metrics(ts, call_site)",
+        "CREATE INDEX IF NOT EXISTS idx_jds_created_at ON jds(created_at)",
+    ]),
+    (6, [
+        # persisted sample answers, one per (canonical) question
+        """CREATE TABLE IF NOT EXISTS answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            question_id INTEGER NOT NULL UNIQUE,
+            answer TEXT NOT NULL,
+            model TEXT,
+            prompt_version TEXT,
+            source TEXT,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+        )""",
+    ]),
+    (7, [
+        # durable JD processing queue (jobs.py); run_after / lease_until are epoch seconds
+        """CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT '{}',
+            stage TEXT,
+            progress_done INTEGER NOT NULL DEFAULT 0,
+            progress_total INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after REAL NOT NULL DEFAULT 0,
+            lease_until REAL,
+            locked_by TEXT,
+            jd_id INTEGER,
+            result TEXT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            FOREIGN KEY (jd_id) REFERENCES jds(id) ON DELETE SET NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs(status, run_after)",
+    ]),
+    (8, [
+        # hedged requests (llm_router): was a duplicate sent, and did it win
+        "ALTER TABLE llm_metrics ADD COLUMN hedged INTEGER",
+        "ALTER TABLE llm_metrics ADD COLUMN hedge_won INTEGER",
+    ]),
+    (9, [
+        # analytics aggregates (analytics.py), one row per day (JD / question
+        # created_at) and key, maintained by the triggers below
+        """CREATE TABLE IF NOT EXISTS stats_skill_daily (
+            day TEXT NOT NULL, skill TEXT NOT NULL, jds INTEGER NOT NULL,
+            PRIMARY KEY (day, skill)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS stats_jd_daily (
+            day TEXT NOT NULL, domain TEXT NOT NULL, seniority TEXT NOT NULL, jds INTEGER NOT NULL,
+            PRIMARY KEY (day, domain, seniority)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS stats_question_daily (
+            day TEXT NOT NULL, skill TEXT NOT NULL, qtype TEXT NOT NULL, questions INTEGER NOT NULL,
+            PRIMARY KEY (day, skill, qtype)
+        ) WITHOUT ROWID""",
+        # skills rows carry no date and go away by cascade, so JD deletes
+        # take their skills out of the counts before the cascade runs
+        """CREATE TRIGGER IF NOT EXISTS skills_stats_ai AFTER INSERT ON skills BEGIN
+            INSERT INTO stats_skill_daily (day, skill, jds)
+            VALUES (substr((SELECT created_at FROM jds WHERE id = new.jd_id), 1, 10), lower(trim(new.skill)), 1)
+            ON CONFLICT (day, skill) DO UPDATE SET jds = jds + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS jds_stats_ai AFTER INSERT ON jds BEGIN
+            INSERT INTO stats_jd_daily (day, domain, seniority, jds)
+            VALUES (substr(new.created_at, 1, 10), lower(trim(coalesce(new.domain, ''))),
+                    lower(trim(coalesce(new.seniority, ''))), 1)
+            ON CONFLICT (day, domain, seniority) DO UPDATE SET jds = jds + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS jds_stats_bd BEFORE DELETE ON jds BEGIN
+            UPDATE stats_jd_daily SET jds = jds - 1
+            WHERE day = substr(old.created_at, 1, 10) AND domain = lower(trim(coalesce(old.domain, '')))
+              AND seniority = lower(trim(coalesce(old.seniority, '')));
+            UPDATE stats_skill_daily
+            SET jds = jds - (SELECT count(*) FROM skills s WHERE s.jd_id = old.id AND lower(trim(s.skill)) = stats_skill_daily.skill)
+            WHERE day = substr(old.created_at, 1, 10)
+              AND skill IN (SELECT lower(trim(skill)) FROM skills WHERE jd_id = old.id);
+            DELETE FROM stats_jd_daily WHERE day = substr(old.created_at, 1, 10) AND jds <= 0;
+            DELETE FROM stats_skill_daily WHERE day = substr(old.created_at, 1, 10) AND jds <= 0;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS jds_stats_au AFTER UPDATE OF domain, seniority, created_at ON jds BEGIN
+            UPDATE stats_jd_daily SET jds = jds - 1
+            WHERE day = substr(old.created_at, 1, 10) AND domain = lower(trim(coalesce(old.domain, '')))
+              AND seniority = lower(trim(coalesce(old.seniority, '')));
+            DELETE FROM stats_jd_daily WHERE day = substr(old.created_at, 1, 10) AND jds <= 0;
+            INSERT INTO stats_jd_daily (day, domain, seniority, jds)
+            VALUES (substr(new.created_at, 1, 10), lower(trim(coalesce(new.domain, ''))),
+                    lower(trim(coalesce(new.seniority, ''))), 1)
+            ON CONFLICT (day, domain, seniority) DO UPDATE SET jds = jds + 1;
+            UPDATE stats_skill_daily
+            SET jds = jds - (SELECT count(*) FROM skills s WHERE s.jd_id = old.id AND lower(trim(s.skill)) = stats_skill_daily.skill)
+            WHERE substr(old.created_at, 1, 10) <> substr(new.created_at, 1, 10)
+              AND day = substr(old.created_at, 1, 10)
+              AND skill IN (SELECT lower(trim(skill)) FROM skills WHERE jd_id = old.id);
+            DELETE FROM stats_skill_daily WHERE day = substr(old.created_at, 1, 10) AND jds <= 0;
+            INSERT INTO stats_skill_daily (day, skill, jds)
+            SELECT substr(new.created_at, 1, 10), lower(trim(skill)), count(*) FROM skills
+            WHERE jd_id = new.id AND substr(old.created_at, 1, 10) <> substr(new.created_at, 1, 10)
+            GROUP BY 2 ORDER BY 2
+            ON CONFLICT (day, skill) DO UPDATE SET jds = jds + excluded.jds;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS questions_stats_ai AFTER INSERT ON questions BEGIN
+            INSERT INTO stats_question_daily (day, skill, qtype, questions)
+            VALUES (substr(new.created_at, 1, 10), lower(trim(coalesce(new.skill, ''))),
+                    lower(trim(coalesce(new.qtype, ''))), 1)
+            ON CONFLICT (day, skill, qtype) DO UPDATE SET questions = questions + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS questions_stats_ad AFTER DELETE ON questions BEGIN
+            UPDATE stats_question_daily SET questions = questions - 1
+            WHERE day = substr(old.created_at, 1, 10) AND skill = lower(trim(coalesce(old.skill, '')))
+              AND qtype = lower(trim(coalesce(old.qtype, '')));
+            DELETE FROM stats_question_daily
+            WHERE day = substr(old.created_at, 1, 10) AND skill = lower(trim(coalesce(old.skill, '')))
+              AND qtype = lower(trim(coalesce(old.qtype, ''))) AND questions <= 0;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS questions_stats_au AFTER UPDATE OF skill, qtype, created_at ON questions BEGIN
+            UPDATE stats_question_daily SET questions = questions - 1
+            WHERE day = substr(old.created_at, 1, 10) AND skill = lower(trim(coalesce(old.skill, '')))
+              AND qtype = lower(trim(coalesce(old.qtype, '')));
+            DELETE FROM stats_question_daily WHERE day = substr(old.created_at, 1, 10) AND questions <= 0;
+            INSERT INTO stats_question_daily (day, skill, qtype, questions)
+            VALUES (substr(new.created_at, 1, 10), lower(trim(coalesce(new.skill, ''))),
+                    lower(trim(coalesce(new.qtype, ''))), 1)
+            ON CONFLICT (day, skill, qtype) DO UPDATE SET questions = questions + 1;
+        END""",
+        # backfill from existing rows
+        *_ANALYTICS_REBUILD_V9,
+    ]),
+    (10, [
+        # SM-2 review state per question (practice.py). jd_id / skill / qtype
+        # are copied from the question so practice filters never touch it;
+        # new cards are due from their creation time.
+        """CREATE TABLE IF NOT EXISTS reviews (
+            question_id INTEGER PRIMARY KEY REFERENCES questions(id) ON DELETE CASCADE,
+            jd_id INTEGER NOT NULL,
+            skill TEXT NOT NULL,
+            qtype TEXT NOT NULL,
+            reps INTEGER NOT NULL DEFAULT 0,
+            interval_days REAL NOT NULL DEFAULT 0,
+            ease REAL NOT NULL DEFAULT 2.5,
+            lapses INTEGER NOT NULL DEFAULT 0,
+            due REAL NOT NULL,
+            last_quality INTEGER,
+            last_review REAL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_reviews_due ON reviews(due)",
+        "CREATE INDEX IF NOT EXISTS idx_reviews_jd_due ON reviews(jd_id, due)",
+        "CREATE INDEX IF NOT EXISTS idx_reviews_skill_due ON reviews(skill, due)",
+        """CREATE TRIGGER IF NOT EXISTS questions_reviews_ai AFTER INSERT ON questions BEGIN
+            INSERT INTO reviews (question_id, jd_id, skill, qtype, due)
+            VALUES (new.id, new.jd_id, lower(trim(coalesce(new.skill, ''))), lower(trim(coalesce(new.qtype, ''))),
+                    coalesce(CAST(strftime('%s', new.created_at) AS REAL), 0));
+        END""",
+        """INSERT OR IGNORE INTO reviews (question_id, jd_id, skill, qtype, due)
+           SELECT id, jd_id, lower(trim(coalesce(skill, ''))), lower(trim(coalesce(qtype, ''))),
+                  coalesce(CAST(strftime('%s', created_at) AS REAL), 0)
+           FROM questions""",
+    ]),
+    (11, [
+        # canonical skills (skill_dict.py); skills / questions keep their text
+        # for display and gain an integer key
+        """CREATE TABLE IF NOT EXISTS skill_dict (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            label TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS skill_aliases (
+            alias TEXT PRIMARY KEY,
+            skill_id INTEGER NOT NULL REFERENCES skill_dict(id) ON DELETE CASCADE
+        ) WITHOUT ROWID""",
+        "ALTER TABLE skills ADD COLUMN skill_id INTEGER REFERENCES skill_dict(id)",
+        "ALTER TABLE questions ADD COLUMN skill_id INTEGER REFERENCES skill_dict(id)",
+        skill_dict.backfill,
+        "CREATE INDEX IF NOT EXISTS idx_skills_skill_id ON skills(skill_id)",
+        "CREATE INDEX IF NOT EXISTS idx_questions_skill_id ON questions(skill_id, canonical_id)",
+        # replaced by idx_questions_skill_id (get_bank_questions)
+        "DROP INDEX IF EXISTS idx_questions_skill_norm",
+        # analytics and review rows keyed by canonical skill name
+        "DROP TRIGGER IF EXISTS skills_stats_ai",
+        "DROP TRIGGER IF EXISTS jds_stats_bd",
+        "DROP TRIGGER IF EXISTS jds_stats_au",
+        "DROP TRIGGER IF EXISTS questions_stats_ai",
+        "DROP TRIGGER IF EXISTS questions_stats_ad",
+        "DROP TRIGGER IF EXISTS questions_stats_au",
+        "DROP TRIGGER IF EXISTS questions_reviews_ai",
+        f"""CREATE TRIGGER skills_stats_ai AFTER INSERT ON skills BEGIN
+            INSERT INTO stats_skill_daily (day, skill, jds)
+            VALUES (substr((SELECT created_at FROM jds WHERE id = new.jd_id), 1, 10), {_skill_key('new')}, 1)
+            ON CONFLICT (day, skill) DO UPDATE SET jds = jds + 1;
+        END""",
+        f"""CREATE TRIGGER jds_stats_bd BEFORE DELETE ON jds BEGIN
+            UPDATE stats_jd_daily SET jds = jds - 1
+            WHERE day = substr(old.created_at, 1, 10) AND domain = lower(trim(coalesce(old.domain, '')))
+              AND seniority = lower(trim(coalesce(old.seniority, '')));
+            UPDATE stats_skill_daily
+            SET jds = jds - (SELECT count(*) FROM skills s WHERE s.jd_id = old.id AND {_skill_key('s')} = stats_skill_daily.skill)
+            WHERE day = substr(old.created_at, 1, 10)
+              AND skill IN (SELECT {_skill_key('skills')} FROM skills WHERE jd_id = old.id);
+            DELETE FROM stats_jd_daily WHERE day = substr(old.created_at, 1, 10) AND jds <= 0;
+            DELETE FROM stats_skill_daily WHERE day = substr(old.created_at, 1, 10) AND jds <= 0;
+        END""",
+        f"""CREATE TRIGGER jds_stats_au AFTER UPDATE OF domain, seniority, created_at ON jds BEGIN
+            UPDATE stats_jd_daily SET jds = jds - 1
+            WHERE day = substr(old.created_at, 1, 10) AND domain = lower(trim(coalesce(old.domain, '')))
+              AND seniority = lower(trim(coalesce(old.seniority, '')));
+            DELETE FROM stats_jd_daily WHERE day = substr(old.created_at, 1, 10) AND jds <= 0;
+            INSERT INTO stats_jd_daily (day, domain, seniority, jds)
+            VALUES (substr(new.created_at, 1, 10), lower(trim(coalesce(new.domain, ''))),
+                    lower(trim(coalesce(new.seniority, ''))), 1)
+            ON CONFLICT (day, domain, seniority) DO UPDATE SET jds = jds + 1;
+            UPDATE stats_skill_daily
+            SET jds = jds - (SELECT count(*) FROM skills s WHERE s.jd_id = old.id AND {_skill_key('s')} = stats_skill_daily.skill)
+            WHERE substr(old.created_at, 1, 10) <> substr(new.created_at, 1, 10)
+              AND day = substr(old.created_at, 1, 10)
+              AND skill IN (SELECT {_skill_key('skills')} FROM skills WHERE jd_id = old.id);
+            DELETE FROM stats_skill_daily WHERE day = substr(old.created_at, 1, 10) AND jds <= 0;
+            INSERT INTO stats_skill_daily (day, skill, jds)
+            SELECT substr(new.created_at, 1, 10), {_skill_key('skills')}, count(*) FROM skills
+            WHERE jd_id = new.id AND substr(old.created_at, 1, 10) <> substr(new.created_at, 1, 10)
+            GROUP BY 2 ORDER BY 2
+            ON CONFLICT (day, skill) DO UPDATE SET jds = jds + excluded.jds;
+        END""",
+        f"""CREATE TRIGGER questions_stats_ai AFTER INSERT ON questions BEGIN
+            INSERT INTO stats_question_daily (day, skill, qtype, questions)
+            VALUES (substr(new.created_at, 1, 10), {_skill_key('new')}, lower(trim(coalesce(new.qtype, ''))), 1)
+            ON CONFLICT (day, skill, qtype) DO UPDATE SET questions = questions + 1;
+        END""",
+        f"""CREATE TRIGGER questions_stats_ad AFTER DELETE ON questions BEGIN
+            UPDATE stats_question_daily SET questions = questions - 1
+            WHERE day = substr(old.created_at, 1, 10) AND skill = {_skill_key('old')}
+              AND qtype = lower(trim(coalesce(old.qtype, '')));
+            DELETE FROM stats_question_daily
+            WHERE day = substr(old.created_at, 1, 10) AND skill = {_skill_key('old')}
+              AND qtype = lower(trim(coalesce(old.qtype, ''))) AND questions <= 0;
+        END""",
+        f"""CREATE TRIGGER questions_stats_au AFTER UPDATE OF skill, skill_id, qtype, created_at ON questions BEGIN
+            UPDATE stats_question_daily SET questions = questions - 1
+            WHERE day = substr(old.created_at, 1, 10) AND skill = {_skill_key('old')}
+              AND qtype = lower(trim(coalesce(old.qtype, '')));
+            DELETE FROM stats_question_daily WHERE day = substr(old.created_at, 1, 10) AND questions <= 0;
+            INSERT INTO stats_question_daily (day, skill, qtype, questions)
+            VALUES (substr(new.created_at, 1, 10), {_skill_key('new')}, lower(trim(coalesce(new.qtype, ''))), 1)
+            ON CONFLICT (day, skill, qtype) DO UPDATE SET questions = questions + 1;
+        END""",
+        f"""CREATE TRIGGER questions_reviews_ai AFTER INSERT ON questions BEGIN
+            INSERT INTO reviews (question_id, jd_id, skill, qtype, due)
+            VALUES (new.id, new.jd_id, {_skill_key('new')}, lower(trim(coalesce(new.qtype, ''))),
+                    coalesce(CAST(strftime('%s', new.created_at) AS REAL), 0));
+        END""",
+        f"UPDATE reviews SET skill = (SELECT {_skill_key('questions')} FROM questions WHERE questions.id = reviews.question_id)",
+        *ANALYTICS_REBUILD,
+    ]),
+    (12, [
+        # a JD lists each canonical skill once (save_jd dedupes by skill_id);
+        # drop duplicates left by migration 11 and recount
+        """DELETE FROM skills WHERE skill_id IS NOT NULL AND id NOT IN (
+            SELECT min(id) FROM skills WHERE skill_id IS NOT NULL GROUP BY jd_id, skill_id
+        )""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_skills_jd_skill_id ON skills(jd_id, skill_id)",
+        *ANALYTICS_REBUILD,
+    ]),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
 # --- DB layer (Task 1 implemented) ---
 def init_db(path: str = DB_PATH):
     """Create DB and tables if missing, return connection."""
     conn = sqlite3.connect(path, check_same_thread=False)
     # enforce foreign keys
     conn.execute("PRAGMA foreign_keys = ON")
+    # WAL lets readers proceed during writes; NORMAL sync is durable under WAL
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -20000")  # ~20 MB page cache
+    conn.execute("PRAGMA temp_store = MEMORY")
     cur = conn.cursor()
 
     cur.execute("""
@@ -57,46 +451,133 @@ def init_db(path: str = DB_PATH):
     );
     """)
 
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+        path TEXT PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        status TEXT NOT NULL,
+        jd_id INTEGER,
+        error TEXT,
+        updated_at TEXT NOT NULL
+    );
+    """)
+
     conn.commit()
+    migrate(conn)
     return conn
 
-def save_jd(conn, title: str, jd_text: str, skills: List[str], domain: str = "", seniority: str = "", summary: str = "") -> int:
-    """Persist JD and skills; return jd_id."""
-    cur = conn.cursor()
-    created_at = datetime.utcnow().isoformat()
-    cur.execute(
-        "INSERT INTO jds (title, jd_text, domain, seniority, summary, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-        (title, jd_text, domain, seniority, summary, created_at),
-    )
-    jd_id = cur.lastrowid
+def migrate(conn) -> int:
+    """Apply pending MIGRATIONS; return the resulting schema version."""
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    for target, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        # explicit BEGIN: sqlite3 opens no transaction for DDL, so under a
+        # plain `with conn:` a failing step would leave the earlier ones applied
+        # without the version bump, and the next start would replay them
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN")
+        try:
+            for step in statements:
+                # a callable step migrates data in Python (e.g. skill_dict.backfill)
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {int(target)}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        version = target
+    return version
+
+# --- Write notifications ---
+# Callbacks fn(*tables) run after a write commits; db_cache uses them to
+# drop cached reads of the touched tables.
+WRITE_LISTENERS = []
 
-    # insert skills
+def _notify_write(*tables):
+    for fn in WRITE_LISTENERS:
+        try:
+            fn(*tables)
+        except Exception as e:
+            print("WRITE LISTENER ERROR:", e)
+
+def save_jd(conn, title: str, jd_text: str, skills: List[str], domain: str = "", seniority: str = "", summary: str = "",
+            before_commit=None, questions: List[Dict[str, Any]] = None) -> int:
+    """
+    Persist JD and skills; return jd_id. questions, if given, are saved in
+    the same transaction. before_commit(conn, jd_id) runs inside it too
+    (jobs.py records the id there, ingest_cli its checkpoint).
+    """
+    created_at = datetime.utcnow().isoformat()
+    rows = []
     for s in skills:
         if s is None:
             continue
         s_clean = str(s).strip()
         if s_clean == "":
             continue
-        cur.execute("INSERT INTO skills (jd_id, skill) VALUES (?, ?)", (jd_id, s_clean))
+        rows.append(s_clean)
 
-    conn.commit()
+    # JD row and its skills commit (or roll back) together
+    with conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO jds (title, jd_text, domain, seniority, summary, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (title, jd_text, domain, seniority, summary, created_at),
+        )
+        jd_id = cur.lastrowid
+        ids = skill_dict.resolve_many(conn, rows)
+        # one row per canonical skill: "Python" and "python3" in one JD are the same skill
+        seen, skill_rows = set(), []
+        for s in rows:
+            if ids[s] is not None and ids[s] in seen:
+                continue
+            seen.add(ids[s])
+            skill_rows.append((jd_id, s, ids[s]))
+        cur.executemany("INSERT INTO skills (jd_id, skill, skill_id) VALUES (?, ?, ?)", skill_rows)
+        if questions:
+            _insert_questions(conn, jd_id, questions)
+        if before_commit:
+            before_commit(conn, jd_id)
+
+    _notify_write("jds", *(("questions",) if questions else ()))
     return jd_id
 
-def save_questions(conn, jd_id: int, questions: List[Dict[str, Any]]):
-    """Persist generated questions for a JD."""
-    cur = conn.cursor()
+def _insert_questions(conn, jd_id, questions):
+    """Insert and dedup-index questions; the caller owns the transaction."""
     created_at = datetime.utcnow().isoformat()
+    rows = []
     for q in questions:
         skill = (q.get("skill") or "").strip()
         qtype = (q.get("qtype") or "").strip()
         prompt = (q.get("prompt") or "").strip()
         if prompt == "":
             continue  # skip empty prompts
-        cur.execute(
-            "INSERT INTO questions (jd_id, skill, qtype, prompt, created_at) VALUES (?, ?, ?, ?, ?)",
-            (jd_id, skill, qtype, prompt, created_at),
-        )
-    conn.commit()
+        rows.append((jd_id, skill, qtype, prompt, created_at))
+
+    (last_id,) = conn.execute("SELECT coalesce(max(id), 0) FROM questions").fetchone()
+    ids = skill_dict.resolve_many(conn, [r[1] for r in rows])
+    conn.executemany(
+        "INSERT INTO questions (jd_id, skill, qtype, prompt, created_at, skill_id) VALUES (?, ?, ?, ?, ?, ?)",
+        [r + (ids[r[1]],) for r in rows],
+    )
+    # link near-duplicates of questions already in the bank
+    new_rows = conn.execute(
+        "SELECT id, prompt FROM questions WHERE id > ? AND jd_id = ? ORDER BY id", (last_id, jd_id)
+    ).fetchall()
+    dedup.index_questions(conn, new_rows)
+
+def save_questions(conn, jd_id: int, questions: List[Dict[str, Any]], before_commit=None):
+    """Persist generated questions for a JD; before_commit(conn) runs inside the same transaction."""
+    with conn:
+        _insert_questions(conn, jd_id, questions)
+        if before_commit:
+            before_commit(conn)
+    _notify_write("questions")
 
 
 # --- Read helpers (useful for tests / UI) ---
@@ -107,23 +588,235 @@ def get_jds(conn) -> List[Dict[str, Any]]:
     cols = ["id", "title", "jd_text", "domain", "seniority", "summary", "created_at"]
     return [dict(zip(cols, r)) for r in rows]
 
+def list_jds(conn, limit: int = 50, before_id: int = None, title_filter: str = "") -> List[Dict[str, Any]]:
+    """
+    Lightweight JD listing for pickers: id/title/created_at only, newest first.
+    Keyset pagination: pass the last id of the previous page as before_id.
+    """
+    sql = "SELECT id, title, created_at FROM jds"
+    where, params = [], []
+    if before_id is not None:
+        where.append("id < ?")
+        params.append(before_id)
+    if title_filter:
+        where.append("title LIKE ? ESCAPE '\\'")
+        escaped = title_filter.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params.append(f"%{escaped}%")
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    cols = ["id", "title", "created_at"]
+    return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+def list_jd_titles(conn) -> List[Dict[str, Any]]:
+    """Every JD as id/title, newest first; for selectors that must offer all JDs."""
+    cur = conn.cursor()
+    cur.execute("SELECT id, title FROM jds ORDER BY id DESC")
+    return [{"id": r[0], "title": r[1]} for r in cur.fetchall()]
+
+def get_jd(conn, jd_id: int) -> Dict[str, Any]:
+    """Full JD row (including jd_text), or None."""
+    cur = conn.cursor()
+    cur.execute("SELECT id, title, jd_text, domain, seniority, summary, created_at FROM jds WHERE id = ?", (jd_id,))
+    row = cur.fetchone()
+    cols = ["id", "title", "jd_text", "domain", "seniority", "summary", "created_at"]
+    return dict(zip(cols, row)) if row else None
+
 def get_skills_for_jd(conn, jd_id: int) -> List[str]:
     cur = conn.cursor()
     cur.execute("SELECT skill FROM skills WHERE jd_id = ? ORDER BY id ASC", (jd_id,))
     return [r[0] for r in cur.fetchall()]
 
-def get_questions_for_jd(conn, jd_id: int) -> List[Dict[str, Any]]:
+def get_questions_for_jd(conn, jd_id: int, limit: int = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """Questions of a JD; near-duplicates carry their canonical question's id and prompt."""
     cur = conn.cursor()
-    cur.execute("SELECT id, skill, qtype, prompt, created_at FROM questions WHERE jd_id = ? ORDER BY id ASC", (jd_id,))
+    sql = """
+        SELECT q.id, q.skill, q.qtype, q.prompt, q.created_at, q.canonical_id, c.prompt
+        FROM questions q LEFT JOIN questions c ON c.id = q.canonical_id
+        WHERE q.jd_id = ? ORDER BY q.id ASC
+    """
+    if limit is None:
+        cur.execute(sql, (jd_id,))
+    else:
+        cur.execute(sql + " LIMIT ? OFFSET ?", (jd_id, limit, offset))
     rows = cur.fetchall()
-    cols = ["id", "skill", "qtype", "prompt", "created_at"]
+    cols = ["id", "skill", "qtype", "prompt", "created_at", "canonical_id", "canonical_prompt"]
     return [dict(zip(cols, r)) for r in rows]
 
+def get_questions_by_ids(conn, question_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Questions by primary key (any JD), keyed by id; shaped like get_questions_for_jd rows plus jd_id."""
+    ids = [i for i in question_ids if i is not None]
+    if not ids:
+        return {}
+    marks = ",".join("?" * len(ids))
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT q.id, q.jd_id, q.skill, q.qtype, q.prompt, q.created_at, q.canonical_id, c.prompt
+        FROM questions q LEFT JOIN questions c ON c.id = q.canonical_id
+        WHERE q.id IN ({marks})
+        """,
+        ids,
+    )
+    cols = ["id", "jd_id", "skill", "qtype", "prompt", "created_at", "canonical_id", "canonical_prompt"]
+    return {r[0]: dict(zip(cols, r)) for r in cur.fetchall()}
+
+def normalize_skill(skill: str) -> str:
+    """Dictionary key for a skill string (see skill_dict.normalize)."""
+    return skill_dict.normalize(skill)
+
+def get_bank_questions(conn, skill: str, limit: int) -> List[Dict[str, Any]]:
+    """Distinct (canonical) stored questions for a skill or any of its aliases, oldest first."""
+    skill_id = skill_dict.lookup(conn, skill)
+    if skill_id is None:
+        return []
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT id, skill, qtype, prompt FROM questions
+        WHERE skill_id = ? AND canonical_id IS NULL
+        ORDER BY id ASC LIMIT ?
+        """,
+        (skill_id, limit),
+    )
+    cols = ["id", "skill", "qtype", "prompt"]
+    return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+def count_questions_for_jd(conn, jd_id: int) -> int:
+    cur = conn.cursor()
+    cur.execute("SELECT count(*) FROM questions WHERE jd_id = ?", (jd_id,))
+    return cur.fetchone()[0]
+
 def delete_jd(conn, jd_id: int):
-    """Delete JD and cascade to skills/questions (uses FK ON DELETE CASCADE)."""
+    """
+    Delete JD and cascade to skills/questions (uses FK ON DELETE CASCADE).
+    Near-duplicates in other JDs of its canonical questions are kept linked:
+    the oldest of each group is promoted to canonical (banded, and given the
+    stored answer) and the rest of the group points at it.
+    """
+    with conn:
+        groups = {}
+        for old, qid in conn.execute(
+            """SELECT q.canonical_id, q.id FROM questions q JOIN questions c ON c.id = q.canonical_id
+               WHERE c.jd_id = ? AND q.jd_id <> ? ORDER BY q.id""",
+            (jd_id, jd_id),
+        ).fetchall():
+            groups.setdefault(old, []).append(qid)
+        for old, ids in groups.items():
+            conn.execute("UPDATE OR REPLACE answers SET question_id = ? WHERE question_id = ?", (ids[0], old))
+
+        conn.execute("DELETE FROM jds WHERE id = ?", (jd_id,))
+
+        for ids in groups.values():
+            (prompt,) = conn.execute("SELECT prompt FROM questions WHERE id = ?", (ids[0],)).fetchone()
+            dedup.index_questions(conn, [(ids[0], prompt)])
+            # the promoted question may itself match another canonical
+            (target,) = conn.execute("SELECT coalesce(canonical_id, id) FROM questions WHERE id = ?", (ids[0],)).fetchone()
+            conn.executemany("UPDATE questions SET canonical_id = ? WHERE id = ?", [(target, i) for i in ids[1:]])
+    _notify_write("jds", "questions", "answers")
+
+# --- Answers ---
+def save_answer(conn, question_id: int, answer: str, model: str = "", prompt_version: str = "", source: str = "user"):
+    """Store (or replace) the sample answer for a question."""
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO answers (question_id, answer, model, prompt_version, source, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (question_id, answer, model, prompt_version, source, datetime.utcnow().isoformat()),
+        )
+    _notify_write("answers")
+
+def get_answers(conn, question_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Answers for the given question ids, keyed by question id."""
+    ids = [i for i in question_ids if i is not None]
+    if not ids:
+        return {}
+    marks = ",".join("?" * len(ids))
     cur = conn.cursor()
-    cur.execute("DELETE FROM jds WHERE id = ?", (jd_id,))
-    conn.commit()
+    cur.execute(
+        f"SELECT question_id, answer, model, prompt_version, source, created_at FROM answers WHERE question_id IN ({marks})",
+        ids,
+    )
+    cols = ["question_id", "answer", "model", "prompt_version", "source", "created_at"]
+    return {r[0]: dict(zip(cols, r)) for r in cur.fetchall()}
+
+def get_unanswered_questions(conn, jd_id: int) -> List[Dict[str, Any]]:
+    """Distinct answer targets (canonical id + prompt) of a JD's questions that have no stored answer."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT DISTINCT coalesce(q.canonical_id, q.id) AS target, coalesce(c.prompt, q.prompt)
+        FROM questions q
+        LEFT JOIN questions c ON c.id = q.canonical_id
+        LEFT JOIN answers a ON a.question_id = coalesce(q.canonical_id, q.id)
+        WHERE q.jd_id = ? AND a.id IS NULL
+        ORDER BY target
+        """,
+        (jd_id,),
+    )
+    return [{"question_id": r[0], "prompt": r[1]} for r in cur.fetchall()]
+
+# --- Full-text search ---
+def _fts_query(text: str) -> str:
+    """Turn free user input into a safe FTS5 query: AND of quoted terms, last one as prefix."""
+    terms = [t.replace('"', '""') for t in text.split()]
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def search(conn, query: str, limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Ranked (bm25) search over JDs and questions.
+    Snippets wrap matched terms in ** so they render bold in markdown.
+    """
+    match = _fts_query(query)
+    if not match:
+        return {"jds": [], "questions": []}
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT j.id, j.title, snippet(jds_fts, -1, '**', '**', '…', 12), bm25(jds_fts, 10.0, 1.0, 3.0) AS rank
+        FROM jds_fts JOIN jds j ON j.id = jds_fts.rowid
+        WHERE jds_fts MATCH ?
+        ORDER BY rank LIMIT ?
+        """,
+        (match, limit),
+    )
+    jds = [dict(zip(["id", "title", "snippet", "rank"], r)) for r in cur.fetchall()]
+    cur.execute(
+        """
+        SELECT q.id, q.jd_id, q.skill, q.qtype, snippet(questions_fts, 0, '**', '**', '…', 16), bm25(questions_fts) AS rank
+        FROM questions_fts JOIN questions q ON q.id = questions_fts.rowid
+        WHERE questions_fts MATCH ?
+        ORDER BY rank LIMIT ?
+        """,
+        (match, limit),
+    )
+    questions = [dict(zip(["id", "jd_id", "skill", "qtype", "snippet", "rank"], r)) for r in cur.fetchall()]
+    return {"jds": jds, "questions": questions}
+
+# --- Bulk ingestion checkpoints ---
+def get_checkpoint(conn, path: str) -> Dict[str, Any]:
+    cur = conn.cursor()
+    cur.execute("SELECT path, content_hash, status, jd_id, error, updated_at FROM ingest_checkpoints WHERE path = ?", (path,))
+    row = cur.fetchone()
+    cols = ["path", "content_hash", "status", "jd_id", "error", "updated_at"]
+    return dict(zip(cols, row)) if row else None
+
+def set_checkpoint(conn, path: str, content_hash: str, status: str, jd_id: int = None, error: str = None,
+                   commit: bool = True):
+    """Upsert the ingestion state of a file (pending / done / failed); commit=False joins the caller's transaction."""
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT OR REPLACE INTO ingest_checkpoints (path, content_hash, status, jd_id, error, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (path, content_hash, status, jd_id, error, datetime.utcnow().isoformat()),
+    )
+    if commit:
+        conn.commit()
 
 # --- LLM / UI stubs (for future tasks) ---
 def configure_llm(api_key: str = None, model: str = DEFAULT_MODEL, api_base: str = None):
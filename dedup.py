@@ -0,0 +1,167 @@
+# dedup.py
+"""
+Near-duplicate detection for the question bank (MinHash + LSH).
+
+Every saved question gets a MinHash signature over its word shingles. The
+signature is split into LSH bands stored in question_lsh, so finding
+candidates for a new prompt is an indexed lookup instead of a scan over all
+questions. A candidate whose estimated Jaccard similarity reaches
+SIMILARITY_THRESHOLD becomes the new question's canonical_id, and duplicates
+then share one answer. Only canonical questions are put in the band index,
+so buckets stay small however many copies of a question are saved.
+
+Batch job for an existing database:
+
+    python dedup.py --db jd_prep.db
+"""
+import hashlib
+import re
+from array import array
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS   # LSH candidate threshold ~ (1/16)^(1/4) = 0.5
+SIMILARITY_THRESHOLD = 0.7
+SHINGLE_SIZE = 2
+MAX_CANDIDATES = 200
+
+_MERSENNE = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+
+
+def _seeded_params():
+    params = []
+    for i in range(NUM_PERM):
+        d = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(d[:8], "big") % (_MERSENNE - 1) + 1
+        b = int.from_bytes(d[8:], "big") % _MERSENNE
+        params.append((a, b))
+    return params
+
+_PARAMS = _seeded_params()
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def shingles(text: str):
+    words = _WORD_RE.findall((text or "").casefold())
+    if len(words) < SHINGLE_SIZE:
+        return set(words)
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str):
+    """MinHash signature (tuple of NUM_PERM ints) of the prompt's shingles."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in shingles(text)
+    ]
+    if not hashes:
+        return tuple([_MASK64] * NUM_PERM)
+    return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PARAMS)
+
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def band_keys(sig):
+    """One signed 64-bit bucket key per band."""
+    keys = []
+    for band in range(BANDS):
+        chunk = array("Q", sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]).tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "big", signed=True))
+    return keys
+
+
+def _pack(sig) -> bytes:
+    return array("Q", sig).tobytes()
+
+def _unpack(blob) -> tuple:
+    a = array("Q")
+    a.frombytes(blob)
+    return tuple(a)
+
+
+def find_duplicate(conn, sig, exclude_id=None):
+    """Best matching existing question id (or None) and its similarity."""
+    keys = band_keys(sig)
+    where = " OR ".join(["(band = ? AND bucket = ?)"] * BANDS)
+    params = [v for band, key in enumerate(keys) for v in (band, key)]
+    cur = conn.cursor()
+    cur.execute(f"SELECT DISTINCT question_id FROM question_lsh WHERE {where} LIMIT {MAX_CANDIDATES}", params)
+    candidates = [r[0] for r in cur.fetchall() if r[0] != exclude_id]
+    if not candidates:
+        return None, 0.0
+
+    marks = ",".join("?" * len(candidates))
+    cur.execute(f"SELECT question_id, sig FROM question_minhash WHERE question_id IN ({marks})", candidates)
+    best_id, best_sim = None, 0.0
+    for qid, blob in cur.fetchall():
+        sim = similarity(sig, _unpack(blob))
+        if sim > best_sim or (sim == best_sim and best_id is not None and qid < best_id):
+            best_id, best_sim = qid, sim
+    if best_sim < SIMILARITY_THRESHOLD:
+        return None, best_sim
+    return best_id, best_sim
+
+
+def index_questions(conn, rows) -> int:
+    """
+    Index newly inserted questions [(id, prompt), ...] in id order and link
+    near-duplicates to their canonical question. Does not commit; callers
+    run this inside their write transaction. Returns the number linked.
+    """
+    cur = conn.cursor()
+    linked = 0
+    for qid, prompt in rows:
+        sig = minhash(prompt)
+        match_id, _ = find_duplicate(conn, sig, exclude_id=qid)
+        cur.execute("INSERT OR REPLACE INTO question_minhash (question_id, sig) VALUES (?, ?)", (qid, _pack(sig)))
+        if match_id is not None:
+            cur.execute("UPDATE questions SET canonical_id = ? WHERE id = ?", (match_id, qid))
+            linked += 1
+            continue
+        cur.executemany(
+            "INSERT INTO question_lsh (band, bucket, question_id) VALUES (?, ?, ?)",
+            [(band, key, qid) for band, key in enumerate(band_keys(sig))],
+        )
+    return linked
+
+
+def rebuild(conn, batch_size: int = 1000) -> dict:
+    """Re-index the whole question bank from scratch. Returns counts."""
+    with conn:
+        conn.execute("DELETE FROM question_lsh")
+        conn.execute("DELETE FROM question_minhash")
+        conn.execute("UPDATE questions SET canonical_id = NULL WHERE canonical_id IS NOT NULL")
+
+    total = linked = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, prompt FROM questions WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        with conn:
+            linked += index_questions(conn, rows)
+        total += len(rows)
+        last_id = rows[-1][0]
+    return {"questions": total, "duplicates": linked}
+
+
+def main(argv=None):
+    import argparse
+    import db_skeleton as db
+
+    parser = argparse.ArgumentParser(description="Rebuild the near-duplicate index for all questions.")
+    parser.add_argument("--db", default=db.DB_PATH, help="SQLite database path")
+    args = parser.parse_args(argv)
+    conn = db.init_db(args.db)
+    res = rebuild(conn)
+    print(f"Indexed {res['questions']} questions, {res['duplicates']} linked as near-duplicates")
+
+
+if __name__ == "__main__":
+    main()
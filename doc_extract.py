@@ -0,0 +1,192 @@
+# doc_extract.py
+"""
+Text extraction for uploaded JD files (TXT, PDF, DOCX).
+Shared by the Streamlit upload view and the bulk ingestion CLI.
+
+Results are cached by content hash, so Streamlit reruns with the same file
+attached do not re-parse it. PDFs are always parsed in a process pool, so
+every extraction is bounded by a timeout; large ones are split into page
+ranges extracted in parallel, capped at MAX_PDF_PAGES. Text cut short by the cap, the timeout or a failed page range
+is returned with notes saying what is missing, and is not cached.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+
+# PyPDF2 and python-docx are imported where they are used: most page loads
+# never parse a file, and both are slow to import.
+
+SUPPORTED_EXTENSIONS = ("txt", "pdf", "docx")
+
+MAX_PDF_PAGES = 50          # pages beyond this are ignored
+PARALLEL_MIN_PAGES = 8      # smaller PDFs are one task
+PAGES_PER_TASK = 4
+EXTRACT_TIMEOUT = 20.0      # seconds for the whole document
+PDF_WORKERS = 4
+CACHE_ENTRIES = 32
+TEXT_CHUNK_CHARS = 8000     # chunk size for streamed TXT output
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_pool = None
+_pool_pids = {}  # pool -> queue of its worker pids, for killing stuck workers
+_pool_lock = threading.Lock()
+
+
+@dataclass
+class ExtractedText:
+    text: str
+    notes: list = field(default_factory=list)   # what was left out, if anything
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.notes)
+
+
+def file_extension(name: str) -> str:
+    return name.rsplit(".", 1)[-1].lower() if "." in name else ""
+
+
+def _register_worker(pids):
+    pids.put(os.getpid())
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pids = multiprocessing.SimpleQueue()
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, initializer=_register_worker, initargs=(pids,))
+            _pool_pids[_pool] = pids
+        return _pool
+
+
+def _discard_pool(pool):
+    """Drop a pool whose workers are stuck on timed-out page ranges (cancel() cannot stop them)."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        pids = _pool_pids.pop(pool, None)
+    pool.shutdown(wait=False, cancel_futures=True)
+    while pids is not None and not pids.empty():
+        try:
+            os.kill(pids.get(), signal.SIGTERM)
+        except OSError:
+            pass  # already exited
+
+
+def _pdf_pages(data: bytes):
+    import PyPDF2
+    return PyPDF2.PdfReader(io.BytesIO(data)).pages
+
+
+def _count_pdf_pages(data: bytes) -> int:
+    """Worker: page count. Runs in a child process like the page extraction."""
+    return len(_pdf_pages(data))
+
+
+def _extract_pdf_pages(data: bytes, start: int, stop: int):
+    """Worker: text of pages [start, stop). Runs in a child process."""
+    pages = _pdf_pages(data)
+    return [pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _iter_pdf(data: bytes, max_pages: int, timeout: float, notes: list):
+    # parsing happens in the pool even for small PDFs: a malformed file can hang PyPDF2
+    deadline = time.monotonic() + timeout
+    pool = _get_pool()
+    count = pool.submit(_count_pdf_pages, data)
+    done, _ = wait([count], timeout=timeout)
+    if not done:
+        print("PDF EXTRACT TIMEOUT: could not open the document")
+        _discard_pool(pool)
+        notes.append("the PDF could not be opened before the timeout")
+        return
+    if count.exception() is not None:
+        raise count.exception()
+    total = count.result()
+    n_pages = min(total, max_pages)
+    if total > max_pages:
+        notes.append(f"only the first {max_pages} of {total} pages were read")
+
+    step = PAGES_PER_TASK if n_pages >= PARALLEL_MIN_PAGES else max(n_pages, 1)
+    ranges = [(start, min(start + step, n_pages)) for start in range(0, n_pages, step)]
+    futures = [pool.submit(_extract_pdf_pages, data, start, stop) for start, stop in ranges]
+    done, pending = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+    if pending:
+        print(f"PDF EXTRACT TIMEOUT: {len(pending)} of {len(futures)} page ranges skipped")
+        _discard_pool(pool)
+
+    # page ranges are yielded in document order
+    for f, (start, stop) in zip(futures, ranges):
+        if f not in done:
+            notes.append(f"pages {start + 1}-{stop} timed out")
+        elif f.exception() is not None:
+            print("PDF EXTRACT ERROR:", f.exception())
+            notes.append(f"pages {start + 1}-{stop} could not be read")
+        else:
+            yield from f.result()
+
+
+def iter_text(name: str, data: bytes, max_pages: int = MAX_PDF_PAGES, timeout: float = EXTRACT_TIMEOUT,
+              notes: list = None):
+    """
+    Stream the text of a JD file piece by piece (pages for PDF, paragraphs
+    for DOCX, fixed-size chunks for TXT), so very large documents can be
+    consumed without building one big string first. Anything left out
+    (page cap, timeout, unreadable pages) is appended to notes.
+    """
+    notes = [] if notes is None else notes
+    ext = file_extension(name)
+    if ext == "txt":
+        text = data.decode("utf-8", errors="ignore")
+        for i in range(0, len(text), TEXT_CHUNK_CHARS):
+            yield text[i:i + TEXT_CHUNK_CHARS]
+    elif ext == "pdf":
+        yield from _iter_pdf(data, max_pages, timeout, notes)
+    elif ext == "docx":
+        import docx
+        doc = docx.Document(io.BytesIO(data))
+        for p in doc.paragraphs:
+            yield p.text
+    else:
+        raise ValueError(f"Unsupported file type: {name}")
+
+
+def extract_text(name: str, data: bytes, max_pages: int = MAX_PDF_PAGES,
+                 timeout: float = EXTRACT_TIMEOUT) -> ExtractedText:
+    """
+    Plain text of a JD file given its name and raw bytes. Complete results
+    are cached; truncated ones carry notes and are extracted again next time.
+    """
+    ext = file_extension(name)
+    key = (hashlib.sha256(data).hexdigest(), ext, max_pages)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return ExtractedText(_cache[key])
+
+    sep = "" if ext == "txt" else "\n"
+    notes = []
+    text = sep.join(iter_text(name, data, max_pages=max_pages, timeout=timeout, notes=notes))
+    if notes:
+        return ExtractedText(text, notes)
+
+    with _cache_lock:
+        _cache[key] = text
+        while len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return ExtractedText(text)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,114 @@
+# extraction.py
+"""
+Single-call JD extraction: skills, metadata and interview questions come
+back in one structured response instead of two free-form round trips.
+
+SCHEMA is passed to Gemini as response_schema (JSON mode), so the model is
+constrained to this shape; validate() still checks and normalizes the
+result into typed records before anything is saved.
+"""
+from dataclasses import asdict, dataclass, field
+from typing import List
+
+QTYPES = ("technical", "behavioral")
+
+SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "skills": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "domain": {"type": "STRING"},
+        "seniority": {"type": "STRING"},
+        "summary": {"type": "STRING"},
+        "questions": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "skill": {"type": "STRING"},
+                    "qtype": {"type": "STRING", "enum": list(QTYPES)},
+                    "prompt": {"type": "STRING"},
+                },
+                "required": ["skill", "qtype", "prompt"],
+            },
+        },
+    },
+    "required": ["skills", "domain", "seniority", "summary", "questions"],
+}
+
+
+class ExtractionError(ValueError):
+    """The response does not contain usable skills and questions."""
+
+
+@dataclass
+class Question:
+    skill: str
+    qtype: str
+    prompt: str
+
+
+@dataclass
+class JDExtraction:
+    skills: List[str]
+    domain: str = ""
+    seniority: str = ""
+    summary: str = ""
+    questions: List[Question] = field(default_factory=list)
+
+    def metadata(self) -> dict:
+        """The dict shape call_llm_for_skills returns."""
+        return {"skills": list(self.skills), "domain": self.domain, "seniority": self.seniority,
+                "summary": self.summary}
+
+    def question_dicts(self) -> list:
+        return [asdict(q) for q in self.questions]
+
+
+def _text(value) -> str:
+    return value.strip() if isinstance(value, str) else ""
+
+
+def validate(data, top_k: int = 6, num_questions: int = 40) -> JDExtraction:
+    """
+    Normalize a parsed response: strip strings, drop duplicate or empty
+    skills and questions, cap both lists, and map unknown question types to
+    "technical". Raises ExtractionError when no skills or no questions remain.
+    """
+    if not isinstance(data, dict):
+        raise ExtractionError(f"expected an object, got {type(data).__name__}")
+
+    skills, seen = [], set()
+    for s in data.get("skills") or []:
+        s = _text(s)
+        if s and s.casefold() not in seen:
+            seen.add(s.casefold())
+            skills.append(s)
+    skills = skills[:top_k]
+    if not skills:
+        raise ExtractionError("no skills in response")
+
+    questions, seen = [], set()
+    for q in data.get("questions") or []:
+        if not isinstance(q, dict):
+            continue
+        prompt = _text(q.get("prompt"))
+        if not prompt or prompt.casefold() in seen:
+            continue
+        seen.add(prompt.casefold())
+        qtype = _text(q.get("qtype")).lower()
+        questions.append(Question(
+            skill=_text(q.get("skill")) or skills[0],
+            qtype=qtype if qtype in QTYPES else "technical",
+            prompt=prompt,
+        ))
+    questions = questions[:num_questions]
+    if not questions:
+        raise ExtractionError("no questions in response")
+
+    return JDExtraction(
+        skills=skills,
+        domain=_text(data.get("domain")),
+        seniority=_text(data.get("seniority")),
+        summary=_text(data.get("summary")),
+        questions=questions,
+    )
@@ -0,0 +1,184 @@
+# fake_gemini.py
+"""
+Local stand-in for genai.Client, for benchmarks and tests.
+
+Implements the part of the SDK llm_core uses:
+client.models.generate_content(model=, contents=, config=) and
+client.models.generate_content_stream(...), returning objects with .text
+and .usage_metadata. Latency, error rate and the canned responses are
+configurable, so pipelines can be measured without network or quota.
+
+    import llm_core
+    llm_core.LLM_CLIENT = FakeClient(latency=LogNormalLatency(median=0.8, sigma=0.5))
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+import types
+
+
+class FakeAPIError(Exception):
+    """Raised for injected failures; code mimics HTTP status (429/503)."""
+
+    def __init__(self, code=503, message="fake backend error"):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+# --- Latency distributions (seconds) ---
+class ConstantLatency:
+    def __init__(self, seconds=0.0):
+        self.seconds = seconds
+
+    def sample(self, rnd):
+        return self.seconds
+
+
+class UniformLatency:
+    def __init__(self, low=0.0, high=0.1):
+        self.low, self.high = low, high
+
+    def sample(self, rnd):
+        return rnd.uniform(self.low, self.high)
+
+
+class LogNormalLatency:
+    """Long-tailed latency: median seconds, sigma controls the tail."""
+
+    def __init__(self, median=0.5, sigma=0.5):
+        self.mu, self.sigma = math.log(median), sigma
+
+    def sample(self, rnd):
+        return rnd.lognormvariate(self.mu, self.sigma)
+
+
+# --- Canned responses ---
+_EXTRACT_COUNT_RE = re.compile(r'"questions": (\d+) distinct')
+
+def canned_skills(prompt):
+    return json.dumps({
+        "skills": ["Python", "SQL", "Docker", "Kubernetes", "AWS", "Airflow"],
+        "domain": "Data",
+        "seniority": "senior",
+        "summary": "Builds and operates data pipelines.",
+    })
+
+def canned_questions(prompt):
+    n = 40
+    for token in prompt.split():
+        if token.isdigit():
+            n = int(token)
+            break
+    skills = ["Python", "SQL", "Docker"]
+    marker = "skills to target are:"
+    if marker in prompt:
+        listed = prompt.split(marker, 1)[1].splitlines()[0]
+        skills = [s.strip() for s in listed.split(",") if s.strip()] or skills
+    return json.dumps([
+        {"skill": skills[i % len(skills)], "qtype": "technical" if i % 2 == 0 else "behavioral",
+         "prompt": f"Question {i + 1} about {skills[i % len(skills)]}: explain a trade-off you made."}
+        for i in range(n)
+    ])
+
+def canned_extraction(prompt):
+    n = 40
+    m = _EXTRACT_COUNT_RE.search(prompt)
+    if m:
+        n = int(m.group(1))
+    skills = ["Python", "SQL", "Docker", "Kubernetes", "AWS", "Airflow"]
+    return json.dumps({
+        **json.loads(canned_skills(prompt)),
+        "questions": [
+            {"skill": skills[i % len(skills)], "qtype": "technical" if i % 2 == 0 else "behavioral",
+             "prompt": f"Question {i + 1} about {skills[i % len(skills)]}: explain a trade-off you made."}
+            for i in range(n)
+        ],
+    })
+
+def canned_answer(prompt):
+    return ("Situation: our nightly pipeline was missing its SLA. Task: cut runtime by half. "
+            "Action: profiled the jobs, partitioned the largest table and parallelized the loads. "
+            "Result: runtime dropped from 4h to 1.5h and stayed there.")
+
+def default_responder(prompt):
+    """Pick a canned response shape from the prompt text."""
+    if "in a single JSON object" in prompt:
+        return canned_extraction(prompt)
+    if "Extract the top" in prompt:
+        return canned_skills(prompt)
+    if "interview questions" in prompt:
+        return canned_questions(prompt)
+    return canned_answer(prompt)
+
+
+class _Models:
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content(self, model, contents, config=None, **kwargs):
+        return self._client._respond(model, contents, config)
+
+    def generate_content_stream(self, model, contents, config=None, **kwargs):
+        return self._client._respond_stream(model, contents, config)
+
+
+class FakeClient:
+    def __init__(self, latency=None, error_rate=0.0, error_codes=(429, 503), responder=None,
+                 chunk_chars=40, seed=0, sleep=time.sleep):
+        self.latency = latency or ConstantLatency(0.0)
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.responder = responder or default_responder
+        self.chunk_chars = chunk_chars
+        self.models = _Models(self)
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sleep = sleep
+        self.calls = 0
+        self.errors = 0
+
+    def _draw(self):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency.sample(self._rnd)
+            fail = self._rnd.random() < self.error_rate
+            code = self._rnd.choice(self.error_codes) if fail else None
+            if fail:
+                self.errors += 1
+        return delay, code
+
+    @staticmethod
+    def _response(text, prompt):
+        usage = types.SimpleNamespace(
+            prompt_token_count=math.ceil(len(prompt) / 4),
+            candidates_token_count=math.ceil(len(text) / 4),
+            total_token_count=math.ceil(len(prompt) / 4) + math.ceil(len(text) / 4),
+        )
+        return types.SimpleNamespace(text=text, usage_metadata=usage)
+
+    def _respond(self, model, contents, config):
+        delay, code = self._draw()
+        self._sleep(delay)
+        if code is not None:
+            raise FakeAPIError(code)
+        text = self.responder(contents)
+        max_tokens = getattr(config, "max_output_tokens", None)
+        if max_tokens:
+            text = text[: max_tokens * 4]  # emulate truncation at max_output_tokens
+        return self._response(text, contents)
+
+    def _respond_stream(self, model, contents, config):
+        delay, code = self._draw()
+        text = self.responder(contents)
+        n_chunks = max(1, math.ceil(len(text) / self.chunk_chars))
+        # first chunk arrives after a third of the latency, the rest spread evenly
+        self._sleep(delay / 3)
+        if code is not None:
+            raise FakeAPIError(code)
+        for i in range(n_chunks):
+            if i:
+                self._sleep(delay * 2 / 3 / n_chunks)
+            yield self._response(text[i * self.chunk_chars:(i + 1) * self.chunk_chars], contents)
@@ -0,0 +1,198 @@
+# ingest_cli.py
+"""
+Headless bulk JD ingestion.
+
+    python ingest_cli.py ./jds --workers 4 --rpm 60
+
+Every TXT/PDF/DOCX file in the directory goes through
+extract -> skills -> questions -> save. Progress is checkpointed in
+jd_prep.db (ingest_checkpoints), so re-running the same command after an
+interruption skips files that were already ingested.
+"""
+import argparse
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import db_skeleton as db
+import jd_logic as llm
+import doc_extract
+import telemetry
+
+STAGES = ("extract", "skills", "questions", "save")
+
+
+class RateLimiter:
+    """Spaces out calls so no more than `rpm` start in any minute."""
+
+    def __init__(self, rpm: float):
+        self.interval = 60.0 / rpm if rpm and rpm > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def find_jd_files(directory):
+    out = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if doc_extract.file_extension(name) in doc_extract.SUPPORTED_EXTENSIONS:
+                out.append(os.path.join(root, name))
+    return sorted(out)
+
+
+def ingest_file(path, conn, db_lock, limiter, top_k=6, num_questions=40, content_hash=""):
+    """Process one file and mark it done; returns (jd_id, {stage: seconds}, reuse_stats)."""
+    timings = {}
+
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        data = f.read()
+    extracted = doc_extract.extract_text(os.path.basename(path), data)
+    for note in extracted.notes:
+        print(f"TRUNCATED {path}: {note}")
+    jd_text = extracted.text
+    timings["extract"] = time.perf_counter() - t0
+    if not jd_text.strip():
+        raise ValueError("No text extracted")
+
+    title = os.path.splitext(os.path.basename(path))[0]
+
+    t0 = time.perf_counter()
+    limiter.acquire()
+    parsed = llm.call_llm_for_skills(jd_text, top_k=top_k)
+    timings["skills"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with db_lock:
+        plan = llm.questions_from_bank(conn, parsed.get("skills", []), num_questions)
+    if llm.plan_needs_llm(plan):
+        limiter.acquire()
+    questions, reuse = llm.fill_question_plan(title, plan, num_questions)
+    timings["questions"] = time.perf_counter() - t0
+
+    def _done(c, jd_id):
+        # the JD, its questions and the "done" checkpoint commit together
+        db.set_checkpoint(c, path, content_hash, "done", jd_id=jd_id, commit=False)
+
+    t0 = time.perf_counter()
+    with db_lock:
+        jd_id = db.save_jd(conn, title, jd_text, parsed.get("skills", []), parsed.get("domain", ""),
+                           parsed.get("seniority", ""), parsed.get("summary", ""),
+                           questions=questions, before_commit=_done)
+    timings["save"] = time.perf_counter() - t0
+    return jd_id, timings, reuse
+
+
+def run_ingest(directory, conn, workers=4, rpm=60, top_k=6, num_questions=40, force=False):
+    """Ingest every supported file under directory. Returns a summary dict."""
+    db_lock = threading.Lock()
+    limiter = RateLimiter(rpm)
+    stage_times = defaultdict(list)
+    counts = {"done": 0, "failed": 0, "skipped": 0}
+    reused_total = generated_total = 0
+
+    todo = []
+    for path in find_jd_files(directory):
+        with open(path, "rb") as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+        cp = db.get_checkpoint(conn, path)
+        if not force and cp and cp["status"] == "done" and cp["content_hash"] == content_hash:
+            counts["skipped"] += 1
+            continue
+        db.set_checkpoint(conn, path, content_hash, "pending")
+        todo.append((path, content_hash))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(ingest_file, path, conn, db_lock, limiter, top_k, num_questions, h): (path, h)
+            for path, h in todo
+        }
+        for fut in as_completed(futures):
+            path, content_hash = futures[fut]
+            try:
+                jd_id, timings, reuse = fut.result()
+            except Exception as e:
+                print(f"FAILED {path}: {e}")
+                with db_lock:
+                    db.set_checkpoint(conn, path, content_hash, "failed", error=str(e))
+                counts["failed"] += 1
+                continue
+            for stage, secs in timings.items():
+                stage_times[stage].append(secs)
+            counts["done"] += 1
+            reused_total += reuse["reused"]
+            generated_total += reuse["generated"]
+            print(f"OK {path} -> jd_id={jd_id} (reuse {reuse['reuse_ratio']:.0%})")
+    elapsed = time.perf_counter() - started
+
+    return {
+        **counts,
+        "elapsed_s": elapsed,
+        "jds_per_min": (counts["done"] / elapsed * 60.0) if elapsed > 0 else 0.0,
+        "reuse_ratio": (reused_total / (reused_total + generated_total)) if (reused_total + generated_total) else 0.0,
+        "stages": {
+            stage: {"p50": percentile(stage_times[stage], 50), "p95": percentile(stage_times[stage], 95)}
+            for stage in STAGES
+        },
+    }
+
+
+def print_summary(summary):
+    print("")
+    print(f"Ingested: {summary['done']}  failed: {summary['failed']}  skipped (checkpointed): {summary['skipped']}")
+    print(f"Elapsed: {summary['elapsed_s']:.1f}s  throughput: {summary['jds_per_min']:.1f} JDs/min")
+    print(f"Question bank reuse: {summary['reuse_ratio']:.0%}")
+    print(f"{'stage':<10} {'p50 (s)':>9} {'p95 (s)':>9}")
+    for stage, p in summary["stages"].items():
+        print(f"{stage:<10} {p['p50']:>9.2f} {p['p95']:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory of JD files.")
+    parser.add_argument("directory", help="Directory containing TXT/PDF/DOCX job descriptions")
+    parser.add_argument("--db", default=db.DB_PATH, help="SQLite database path")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent files in flight")
+    parser.add_argument("--rpm", type=float, default=60, help="Max LLM requests per minute (0 = unlimited)")
+    parser.add_argument("--top-k", type=int, default=6, help="Top skills to extract")
+    parser.add_argument("--questions", type=int, default=40, help="Questions per JD")
+    parser.add_argument("--model", default=None,
+                        help=f"Gemini model for every call (default: per-route tiers, else {llm.DEFAULT_MODEL})")
+    parser.add_argument("--force", action="store_true", help="Re-ingest files already checkpointed as done")
+    args = parser.parse_args(argv)
+
+    if llm.configure_llm(model=args.model) is None:
+        return 1
+    conn = db.init_db(args.db)
+    telemetry.get_writer(args.db)  # metrics go to the same database
+    summary = run_ingest(args.directory, conn, workers=args.workers, rpm=args.rpm,
+                         top_k=args.top_k, num_questions=args.questions, force=args.force)
+    print_summary(summary)
+    return 0 if summary["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+# jd_compact.py
+"""
+JD text compaction before it is spliced into an LLM prompt.
+
+Pasted JDs and PDF extractions carry a lot of text the model does not need:
+whitespace runs, page headers/footers repeated on every page, and EEO /
+benefits / privacy boilerplate. compact_jd strips those and trims the rest
+to a token budget, dropping the least useful sections first. Only the prompt
+is compacted; the stored JD is untouched.
+"""
+import math
+import re
+import threading
+
+DEFAULT_TOKEN_BUDGET = 2000
+CHARS_PER_TOKEN = 4  # rough average for English text with Gemini/GPT tokenizers
+
+# Section headings whose whole section is dropped
+BOILERPLATE_HEADINGS = re.compile(
+    r"^(benefits|perks|perks (and|&) benefits|what we offer|why (join|work with) us|compensation( and benefits)?|"
+    r"equal (employment )?opportunity.*|eeo( statement)?|diversity (and|&) inclusion|"
+    r"accommodations?|privacy( notice| policy)?|how to apply|disclaimer)\s*:?$",
+    re.IGNORECASE,
+)
+# Paragraphs dropped wherever they appear
+BOILERPLATE_PHRASES = re.compile(
+    r"equal opportunity employer|without regard to (race|age|sex|gender)|reasonable accommodation|"
+    r"e-verify|applicant privacy|protected veteran|all qualified applicants will receive",
+    re.IGNORECASE,
+)
+# Known section headings; any heading-shaped line also ends a dropped section
+SECTION_HEADINGS = re.compile(
+    r"^(about (the )?(role|job|team|you|company|us)|responsibilities|what you('ll| will) do|requirements|"
+    r"qualifications|(minimum|preferred|basic) qualifications|skills|nice to have|must have|"
+    r"who you are|the role|role overview|job description|overview|summary|experience)\s*:?$",
+    re.IGNORECASE,
+)
+# Budget trim order: company/overview sections go before anything else,
+# requirements and responsibilities last (they often close the JD)
+LOW_VALUE_SECTIONS = re.compile(
+    r"^#*\s*(about (the )?(company|us|team)|overview|summary|job description|who we are|our (story|mission|culture))\b",
+    re.IGNORECASE,
+)
+HIGH_VALUE_SECTIONS = re.compile(
+    r"^#*\s*(responsibilities|what you('ll| will) do|requirements|(minimum |preferred |basic )?qualifications|"
+    r"skills|must have|nice to have|experience|tech stack|who you are)\b",
+    re.IGNORECASE,
+)
+# Page headers/footers: dropped on every repeat, even when heading-shaped
+FOOTER_LINE = re.compile(r"\bpage \d+\b|\||©|copyright|confidential|https?://", re.IGNORECASE)
+
+_lock = threading.Lock()
+STATS = {"jds": 0, "original_tokens": 0, "compacted_tokens": 0}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (no tokenizer call)."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def _normalize_line(line: str) -> str:
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def _is_heading(line: str) -> bool:
+    return len(line) <= 60 and len(line.split()) <= 6
+
+
+def _starts_section(line: str) -> bool:
+    """A heading-shaped line: short, not a bullet, and a known heading, capitalized, or ending in a colon."""
+    if not _is_heading(line) or line[0] in "-*•·":
+        return False
+    return (bool(SECTION_HEADINGS.match(line)) or line.endswith(":") or line.startswith("#")
+            or (line.isupper() and len(line) > 3))
+
+
+def _is_repeat_candidate(line: str) -> bool:
+    """Header/footer-shaped: page markers anywhere, or a long non-bullet, non-heading line."""
+    if FOOTER_LINE.search(line):
+        return True
+    return line[0] not in "-*•·" and not _starts_section(line) and len(line.split()) >= 4
+
+
+def _section_value(heading) -> int:
+    if heading is None:
+        return 1  # text before the first heading: title and intro
+    if HIGH_VALUE_SECTIONS.match(heading):
+        return 2
+    if LOW_VALUE_SECTIONS.match(heading):
+        return 0
+    return 1
+
+
+def _trim_sections(sections, budget_chars):
+    """Trim lowest-value sections first (later ones first among equals), from their tail."""
+    used = sum(len(l) + 1 for _, lines in sections for l in lines)
+    order = sorted(range(len(sections)), key=lambda i: (_section_value(sections[i][0]), -i))
+    for i in order:
+        if used <= budget_chars:
+            break
+        lines = sections[i][1]
+        while used > budget_chars and lines:
+            used -= len(lines.pop()) + 1
+        while lines and (lines[-1] == "" or lines == [sections[i][0]]):
+            used -= len(lines.pop()) + 1  # trailing blanks, or a heading without its body
+
+
+def compact_jd(text: str, max_tokens: int = DEFAULT_TOKEN_BUDGET) -> dict:
+    """
+    Returns {"text", "original_tokens", "compacted_tokens"}.
+
+    Steps: normalize whitespace, split into sections at headings, drop
+    boilerplate sections and paragraphs and repeated page headers/footers,
+    then trim the lowest-value sections until max_tokens is met.
+    """
+    original_tokens = estimate_tokens(text)
+    lines = [_normalize_line(l) for l in (text or "").splitlines()]
+
+    seen = set()
+    sections = [[None, []]]  # [heading or None, lines]
+    skipping = False
+    for line in lines:
+        out = sections[-1][1]
+        if not line:
+            if out and out[-1] != "":
+                out.append("")
+            continue
+        # headings first, so a repeated heading still ends a boilerplate section
+        if _is_heading(line) and BOILERPLATE_HEADINGS.match(line):
+            skipping = True
+            continue
+        if _starts_section(line) and not FOOTER_LINE.search(line):
+            skipping = False
+            sections.append([line, [line]])
+            continue
+        if skipping or BOILERPLATE_PHRASES.search(line):
+            continue
+        if _is_repeat_candidate(line):
+            key = line.casefold()
+            if key in seen:
+                continue  # repeated header/footer
+            seen.add(key)
+        out.append(line)
+
+    budget_chars = max_tokens * CHARS_PER_TOKEN if max_tokens else None
+    if budget_chars is not None:
+        _trim_sections(sections, budget_chars)
+    compacted = "\n".join(l for _, out in sections for l in out).strip()
+    compacted = re.sub(r"\n{3,}", "\n\n", compacted)
+    if not compacted and (text or "").strip():
+        # never hand the model an empty JD because of over-eager filtering
+        compacted = _normalize_line(text)[: budget_chars or None]
+
+    result = {
+        "text": compacted,
+        "original_tokens": original_tokens,
+        "compacted_tokens": estimate_tokens(compacted),
+    }
+    with _lock:
+        STATS["jds"] += 1
+        STATS["original_tokens"] += result["original_tokens"]
+        STATS["compacted_tokens"] += result["compacted_tokens"]
+    return result
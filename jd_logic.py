@@ -1,33 +1,53 @@
+import os
+import queue
+import threading
 from typing import Any, List, Dict
-from llm_core import configure_llm, _genai_generate, _parse_json_from_text, DEFAULT_MODEL
+from concurrent.futures import ThreadPoolExecutor
+import db_skeleton as db
+from db_pool import read_conn, write_conn
+from llm_core import configure_llm, _genai_generate, _genai_generate_stream, _parse_json_from_text, DEFAULT_MODEL
+from json_stream import JSONArrayStream
+from jd_compact import compact_jd
+from extraction import ExtractionError, JDExtraction, Question, SCHEMA as EXTRACTION_SCHEMA, validate
+import telemetry
 import prompts  # <--- Make sure to import your prompts file
 
+# "two_call" (default): skills first, then per-skill question chunks filled
+# from the bank and streamed into the DB.
+# "single" (opt-in): one schema-constrained call returns skills, metadata and
+# questions; no bank reuse or incremental saves.
+EXTRACTION_MODE = os.getenv("JD_EXTRACTION_MODE", "two_call")
 
-def call_llm_for_skills(jd_text: str, top_k: int = 6):
-    prompt = f"""
-        Extract the top {top_k} skills, one-word domain, seniority, and 1–2 sentence summary
-        from the following job description:
 
-        {jd_text}
+class LLMOutputError(Exception):
+    """The model returned nothing usable and the caller asked for no fallback."""
 
-        Return ONLY JSON:
-        {{
-        "skills": [...],
-        "domain": "...",
-        "seniority": "...",
-        "summary": "..."
-        }}
-        """
-    raw = _genai_generate(prompt)
+
+def call_llm_for_skills(jd_text: str, top_k: int = 6, compact: bool = True, fallback: bool = True):
+    with telemetry.llm_call("skills") as rec:
+        if compact:
+            compacted = compact_jd(jd_text)
+            rec.update(jd_tokens_original=compacted["original_tokens"],
+                       jd_tokens_compacted=compacted["compacted_tokens"])
+            jd_text = compacted["text"]
+        return _call_llm_for_skills(jd_text, top_k, rec, fallback)
+
+def _call_llm_for_skills(jd_text, top_k, rec, fallback=True):
+    prompt = prompts.get_skills_prompt(jd_text, top_k)
+    raw = _genai_generate(prompt, route="skills")
 
     try:
         parsed = _parse_json_from_text(raw)
         if isinstance(parsed, dict):
+            rec["parse_status"] = "ok"
             return parsed
     except:
         pass
 
     # LAST-RESORT fallback (never breaks)
+    rec["parse_status"] = "fallback"
+    if not fallback:
+        raise LLMOutputError("skills response could not be parsed")
     return {
         "skills": ["Skill A", "Skill B", "Skill C"][:top_k],
         "domain": "general",
@@ -35,32 +55,327 @@ def call_llm_for_skills(jd_text: str, top_k: int = 6):
         "summary": "Summary unavailable due to model error."
     }
 
-def call_llm_for_questions(jd_title, skills):
-    prompt = f"""
-    Generate 40 interview questions for the role: {jd_title}
-    The skills to target are: {", ".join(skills)}
+def _questions_prompt(jd_title, skills, num_questions):
+    return prompts.get_questions_prompt(jd_title, skills, num_questions)
+
+def call_llm_for_questions(jd_title, skills, num_questions=40, fallback=True):
+    prompt = _questions_prompt(jd_title, skills, num_questions)
+    with telemetry.llm_call("questions") as rec:
+        raw = _genai_generate(prompt, route="questions")
+        try:
+            parsed = _parse_json_from_text(raw)
+            if isinstance(parsed, list):
+                rec["parse_status"] = "ok"
+                return parsed
+        except:
+            pass
+
+        # fallback
+        rec["parse_status"] = "fallback"
+        if not fallback:
+            raise LLMOutputError("questions response could not be parsed")
+        return _fallback_questions(skills)
 
-    Return ONLY JSON list:
-    [
-    {{"skill": "...", "qtype": "...", "prompt": "..."}},
-    ...
-    ]
+
+def stream_questions(jd_title, skills, num_questions=40, fallback=True):
+    """
+    Streaming variant of call_llm_for_questions: yields each question dict
+    as soon as its object closes in the model output. If the stream yields
+    nothing usable, the same fallback questions are yielded instead (or
+    LLMOutputError is raised with fallback=False).
     """
-    raw = _genai_generate(prompt)
+    prompt = _questions_prompt(jd_title, skills, num_questions)
+    parser = JSONArrayStream()
+    produced = 0
+    # record built here, not with telemetry.llm_call, whose context would
+    # stay set across the yields
+    rec = {"call_site": "questions_stream"}
+    stream = _genai_generate_stream(prompt, route="questions", rec=rec)
     try:
-        parsed = _parse_json_from_text(raw)
-        if isinstance(parsed, list):
-            return parsed
-    except:
-        pass
+        for chunk in stream:
+            for item in parser.feed(chunk):
+                if isinstance(item, dict):
+                    produced += 1
+                    yield item
+        if parser.truncated:
+            print(f"QUESTION STREAM TRUNCATED: kept {produced} complete questions")
+        rec["parse_status"] = "ok" if produced else "fallback"
+    finally:
+        stream.close()
+        telemetry.emit(rec)
+    if produced == 0:
+        if not fallback:
+            raise LLMOutputError("question stream had no complete questions")
+        yield from _fallback_questions(skills)
+
+def call_llm_for_extraction(jd_title, jd_text, top_k=6, num_questions=40, compact=True, fallback=True):
+    """
+    Single round trip: skills, domain, seniority, summary and questions from
+    one JSON-mode call constrained by extraction.SCHEMA. Returns a
+    JDExtraction; on an unusable response, the same fallback skills and
+    questions as the two-call path (or LLMOutputError with fallback=False).
+    """
+    with telemetry.llm_call("extract") as rec:
+        if compact:
+            compacted = compact_jd(jd_text)
+            rec.update(jd_tokens_original=compacted["original_tokens"],
+                       jd_tokens_compacted=compacted["compacted_tokens"])
+            jd_text = compacted["text"]
+        prompt = prompts.get_extraction_prompt(jd_title, jd_text, top_k, num_questions)
+        raw = _genai_generate(prompt, route="extract", response_schema=EXTRACTION_SCHEMA)
+        try:
+            result = validate(_parse_json_from_text(raw), top_k, num_questions)
+            rec["parse_status"] = "ok"
+            return result
+        except ValueError as e:  # includes ExtractionError
+            print("EXTRACTION PARSE ERROR:", e)
+
+        rec["parse_status"] = "fallback"
+        if not fallback:
+            raise LLMOutputError("extraction response could not be parsed")
+        skills = ["Skill A", "Skill B", "Skill C"][:top_k]
+        return JDExtraction(
+            skills=skills, domain="general", seniority="mid",
+            summary="Summary unavailable due to model error.",
+            questions=[Question(**q) for q in _fallback_questions(skills)],
+        )
 
-    # fallback
+def _fallback_questions(skills):
     out = []
     for s in skills[:5]:
         out.append({"skill": s, "qtype": "technical", "prompt": f"What is {s}?"})
         out.append({"skill": s, "qtype": "behavioral", "prompt": f"Describe a time you used {s}."})
     return out
 
+def _split_question_budget(skills, num_questions):
+    """Spread num_questions over the skills, earlier skills get the remainder."""
+    base, extra = divmod(num_questions, len(skills))
+    return [base + (1 if i < extra else 0) for i in range(len(skills))]
+
+def _reuse_stats(reused, generated):
+    total = reused + generated
+    return {"reused": reused, "generated": generated, "reuse_ratio": (reused / total) if total else 0.0}
+
+def questions_from_bank(conn, skills, num_questions=40):
+    """
+    Split the question budget over skills and fill it from the stored bank.
+    Returns [(skill, reused_questions, missing_count), ...] in skill order.
+    """
+    if not skills:
+        return []
+    plan = []
+    with read_conn(conn) as rconn:
+        for skill, n in zip(skills, _split_question_budget(skills, num_questions)):
+            if n <= 0:
+                continue
+            reused = [
+                {"skill": skill, "qtype": q["qtype"], "prompt": q["prompt"]}
+                for q in db.get_bank_questions(rconn, skill, n)
+            ]
+            plan.append((skill, reused, n - len(reused)))
+    return plan
+
+def plan_needs_llm(plan) -> bool:
+    return not plan or any(missing > 0 for _, _, missing in plan)
+
+def fill_question_plan(title, plan, num_questions=40):
+    """
+    Complete a questions_from_bank plan with one LLM call scoped to only the
+    skills the bank cannot cover. Returns (questions, reuse_stats).
+    """
+    if not plan:
+        generated = call_llm_for_questions(title, [], num_questions=num_questions)
+        return generated, _reuse_stats(0, len(generated))
+    reused = [q for _, qs, _ in plan for q in qs]
+    missing_skills = [skill for skill, _, missing in plan if missing > 0]
+    missing_total = sum(missing for _, _, missing in plan)
+    generated = []
+    if missing_total:
+        generated = call_llm_for_questions(title, missing_skills, num_questions=missing_total)
+    return reused + generated, _reuse_stats(len(reused), len(generated))
+
+def generate_questions_with_bank(conn, title, skills, num_questions=40):
+    """Bank-first question generation. Returns (questions, reuse_stats)."""
+    return fill_question_plan(title, questions_from_bank(conn, skills, num_questions), num_questions)
+
+def run_jd_pipeline(conn, title, jd_text, top_k=6, num_questions=40, max_workers=4, on_progress=None,
+                    reuse_bank=True, mode="two_call"):
+    """
+    Skills -> (save JD || per-skill question chunks) -> streamed question writes.
+
+    Question generation is fanned out one streamed chunk per skill on a
+    thread pool as soon as the skills come back, while the JD row is written
+    on this thread. Questions are saved as they arrive, but always in skill
+    order, so the stored question ids are deterministic (see
+    save_question_chunks). DB writes stay on the calling thread.
+
+    With reuse_bank, each chunk is first filled from questions already stored
+    for that skill; the LLM is only asked for the shortfall, and fully
+    covered skills make no call at all.
+
+    conn may be a sqlite3 connection or a db_pool.ConnectionPool; with a
+    pool, the writer is only held for the individual writes.
+    on_progress(done, total) is called after each chunk is saved.
+    mode="single" replaces all of the above with one call_llm_for_extraction
+    round trip (no bank reuse).
+    Returns (jd_id, parsed_skills, questions, reuse_stats).
+    """
+    if mode == "single":
+        extracted = call_llm_for_extraction(title, jd_text, top_k=top_k, num_questions=num_questions)
+        parsed, questions = extracted.metadata(), extracted.question_dicts()
+        with write_conn(conn) as wconn:
+            # JD and questions in one transaction
+            jd_id = db.save_jd(wconn, title, jd_text, extracted.skills, extracted.domain,
+                               extracted.seniority, extracted.summary, questions=questions)
+        if on_progress:
+            on_progress(1, 1)
+        return jd_id, parsed, questions, _reuse_stats(0, len(questions))
+
+    parsed = call_llm_for_skills(jd_text, top_k=top_k)
+    skills = [s for s in parsed.get("skills", []) if str(s).strip()]
+
+    if not skills:
+        with write_conn(conn) as wconn:
+            jd_id = db.save_jd(wconn, title, jd_text, [], parsed.get("domain", ""),
+                               parsed.get("seniority", ""), parsed.get("summary", ""))
+        questions = call_llm_for_questions(title, skills, num_questions=num_questions)
+        with write_conn(conn) as wconn:
+            db.save_questions(wconn, jd_id, questions)
+        if on_progress:
+            on_progress(1, 1)
+        return jd_id, parsed, questions, _reuse_stats(0, len(questions))
+
+    if reuse_bank:
+        chunks = questions_from_bank(conn, skills, num_questions)
+    else:
+        chunks = [(s, [], n) for s, n in zip(skills, _split_question_budget(skills, num_questions)) if n > 0]
+    reused_count = sum(len(reused) for _, reused, _ in chunks)
+
+    def _save_jd():
+        with write_conn(conn) as wconn:
+            return db.save_jd(wconn, title, jd_text, skills, parsed.get("domain", ""),
+                              parsed.get("seniority", ""), parsed.get("summary", ""))
+
+    jd_id, questions, generated_count = save_question_chunks(
+        conn, title, _save_jd, chunks, max_workers=max_workers, on_progress=on_progress
+    )
+    return jd_id, parsed, questions, _reuse_stats(reused_count, generated_count)
+
+
+_CHUNK_DONE = object()
+
+def save_question_chunks(conn, title, jd_id, chunks, max_workers=4, start=0, saved=0, before_commit=None,
+                         on_progress=None, fallback=True):
+    """
+    Stream the shortfall of each (skill, reused, missing) chunk with
+    stream_questions on a thread pool and save the questions as they arrive,
+    but always in plan order: the first unfinished chunk is written question
+    by question, later chunks are buffered until every chunk before them is
+    complete, so the stored question ids follow skill order. DB writes stay
+    on the calling thread; questions that arrive together share one write.
+
+    jd_id is the JD's id, or a callable returning it; a callable runs after
+    the chunks are submitted, so the JD write overlaps generation.
+    Chunks before `start` are already saved, and so are the first `saved`
+    questions of chunk `start` (a job resumed mid-chunk).
+    before_commit(i, n, done, conn) runs inside every write for chunk i:
+    n of its questions are stored once it commits, done marks the last one.
+    on_progress(done, total) is called after each chunk is complete.
+    With fallback=False a chunk whose output is unusable raises instead of
+    being replaced by fallback questions.
+    Returns (jd_id, saved_questions, generated_count).
+    """
+    events = queue.Queue()
+    stop = threading.Event()
+    pending = {}        # chunk index -> questions received but not saved yet
+    finished = set()
+    generated = {}
+    questions = []
+    head, head_saved = start, saved
+
+    def _stream(i, skill, missing):
+        try:
+            for q in stream_questions(title, [skill] if skill else [], num_questions=missing, fallback=fallback):
+                if stop.is_set():
+                    return  # closes the stream
+                events.put((i, q))
+        except Exception as e:
+            events.put((i, e))
+        else:
+            events.put((i, _CHUNK_DONE))
+
+    def _receive(i, item):
+        if item is _CHUNK_DONE:
+            finished.add(i)
+        elif isinstance(item, Exception):
+            if not fallback:
+                _flush()  # keep what arrived before the error
+                raise item
+            print("QUESTION CHUNK ERROR:", item)
+            if not generated[i]:
+                fb = _fallback_questions([chunks[i][0]] if chunks[i][0] else [])
+                pending[i].extend(fb)
+                generated[i] = len(fb)
+            finished.add(i)
+        elif isinstance(item, dict):
+            pending[i].append(item)
+            generated[i] += 1
+
+    def _flush():
+        nonlocal head, head_saved
+        # Save what has arrived for the head chunk; move on once it is complete
+        while head < len(chunks):
+            batch, done = pending[head], head in finished
+            if not batch and not done:
+                return
+            pending[head] = []
+            n = head_saved + len(batch)
+            hook = (lambda c, i=head, n=n, done=done: before_commit(i, n, done, c)) if before_commit else None
+            with write_conn(conn) as wconn:
+                db.save_questions(wconn, jd_id, batch, before_commit=hook)
+            questions.extend(batch)
+            head_saved = n
+            if not done:
+                return
+            head, head_saved = head + 1, 0
+            if on_progress:
+                on_progress(head, len(chunks))
+
+    todo = []
+    for i, (skill, reused, missing) in enumerate(chunks[start:], start):
+        if i == start and saved:
+            # reused questions are saved first, then the generated ones
+            reused, missing = reused[saved:], missing - max(0, saved - len(reused))
+        pending[i], generated[i] = list(reused), 0
+        if missing > 0:
+            todo.append((i, skill, missing))
+        else:
+            finished.add(i)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(todo)))) as pool:
+        for args in todo:
+            pool.submit(_stream, *args)
+
+        if callable(jd_id):
+            jd_id = jd_id()
+
+        try:
+            _flush()
+            while head < len(chunks):
+                i, item = events.get()
+                while True:
+                    _receive(i, item)
+                    try:
+                        i, item = events.get_nowait()
+                    except queue.Empty:
+                        break
+                _flush()
+        except BaseException:
+            stop.set()
+            raise
+
+    return jd_id, questions, sum(generated.values())
+
 
 def generate_answer(question_text: str) -> str:
     """Generates a sample answer for a specific question."""
@@ -68,6 +383,18 @@ def generate_answer(question_text: str) -> str:
     prompt = prompts.get_answer_prompt(question_text)
     
     # We reuse the existing generation function
-    response = _genai_generate(prompt)
-    print(response)
-    return response
\ No newline at end of file
+    with telemetry.llm_call("answer"):
+        response = _genai_generate(prompt, route="answer")
+    return response
+
+
+def generate_answer_stream(question_text: str):
+    """Streams a sample answer for a question, chunk by chunk."""
+    prompt = prompts.get_answer_prompt(question_text)
+    rec = {"call_site": "answer_stream"}
+    stream = _genai_generate_stream(prompt, route="answer", rec=rec)
+    try:
+        yield from stream
+    finally:
+        stream.close()
+        telemetry.emit(rec)
@@ -0,0 +1,382 @@
+# jobs.py
+"""
+Durable background queue for JD processing.
+
+The upload view only enqueues a job row; worker threads (in the Streamlit
+process, or a separate `python jobs.py` process) claim jobs and run the
+pipeline, so a browser refresh no longer kills an extraction half way.
+
+A JD job runs in stages, each checkpointed in jobs.state:
+
+  skills    - LLM skill extraction, result kept in state["parsed"]
+              (mode "single": one extraction call that also returns the
+              questions, kept in state["extracted_questions"])
+  save_jd   - JD row written once; jobs.jd_id is recorded in the same
+              transaction
+  plan      - bank reuse plan fixed in state["plan"]
+  questions - one streamed chunk per skill (jd_logic.save_question_chunks),
+              saved question by question in plan order; every write commits
+              with the count of saved questions (state["done_chunks"],
+              state["chunk_saved"]), so progress is per question
+
+so a retried or reclaimed job resumes where it stopped without duplicating
+rows or repeating paid LLM calls. Workers hold a lease that is renewed at
+every checkpoint; a job whose worker died is picked up again once the lease
+expires. Failed attempts are retried with exponential backoff. Fallback
+placeholders are never saved: unusable LLM output fails the attempt. Without
+an LLM client (no API key, failed init) a job is put back without using up
+an attempt.
+
+Separate worker process:
+
+    python jobs.py --db jd_prep.db --workers 4
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import db_skeleton as db
+import db_pool
+import jd_logic
+import llm_core
+import telemetry
+from db_pool import read_conn, write_conn
+
+MAX_ATTEMPTS = 3
+LEASE_SECONDS = 300
+RETRY_BASE = 5.0        # seconds; doubled per failed attempt
+POLL_INTERVAL = 1.0
+UNAVAILABLE_RETRY = 30.0   # seconds before a job deferred for a missing LLM client is tried again
+CHUNK_WORKERS = 4
+ACTIVE = ("queued", "running")
+
+_COLS = ["id", "kind", "status", "payload", "state", "stage", "progress_done", "progress_total", "attempts",
+         "max_attempts", "run_after", "lease_until", "locked_by", "jd_id", "result", "error", "created_at",
+         "updated_at"]
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class LeaseLost(Exception):
+    """Another worker reclaimed the job after our lease expired."""
+
+
+class LLMUnavailable(Exception):
+    """No LLM client to run the job with; it waits without using an attempt."""
+
+
+def _require_llm():
+    if llm_core.LLM_CLIENT is None and llm_core.configure_llm() is None:
+        raise LLMUnavailable("LLM client is not configured (check GEMINI_API_KEY)")
+
+
+def _now_iso():
+    return datetime.utcnow().isoformat()
+
+
+def _row(r):
+    if r is None:
+        return None
+    job = dict(zip(_COLS, r))
+    job["payload"] = json.loads(job["payload"])
+    job["state"] = json.loads(job["state"] or "{}")
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+# --- Queue operations ---
+def enqueue_jd(conn, title: str, jd_text: str, top_k: int = 6, num_questions: int = 40,
+               prefetch_answers: bool = False, mode: str = None, max_attempts: int = MAX_ATTEMPTS) -> int:
+    """Queue a JD for processing; returns the job id. mode defaults to jd_logic.EXTRACTION_MODE."""
+    payload = {"title": title, "jd_text": jd_text, "top_k": top_k, "num_questions": num_questions,
+               "prefetch_answers": prefetch_answers, "mode": mode or jd_logic.EXTRACTION_MODE}
+    now = _now_iso()
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO jobs (kind, status, payload, max_attempts, run_after, created_at, updated_at) "
+            "VALUES ('jd', 'queued', ?, ?, 0, ?, ?)",
+            (json.dumps(payload), max_attempts, now, now),
+        )
+    _notify()
+    return cur.lastrowid
+
+
+def get_job(conn, job_id: int):
+    cur = conn.execute(f"SELECT {', '.join(_COLS)} FROM jobs WHERE id = ?", (job_id,))
+    return _row(cur.fetchone())
+
+
+def list_jobs(conn, limit: int = 20, active_only: bool = False):
+    """Most recent jobs first."""
+    where = "WHERE status IN ('queued', 'running')" if active_only else ""
+    cur = conn.execute(f"SELECT {', '.join(_COLS)} FROM jobs {where} ORDER BY id DESC LIMIT ?", (limit,))
+    return [_row(r) for r in cur.fetchall()]
+
+
+def cancel_job(conn, job_id: int) -> bool:
+    """Cancel a queued or running job; a running job stops at its next checkpoint."""
+    with conn:
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', updated_at = ? WHERE id = ? AND status IN ('queued', 'running')",
+            (_now_iso(), job_id),
+        )
+    return cur.rowcount > 0
+
+
+def claim_job(conn, worker_id: str, now: float = None, lease: float = LEASE_SECONDS):
+    """
+    Atomically take the next runnable job: queued and due, or running with an
+    expired lease (its worker died). Returns the job dict or None.
+    """
+    now = time.time() if now is None else now
+    with conn:
+        # expired leases with no attempts left will never succeed
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = coalesce(error, 'worker lost'), updated_at = ? "
+            "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+            (_now_iso(), now),
+        )
+        cur = conn.execute(
+            f"""
+            UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_by = ?, lease_until = ?, updated_at = ?
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE (status = 'queued' AND run_after <= ?) OR (status = 'running' AND lease_until < ?)
+                ORDER BY id LIMIT 1
+            )
+            RETURNING {', '.join(_COLS)}
+            """,
+            (worker_id, now + lease, _now_iso(), now, now),
+        )
+        row = cur.fetchone()
+    return _row(row)
+
+
+def _checkpoint(conn, job, worker_id, commit=True, **fields):
+    """
+    Persist job fields (state is re-serialized) and renew the lease. With
+    commit=False the UPDATE joins the caller's transaction. Raises
+    JobCancelled / LeaseLost if the job is no longer ours.
+    """
+    fields["state"] = json.dumps(job["state"])
+    fields["lease_until"] = time.time() + LEASE_SECONDS
+    fields["updated_at"] = _now_iso()
+    sets = ", ".join(f"{k} = ?" for k in fields)
+    cur = conn.execute(
+        f"UPDATE jobs SET {sets} WHERE id = ? AND status = 'running' AND locked_by = ?",
+        (*fields.values(), job["id"], worker_id),
+    )
+    if cur.rowcount == 0:
+        conn.rollback()
+        (status,) = conn.execute("SELECT status FROM jobs WHERE id = ?", (job["id"],)).fetchone()
+        if status == "cancelled":
+            raise JobCancelled(job["id"])
+        raise LeaseLost(job["id"])
+    if commit:
+        conn.commit()
+
+
+def _finish(conn, job, worker_id, status, **fields):
+    fields.update(status=status, lease_until=None, updated_at=_now_iso())
+    sets = ", ".join(f"{k} = ?" for k in fields)
+    with conn:
+        conn.execute(f"UPDATE jobs SET {sets} WHERE id = ? AND locked_by = ? AND status = 'running'",
+                     (*fields.values(), job["id"], worker_id))
+
+
+# --- JD job stages ---
+def run_jd_job(pool, job, worker_id, chunk_workers=CHUNK_WORKERS):
+    """Run (or resume) a JD job's stages. Returns the result dict."""
+    p = job["payload"]
+    state = job["state"]
+    _require_llm()
+
+    single = p.get("mode") == "single"
+
+    if "parsed" not in state:
+        with write_conn(pool) as conn:
+            _checkpoint(conn, job, worker_id, stage="extract" if single else "skills")
+        if single:
+            extracted = jd_logic.call_llm_for_extraction(p["title"], p["jd_text"], top_k=p["top_k"],
+                                                         num_questions=p["num_questions"], fallback=False)
+            state["parsed"] = extracted.metadata()
+            state["extracted_questions"] = extracted.question_dicts()
+        else:
+            state["parsed"] = jd_logic.call_llm_for_skills(p["jd_text"], top_k=p["top_k"], fallback=False)
+        with write_conn(pool) as conn:
+            _checkpoint(conn, job, worker_id, stage="save_jd")
+    parsed = state["parsed"]
+    skills = [s for s in parsed.get("skills", []) if str(s).strip()]
+
+    if job["jd_id"] is None:
+        def _record(conn, jd_id):
+            # the JD row and the job's pointer to it commit together
+            job["jd_id"] = jd_id
+            _checkpoint(conn, job, worker_id, commit=False, jd_id=jd_id, stage="plan")
+
+        with write_conn(pool) as conn:
+            db.save_jd(conn, p["title"], p["jd_text"], skills, parsed.get("domain", ""),
+                       parsed.get("seniority", ""), parsed.get("summary", ""), before_commit=_record)
+    jd_id = job["jd_id"]
+
+    if "plan" not in state:
+        if single:
+            plan = [(None, state["extracted_questions"], 0)]  # already generated
+        elif skills:
+            plan = jd_logic.questions_from_bank(pool, skills, p["num_questions"])
+        else:
+            plan = [(None, [], p["num_questions"])]  # one unscoped chunk
+        state["plan"] = [list(c) for c in plan]
+        state["done_chunks"] = []
+        state["chunk_saved"] = 0    # questions of the first unfinished chunk already stored
+        state["saved"] = 0
+        with write_conn(pool) as conn:
+            _checkpoint(conn, job, worker_id, stage="questions",
+                        progress_total=sum(len(c[1]) + c[2] for c in plan))
+
+    plan = state["plan"]
+
+    def _questions_saved(i, n, done, conn):
+        # the checkpoint commits with the questions it counts
+        state["saved"] += n - state["chunk_saved"]
+        state["chunk_saved"] = 0 if done else n
+        if done:
+            state["done_chunks"].append(i)
+        _checkpoint(conn, job, worker_id, commit=False, progress_done=state["saved"])
+
+    # questions are saved strictly in plan order, so the done chunks are a
+    # prefix and a retry resumes inside the first unfinished one
+    jd_logic.save_question_chunks(pool, p["title"], jd_id, plan, max_workers=chunk_workers,
+                                  start=len(state["done_chunks"]), saved=state["chunk_saved"],
+                                  before_commit=_questions_saved, fallback=False)
+
+    if p.get("prefetch_answers"):
+        import answer_prefetch
+        answer_prefetch.get_prefetcher().prefetch(pool, jd_id)
+
+    with read_conn(pool) as conn:
+        total = db.count_questions_for_jd(conn, jd_id)
+    reused = 0 if single else sum(len(c[1]) for c in plan)
+    return {"jd_id": jd_id, "questions": total, "reuse": jd_logic._reuse_stats(reused, total - reused)}
+
+
+HANDLERS = {"jd": run_jd_job}
+
+
+def run_one(pool, worker_id) -> bool:
+    """Claim and run a single job. Returns False when nothing was runnable."""
+    with write_conn(pool) as conn:
+        job = claim_job(conn, worker_id)
+    if job is None:
+        return False
+    try:
+        result = HANDLERS[job["kind"]](pool, job, worker_id)
+    except (JobCancelled, LeaseLost):
+        return True
+    except LLMUnavailable as e:
+        print(f"JOB {job['id']} DEFERRED:", e)
+        with write_conn(pool) as conn:
+            _finish(conn, job, worker_id, "queued", error=str(e), attempts=job["attempts"] - 1,
+                    run_after=time.time() + UNAVAILABLE_RETRY)
+        return True
+    except Exception as e:
+        print(f"JOB {job['id']} ERROR (attempt {job['attempts']}/{job['max_attempts']}):", e)
+        # state is checkpointed whenever it changes; the in-memory copy may
+        # list a chunk whose save rolled back, so it is not written here
+        with write_conn(pool) as conn:
+            if job["attempts"] < job["max_attempts"]:
+                delay = RETRY_BASE * (2 ** (job["attempts"] - 1))
+                _finish(conn, job, worker_id, "queued", error=str(e), run_after=time.time() + delay)
+            else:
+                _finish(conn, job, worker_id, "failed", error=str(e))
+        return True
+    with write_conn(pool) as conn:
+        _finish(conn, job, worker_id, "done", result=json.dumps(result), error=None, stage="done")
+    return True
+
+
+# --- Workers ---
+_wake = threading.Event()
+
+def _notify():
+    _wake.set()
+
+
+class JobWorker:
+    """N threads that poll the queue until stop() is called."""
+
+    def __init__(self, pool, workers=2, poll_interval=POLL_INTERVAL):
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+        self.ids = [f"{os.getpid()}-{uuid.uuid4().hex[:8]}-{i}" for i in range(workers)]
+
+    def start(self):
+        for worker_id in self.ids:
+            t = threading.Thread(target=self._run, args=(worker_id,), name=f"job-worker-{worker_id}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def _run(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                if run_one(self.pool, worker_id):
+                    continue
+            except Exception as e:
+                print("JOB WORKER ERROR:", e)
+            _wake.wait(self.poll_interval)
+            _wake.clear()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        _wake.set()
+        for t in self._threads:
+            t.join(timeout)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def ensure_worker(pool, workers=None):
+    """
+    Start the in-process workers once per process. JOB_WORKERS=0 disables
+    them when a separate `python jobs.py` process does the work.
+    """
+    global _worker
+    if workers is None:
+        workers = int(os.getenv("JOB_WORKERS", "2"))
+    with _worker_lock:
+        if _worker is None and workers > 0:
+            llm_core.configure_llm()  # a resumed job must not run against a missing client
+            _worker = JobWorker(pool, workers).start()
+        return _worker
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run JD processing workers against the job queue.")
+    parser.add_argument("--db", default=db.DB_PATH, help="SQLite database path")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    llm_core.configure_llm()
+    telemetry.get_writer(args.db)  # metrics go to the same database
+    worker = JobWorker(db_pool.get_pool(args.db), args.workers).start()
+    print(f"Running {args.workers} job workers on {args.db} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# json_stream.py
+"""
+Incremental parser for JSON arrays arriving in chunks from the LLM.
+
+Feed text as it streams in; every element of the top-level array is
+returned as soon as its closing brace arrives. Prose before the array is
+skipped, including bracketed asides like "[Note: ...]": the array starts at
+a "[" followed by "{", "[", '"' or "]", and a candidate that closes with
+nothing but undecodable elements is dropped and the scan goes on. If the
+output is cut off (max_output_tokens) the elements that did complete are
+still available.
+
+    parser = JSONArrayStream()
+    for chunk in stream:
+        for item in parser.feed(chunk):
+            ...
+"""
+import json
+
+
+class JSONArrayStream:
+    """Yields the object/array elements of a top-level JSON array incrementally."""
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0          # next index of _buf to scan
+        self._depth = 0        # 0 = outside the top-level array
+        self._in_string = False
+        self._escape = False
+        self._elem_start = None
+        self.started = False   # saw the opening "["
+        self.done = False      # saw the matching "]"
+        self.items = []
+        self.errors = 0        # elements that closed but failed to decode
+
+    @property
+    def truncated(self) -> bool:
+        return self.started and not self.done
+
+    def feed(self, chunk: str):
+        """Consume a chunk and return the elements completed by it."""
+        if self.done or not chunk:
+            return []
+        self._buf += chunk
+        out = []
+        buf = self._buf
+        i = self._pos
+        n = len(buf)
+
+        while i < n:
+            c = buf[i]
+            if not self.started:
+                if c == "[":
+                    j = i + 1
+                    while j < n and buf[j].isspace():
+                        j += 1
+                    if j == n:
+                        break  # wait for the character after "["
+                    if buf[j] in '{["]':
+                        self.started = True
+                        self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                if self._depth == 1:
+                    self._elem_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._elem_start is not None:
+                    try:
+                        out.append(json.loads(buf[self._elem_start:i + 1]))
+                    except json.JSONDecodeError:
+                        self.errors += 1
+                    self._elem_start = None
+                elif self._depth == 0:
+                    if self.errors and not self.items and not out:
+                        # bracketed prose, not the answer: keep looking
+                        self.started = False
+                        i += 1
+                        continue
+                    self.done = True
+                    i += 1
+                    break
+            i += 1
+
+        # Drop consumed text so the buffer only holds the open element
+        keep = self._elem_start if self._elem_start is not None else i
+        self._buf = buf[keep:]
+        self._pos = i - keep
+        if self._elem_start is not None:
+            self._elem_start = 0
+
+        self.items.extend(out)
+        return out
+
+
+def parse_array_prefix(text: str):
+    """
+    Complete elements of the first JSON array in text, even if the array is
+    truncated. Returns None when no array starts in text.
+    """
+    parser = JSONArrayStream()
+    items = parser.feed(text or "")
+    return items if parser.started else None
@@ -0,0 +1,170 @@
+# llm_cache.py
+"""
+Content-addressed cache for LLM responses.
+
+Two tiers: an in-process LRU dict in front of a SQLite table, so repeated
+prompts are served without a Gemini round trip and survive Streamlit restarts.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_DB_PATH = "llm_cache.db"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MEMORY_ENTRIES = 256
+# Memory-tier hits refresh last_used in SQLite in batches, not per hit
+TOUCH_BATCH = 64
+TOUCH_INTERVAL = 30.0
+
+
+def make_key(model, prompt, temperature, max_output_tokens, **config) -> str:
+    """
+    Stable hash of everything that affects the model output: model, prompt and
+    the whole generation config (response_schema, MIME type, thinking budget...).
+    """
+    params = [model, prompt, float(temperature), int(max_output_tokens)]
+    config = {k: v for k, v in config.items() if v is not None}
+    if config:
+        params.append(config)
+    payload = json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path=CACHE_DB_PATH, ttl=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES, memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._mem = OrderedDict()  # key -> (created_at, text)
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last memory hit not yet written to SQLite
+        self._touch_flushed = time.time()
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+        self.conn.commit()
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key):
+        """Return the cached text for key, or None on miss/expiry."""
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._mem.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    self._touch(key, now)
+                    return entry[1]
+                del self._mem[key]
+
+            row = self.conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            text, created_at = row
+            if self._expired(created_at, now):
+                self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.conn.commit()
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self._remember(key, created_at, text)
+            self.hits += 1
+            return text
+
+    def put(self, key, text, model=None):
+        """Store a response. Empty responses (API errors) are never cached."""
+        if not text:
+            return
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, text, now, now),
+            )
+            self._evict(now)
+            self.conn.commit()
+            self._remember(key, now, text)
+
+    def _touch(self, key, now):
+        self._touched[key] = now
+        if len(self._touched) >= TOUCH_BATCH or now - self._touch_flushed >= TOUCH_INTERVAL:
+            self._flush_touches(now)
+            self.conn.commit()
+
+    def _flush_touches(self, now):
+        """Write pending memory-hit times so LRU eviction sees the hot keys."""
+        if self._touched:
+            self.conn.executemany("UPDATE llm_cache SET last_used = ? WHERE key = ?",
+                                  [(t, k) for k, t in self._touched.items()])
+            self._touched.clear()
+        self._touch_flushed = now
+
+    def _remember(self, key, created_at, text):
+        self._mem[key] = (created_at, text)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.memory_entries:
+            self._mem.popitem(last=False)
+
+    def _evict(self, now):
+        """Drop expired rows, then least-recently-used rows above max_entries."""
+        self._flush_touches(now)
+        cur = self.conn.cursor()
+        if self.ttl is not None:
+            cur.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+            self.evictions += max(cur.rowcount, 0)
+        (count,) = cur.execute("SELECT count(*) FROM llm_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cur.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            self._touched.clear()
+            self.conn.execute("DELETE FROM llm_cache")
+            self.conn.commit()
+
+    def stats(self):
+        with self._lock:
+            (size,) = self.conn.execute("SELECT count(*) FROM llm_cache").fetchone()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "entries": size,
+                "memory_entries": len(self._mem),
+            }
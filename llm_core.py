@@ -1,21 +1,89 @@
 # llm_core.py
 import os
 import json
+import threading
+import time
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+from llm_cache import LLMCache, make_key
+from json_stream import parse_array_prefix
+import telemetry
+from llm_traffic import TrafficController
+from llm_router import ModelRouter
 
 # ⚠️ Put YOUR API key here
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 DEFAULT_MODEL = "gemini-2.5-flash"
 
-# Global Client State
+# Global Client State: one client per process, reused across reruns and sessions
+# so its HTTP connection pool (keep-alive) survives. google.genai is imported
+# on first configure_llm(), not at module load: it dominates cold-start time.
 LLM_CLIENT = None
 LLM_MODEL = DEFAULT_MODEL
+# True once a model was chosen explicitly (sidebar / --model): it then wins
+# over the per-route tiers (LLM_MODEL_FAST / LLM_MODEL_STANDARD)
+MODEL_PINNED = False
+_CLIENT_KEY = None
+_CLIENT_LOCK = threading.Lock()
 
-def configure_llm(model="gemini-2.5-flash", api_base=None):
-    global LLM_CLIENT, LLM_MODEL
+# Response cache (created lazily so importing this module has no side effects)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_DISABLED", "") == ""
+LLM_CACHE = None
+
+# Process-wide traffic controller shared by all sessions (quota from env)
+TRAFFIC = TrafficController(
+    rpm=float(os.getenv("LLM_RPM", "1000")),
+    tpm=float(os.getenv("LLM_TPM", "1000000")),
+    initial_concurrency=int(os.getenv("LLM_CONCURRENCY", "4")),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+)
+
+# Call site -> model tier / temperature / token limit, with hedging
+ROUTER = ModelRouter()
+
+def _can_hedge():
+    # a duplicate request is only worth sending when the backend is not throttling us
+    traffic = TRAFFIC.stats()
+    return traffic["queue_depth"] == 0 and traffic["circuit"] == "closed"
+
+def _apply_route(route, model, temperature, max_output_tokens):
+    """Route name -> (Route or None, model, temperature, max_output_tokens)."""
+    if route is None:
+        return None, model or LLM_MODEL, temperature, max_output_tokens
+    r = ROUTER.route(route)
+    if not model:
+        model = LLM_MODEL if MODEL_PINNED else (ROUTER.model_for(r) or LLM_MODEL)
+    return r, model, r.temperature, r.max_output_tokens
+
+def _thinking_budget(r, model):
+    # thinking tokens count against max_output_tokens; only 2.5 models take a budget
+    if r is None or r.thinking_budget is None or not model.startswith("gemini-2.5"):
+        return None
+    return r.thinking_budget
+
+def model_for_route(route):
+    """Model a call on this route is sent to (what its telemetry records)."""
+    return _apply_route(route, None, None, None)[1]
+
+def _estimate_tokens(prompt, max_output_tokens):
+    # prompt at ~4 chars/token plus a typical share of the output budget
+    return len(prompt) // 4 + max_output_tokens // 4
+
+def get_llm_cache():
+    global LLM_CACHE
+    if LLM_CACHE is None:
+        LLM_CACHE = LLMCache()
+    return LLM_CACHE
+
+def configure_llm(model=None, api_base=None, force=False):
+    """
+    Make sure the process-wide client exists. Cheap after the first call: the
+    client is only rebuilt when the API key changes (or force=True); a new
+    model just switches LLM_MODEL, since the model is chosen per request.
+    model=None keeps the current model; an explicit model is used for every
+    route, overriding the LLM_MODEL_FAST / LLM_MODEL_STANDARD tiers.
+    """
+    global LLM_CLIENT, LLM_MODEL, MODEL_PINNED, _CLIENT_KEY
     
     # 1. Try getting key from environment if not explicitly passed
     api_key = os.getenv("GEMINI_API_KEY")
@@ -24,44 +92,187 @@ def configure_llm(model="gemini-2.5-flash", api_base=None):
         print("❌ CRITICAL: GEMINI_API_KEY is missing from environment variables.")
         return None
 
-    try:
-        # 2. Re-initialize the client
-        LLM_CLIENT = genai.Client(api_key=api_key) 
-        LLM_MODEL = model
-        print(f"✅ LLM Client initialized with model: {model}")
-    except Exception as e:
-        print(f"❌ GENAI INIT ERROR: {e}")
-        LLM_CLIENT = None
+    with _CLIENT_LOCK:
+        if model:
+            LLM_MODEL = model
+            MODEL_PINNED = True
+        if LLM_CLIENT is not None and _CLIENT_KEY == api_key and not force:
+            return LLM_CLIENT
+        try:
+            # 2. (Re-)initialize the client
+            from google import genai
+            LLM_CLIENT = genai.Client(api_key=api_key)
+            _CLIENT_KEY = api_key
+            print(f"✅ LLM Client initialized with model: {LLM_MODEL}")
+        except Exception as e:
+            print(f"❌ GENAI INIT ERROR: {e}")
+            LLM_CLIENT = None
+            _CLIENT_KEY = None
         
     return LLM_CLIENT
 
-def _genai_generate(prompt, model=None, temperature=0.2, max_output_tokens=5000):
+def _config_fields(temperature, max_output_tokens, response_schema=None, thinking_budget=None):
+    """Generation config as plain fields; also hashed into the cache key."""
+    fields = {"temperature": temperature, "max_output_tokens": max_output_tokens}
+    if thinking_budget is not None:
+        fields["thinking_config"] = {"thinking_budget": thinking_budget}
+    if response_schema is not None:
+        # JSON mode: output is constrained to the schema
+        fields.update(response_mime_type="application/json", response_schema=response_schema)
+    return fields
+
+def _gen_config(temperature, max_output_tokens, response_schema=None, thinking_budget=None):
+    from google.genai import types
+    fields = _config_fields(temperature, max_output_tokens, response_schema, thinking_budget)
+    if "thinking_config" in fields:
+        fields["thinking_config"] = types.ThinkingConfig(**fields["thinking_config"])
+    return types.GenerateContentConfig(**fields)
+
+def _cache_key(model, prompt, temperature, max_output_tokens, response_schema=None, thinking_budget=None):
+    return make_key(model, prompt, **_config_fields(temperature, max_output_tokens, response_schema, thinking_budget))
+
+def _genai_generate(prompt, model=None, temperature=0.2, max_output_tokens=5000, use_cache=True, route=None,
+                    response_schema=None):
+    """
+    Blocking generation. With route (a llm_router.ROUTES name) the route's
+    model tier, temperature and token limit are used and slow calls are hedged.
+    response_schema switches the call to JSON mode constrained by that schema.
+    """
     global LLM_CLIENT
     
     if LLM_CLIENT is None:
         print("GENAI ERROR: LLM Client is not initialized. Cannot generate content.")
         return ""
         
-    model = model or LLM_MODEL
-    
+    r, model, temperature, max_output_tokens = _apply_route(route, model, temperature, max_output_tokens)
+    thinking = _thinking_budget(r, model)
+
+    # Telemetry: fill the caller's telemetry.llm_call record, or emit our own
+    rec = telemetry.current()
+    standalone = rec is None
+    if standalone:
+        rec = {"call_site": "unknown"}
+    rec.update(model=model, prompt_chars=len(prompt), cache_status="off")
+    t0 = time.perf_counter()
+
     try:
-        response = LLM_CLIENT.models.generate_content(
-            model=model,
-            contents=prompt,
-            config=types.GenerateContentConfig( 
-                temperature=temperature,
-                max_output_tokens=max_output_tokens,
-            )
-        )
-        return response.text
-
-    except Exception as e:
-        print("GENAI ERROR:", e)
-        return ""
+        cache = get_llm_cache() if (use_cache and LLM_CACHE_ENABLED) else None
+        if cache is not None:
+            key = _cache_key(model, prompt, temperature, max_output_tokens, response_schema, thinking)
+            cached = cache.get(key)
+            if cached is not None:
+                rec.update(cache_status="hit", ok=1, response_chars=len(cached))
+                return cached
+            rec["cache_status"] = "miss"
+
+        try:
+            client = LLM_CLIENT
+            def _call():
+                return TRAFFIC.call(
+                    lambda: client.models.generate_content(
+                        model=model,
+                        contents=prompt,
+                        config=_gen_config(temperature, max_output_tokens, response_schema, thinking),
+                    ),
+                    est_tokens=_estimate_tokens(prompt, max_output_tokens),
+                    usage_fn=lambda resp: telemetry.usage_from_response(resp).get("total_tokens"),
+                )
+            if r is not None:
+                response, hedge_info = ROUTER.run(r, _call, can_hedge=_can_hedge)
+                rec.update(hedge_info)
+            else:
+                response = _call()
+            text = response.text
+            rec.update(ok=1, response_chars=len(text or ""), **telemetry.usage_from_response(response))
+            if cache is not None:
+                cache.put(key, text, model=model)
+            return text
+
+        except Exception as e:
+            print("GENAI ERROR:", e)
+            rec.update(ok=0, response_chars=0)
+            return ""
+    finally:
+        rec["latency_ms"] = (time.perf_counter() - t0) * 1000
+        if standalone:
+            telemetry.emit(rec)
+
+def _genai_generate_stream(prompt, model=None, temperature=0.2, max_output_tokens=5000, use_cache=True, route=None,
+                           rec=None):
+    """
+    Generator version of _genai_generate: yields text chunks as the model
+    produces them. The full text is cached once the stream completes.
+    route selects model/temperature/limits like _genai_generate; streams are
+    never hedged (the first chunk is already on screen).
+    rec is the telemetry record to fill, emitted by the caller. Generators
+    pass it explicitly: telemetry.llm_call would keep its context variable
+    set across their yields.
+    """
+    if LLM_CLIENT is None:
+        print("GENAI ERROR: LLM Client is not initialized. Cannot generate content.")
+        return
+
+    r, model, temperature, max_output_tokens = _apply_route(route, model, temperature, max_output_tokens)
+    thinking = _thinking_budget(r, model)
+
+    standalone = False
+    if rec is None:
+        rec = telemetry.current()
+        standalone = rec is None
+        if standalone:
+            rec = {"call_site": "unknown_stream"}
+    rec.update(model=model, prompt_chars=len(prompt), cache_status="off")
+    t0 = time.perf_counter()
+    parts = []
+
+    try:
+        cache = get_llm_cache() if (use_cache and LLM_CACHE_ENABLED) else None
+        if cache is not None:
+            key = _cache_key(model, prompt, temperature, max_output_tokens, thinking_budget=thinking)
+            cached = cache.get(key)
+            if cached is not None:
+                rec.update(cache_status="hit", ok=1)
+                parts.append(cached)
+                yield cached
+                return
+            rec["cache_status"] = "miss"
+
+        try:
+            # admission/rate limiting only: a stream cannot be retried once it has yielded
+            with TRAFFIC.slot(_estimate_tokens(prompt, max_output_tokens)) as usage:
+                stream = LLM_CLIENT.models.generate_content_stream(
+                    model=model,
+                    contents=prompt,
+                    config=_gen_config(temperature, max_output_tokens, thinking_budget=thinking),
+                )
+                for chunk in stream:
+                    rec.update(telemetry.usage_from_response(chunk))
+                    text = chunk.text or ""
+                    if text:
+                        parts.append(text)
+                        yield text
+                usage["actual_tokens"] = rec.get("total_tokens")
+            rec["ok"] = 1
+        except Exception as e:
+            print("GENAI STREAM ERROR:", e)
+            rec["ok"] = 0
+            return
+
+        if cache is not None:
+            cache.put(key, "".join(parts), model=model)
+    finally:
+        rec["latency_ms"] = (time.perf_counter() - t0) * 1000
+        rec["response_chars"] = sum(len(p) for p in parts)
+        if standalone:
+            telemetry.emit(rec)
 
 def _parse_json_from_text(raw: str):
     """
     Robust JSON extraction from raw LLM output.
+
+    Single left-to-right attempt per candidate start ("{" or "[") using
+    raw_decode, so trailing prose needs no slicing. If the output was cut
+    off mid-array, the complete leading elements are returned.
     """
     text = (raw or "").strip()
     if not text:
@@ -70,25 +281,21 @@ def _parse_json_from_text(raw: str):
         return json.loads(text)
     except json.JSONDecodeError:
         pass
-    start_obj = text.find("{")
-    end_obj = text.rfind("}") + 1
-    if start_obj != -1 and end_obj > start_obj:
-        cand = text[start_obj:end_obj]
-        try:
-            return json.loads(cand)
-        except json.JSONDecodeError:
-            pass
-    start_arr = text.find("[")
-    end_arr = text.rfind("]") + 1
-    if start_arr != -1 and end_arr > start_arr:
-        cand = text[start_arr:end_arr]
+    decoder = json.JSONDecoder()
+    starts = sorted(i for i in (text.find("{"), text.find("[")) if i != -1)
+    for start in starts:
         try:
-            return json.loads(cand)
+            return decoder.raw_decode(text, start)[0]
         except json.JSONDecodeError:
             pass
+        if text[start] == "[":
+            # truncated array: keep the elements that did complete
+            prefix = parse_array_prefix(text[start:])
+            if prefix:
+                return prefix
     if "'" in text and '"' not in text:
         try:
             return json.loads(text.replace("'", '"'))
         except Exception:
             pass
-    raise ValueError("Could not parse JSON from LLM output")
\ No newline at end of file
+    raise ValueError("Could not parse JSON from LLM output")
@@ -0,0 +1,172 @@
+# llm_router.py
+"""
+Per-call-site model routing and hedged requests.
+
+Each call site (skills, questions, extract, answer) maps to a Route: a
+model tier plus its own temperature and output-token limit. Tiers are set
+from the environment (LLM_MODEL_FAST / LLM_MODEL_STANDARD); an unset tier uses
+llm_core.LLM_MODEL, and a model picked explicitly (sidebar / --model) overrides
+the tiers. max_output_tokens includes thinking tokens on 2.5 models, so routes
+with small answers cap thinking with thinking_budget.
+
+Hedging: once a route has MIN_SAMPLES latencies, a request still running
+after that route's p95 gets a duplicate; whichever finishes first wins and
+the other is abandoned (not-yet-started duplicates are cancelled; an HTTP
+call already in flight cannot be interrupted, its result is dropped).
+Every attempt's own latency feeds the window, so the delay tracks the real
+single-request distribution rather than the hedged one. Hedges are skipped
+while the traffic controller is queueing, so they never add load to a
+throttled backend.
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+MIN_SAMPLES = 20
+WINDOW = 200
+HEDGE_MIN_MS = 250.0   # never hedge sooner than this
+HEDGE_WORKERS = 16
+
+
+class Route:
+    def __init__(self, name, tier="standard", temperature=0.2, max_output_tokens=5000, hedge=True,
+                 hedge_quantile=95, hedge_min_ms=HEDGE_MIN_MS, thinking_budget=None):
+        self.name = name
+        self.tier = tier
+        self.temperature = temperature
+        self.max_output_tokens = max_output_tokens
+        self.thinking_budget = thinking_budget  # None: the model's default
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_ms = hedge_min_ms
+
+
+TIERS = {
+    "fast": os.getenv("LLM_MODEL_FAST") or None,
+    "standard": os.getenv("LLM_MODEL_STANDARD") or None,
+}
+
+ROUTES = {
+    # small JSON object: low temperature; 512 thinking + ~1k visible tokens
+    "skills": Route("skills", tier="fast", temperature=0.1, max_output_tokens=2048, thinking_budget=512),
+    # long list, some variety wanted
+    "questions": Route("questions", tier="standard", temperature=0.6, max_output_tokens=5000),
+    # single-call extraction: metadata plus the whole question list, JSON mode
+    "extract": Route("extract", tier="standard", temperature=0.4, max_output_tokens=8192),
+    # ~150 words, plus a capped thinking budget
+    "answer": Route("answer", tier="fast", temperature=0.3, max_output_tokens=2048, thinking_budget=512),
+}
+
+
+def _quantile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))]
+
+
+class ModelRouter:
+    def __init__(self, routes=None, tiers=None, min_samples=MIN_SAMPLES, window=WINDOW,
+                 max_workers=HEDGE_WORKERS, clock=time.perf_counter):
+        self.routes = dict(ROUTES if routes is None else routes)
+        self.tiers = dict(TIERS if tiers is None else tiers)
+        self.min_samples = min_samples
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._counters = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+
+    def route(self, name) -> Route:
+        return self.routes.get(name) or Route(name, hedge=False)
+
+    def model_for(self, route):
+        """Tier model for the route, or None to use the default model."""
+        return self.tiers.get(route.tier)
+
+    def _count(self, name, **deltas):
+        with self._lock:
+            c = self._counters.setdefault(name, {"calls": 0, "hedged": 0, "hedge_wins": 0, "errors": 0})
+            for k, v in deltas.items():
+                c[k] += v
+
+    def record(self, name, latency_ms):
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=self.window)).append(latency_ms)
+
+    def hedge_delay(self, route):
+        """Seconds to wait before hedging, or None while the route has too few samples."""
+        if not route.hedge:
+            return None
+        with self._lock:
+            window = list(self._latencies.get(route.name, ()))
+        if len(window) < self.min_samples:
+            return None
+        return max(route.hedge_min_ms, _quantile(window, route.hedge_quantile)) / 1000.0
+
+    def _attempt(self, route, fn):
+        def timed():
+            t0 = self._clock()
+            result = fn()
+            self.record(route.name, (self._clock() - t0) * 1000)
+            return result
+        return self._executor.submit(timed)
+
+    def run(self, route, fn, can_hedge=None):
+        """
+        Call fn(), hedging per the route. Returns (result, info) where info is
+        {"hedged": 0/1, "hedge_won": 0/1}. Raises the last error if every
+        attempt failed.
+        """
+        self._count(route.name, calls=1)
+        delay = self.hedge_delay(route)
+        primary = self._attempt(route, fn)
+        info = {"hedged": 0, "hedge_won": 0}
+        try:
+            if delay is None:
+                return primary.result(), info
+            done, _ = wait([primary], timeout=delay)
+            if done or (can_hedge is not None and not can_hedge()):
+                return primary.result(), info
+
+            info["hedged"] = 1
+            self._count(route.name, hedged=1)
+            hedge = self._attempt(route, fn)
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    if f.exception() is None:
+                        for loser in pending:
+                            loser.cancel()
+                        if f is hedge:
+                            info["hedge_won"] = 1
+                            self._count(route.name, hedge_wins=1)
+                        return f.result(), info
+                    error = f.exception()
+            raise error
+        except Exception:
+            self._count(route.name, errors=1)
+            raise
+
+    def stats(self) -> dict:
+        """Per route: calls, hedges, hedge wins, errors, p50/p95 and current hedge delay."""
+        out = {}
+        with self._lock:
+            names = set(self._counters) | set(self._latencies)
+            snapshot = {n: (dict(self._counters.get(n, {})), list(self._latencies.get(n, ()))) for n in names}
+        for name, (counters, window) in sorted(snapshot.items()):
+            delay = self.hedge_delay(self.route(name))
+            out[name] = {
+                "calls": counters.get("calls", 0),
+                "hedged": counters.get("hedged", 0),
+                "hedge_wins": counters.get("hedge_wins", 0),
+                "errors": counters.get("errors", 0),
+                "p50_ms": _quantile(window, 50) if window else 0.0,
+                "p95_ms": _quantile(window, 95) if window else 0.0,
+                "hedge_delay_ms": delay * 1000 if delay is not None else None,
+            }
+        return out
@@ -0,0 +1,244 @@
+# llm_traffic.py
+"""
+Client-side traffic control for Gemini calls.
+
+One TrafficController is shared by every Streamlit session in the process
+(llm_core.TRAFFIC). Each call goes through, in order:
+
+  1. circuit breaker  - fail fast while the backend is known to be down
+  2. token buckets    - requests-per-minute and tokens-per-minute quotas
+  3. AIMD window      - concurrency limit, +1 per window of successes,
+                        halved on every throttle (429/503)
+  4. retries          - exponential backoff with full jitter on retryable errors
+
+so sustained load settles just under the quota instead of burning calls on
+429s that would otherwise surface as fallback questions.
+"""
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+THROTTLE_CODES = {429, 503}
+_RETRYABLE_TEXT = re.compile(r"RESOURCE_EXHAUSTED|UNAVAILABLE|DEADLINE_EXCEEDED|rate limit|quota|timed? ?out", re.I)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+def error_code(exc):
+    """HTTP-ish status code of an SDK exception, if we can find one."""
+    for attr in ("code", "status_code"):
+        code = getattr(exc, attr, None)
+        if isinstance(code, int):
+            return code
+    m = re.match(r"\s*(\d{3})\b", str(exc))
+    return int(m.group(1)) if m else None
+
+
+def is_retryable(exc) -> bool:
+    code = error_code(exc)
+    if code is not None:
+        return code in RETRYABLE_CODES
+    return bool(_RETRYABLE_TEXT.search(str(exc)))
+
+
+class TokenBucket:
+    """Refills at rate_per_min/60 per second up to capacity. Balance may go negative (debt)."""
+
+    def __init__(self, rate_per_min, capacity=None, clock=time.monotonic):
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_min
+        self.tokens = self.capacity
+        self._clock = clock
+        self._last = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def wait_time(self, n) -> float:
+        """Seconds until n tokens are available (0 if now)."""
+        self._refill()
+        n = min(n, self.capacity)
+        if self.tokens >= n:
+            return 0.0
+        return (n - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, n):
+        self._refill()
+        self.tokens -= n
+
+
+class TrafficController:
+    def __init__(self, rpm=1000, tpm=1_000_000, initial_concurrency=4, min_concurrency=1,
+                 max_concurrency=32, max_retries=4, backoff_base=0.5, backoff_cap=20.0,
+                 breaker_threshold=5, breaker_cooldown=30.0, admit_timeout=120.0,
+                 clock=time.monotonic, sleep=time.sleep, rnd=None):
+        self._clock = clock
+        self._sleep = sleep
+        self._rnd = rnd or random.Random()
+        self._cond = threading.Condition()
+
+        self.rpm = TokenBucket(rpm, clock=clock)
+        self.tpm = TokenBucket(tpm, clock=clock)
+
+        self.limit = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.waiting = 0
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.admit_timeout = admit_timeout
+
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._half_open_trial = False
+
+        self.counters = {"calls": 0, "ok": 0, "failed": 0, "throttled": 0, "retries": 0,
+                         "rejected_open": 0, "wait_s": 0.0}
+
+    # --- circuit breaker ---
+    def _breaker_state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.breaker_cooldown:
+            return "half_open"
+        return "open"
+
+    def _check_breaker(self):
+        state = self._breaker_state()
+        if state == "open" or (state == "half_open" and self._half_open_trial):
+            self.counters["rejected_open"] += 1
+            raise CircuitOpenError("LLM circuit open: backend failing, not sending request")
+        if state == "half_open":
+            self._half_open_trial = True
+
+    # --- admission ---
+    def _admit(self, est_tokens):
+        deadline = self._clock() + self.admit_timeout
+        t0 = self._clock()
+        with self._cond:
+            self._check_breaker()
+            self.waiting += 1
+            try:
+                while True:
+                    wait = max(self.rpm.wait_time(1), self.tpm.wait_time(est_tokens))
+                    if self.in_flight < max(self.min_concurrency, int(self.limit)) and wait == 0:
+                        break
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        raise RateLimitTimeout("Timed out waiting for LLM rate limit / concurrency slot")
+                    # bucket waits are time-based; slot waits are woken by _release
+                    self._cond.wait(min(remaining, wait) if wait > 0 else min(remaining, 1.0))
+                self.rpm.take(1)
+                self.tpm.take(est_tokens)
+                self.in_flight += 1
+                self.counters["calls"] += 1
+                self.counters["wait_s"] += self._clock() - t0
+            finally:
+                self.waiting -= 1
+
+    def _release(self, outcome, exc=None, tokens_delta=0):
+        with self._cond:
+            self.in_flight -= 1
+            if tokens_delta:
+                self.tpm.take(tokens_delta)
+            if outcome == "ok":
+                self.counters["ok"] += 1
+                self._consecutive_failures = 0
+                self._opened_at = None
+                self._half_open_trial = False
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / max(self.limit, 1.0))
+            elif outcome == "cancelled":
+                self._half_open_trial = False
+            elif not is_retryable(exc):
+                # caller error (bad request etc.): says nothing about backend health
+                self.counters["failed"] += 1
+                self._half_open_trial = False
+            else:
+                self.counters["failed"] += 1
+                if error_code(exc) in THROTTLE_CODES:
+                    self.counters["throttled"] += 1
+                    self.limit = max(float(self.min_concurrency), self.limit / 2.0)
+                self._consecutive_failures += 1
+                if self._half_open_trial or self._consecutive_failures >= self.breaker_threshold:
+                    self._opened_at = self._clock()
+                self._half_open_trial = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, est_tokens=0):
+        """
+        Admission without retries (used for streaming): yields a dict where the
+        caller may set "actual_tokens" to settle the TPM estimate.
+        """
+        self._admit(est_tokens)
+        usage = {}
+        outcome = "cancelled"
+        try:
+            yield usage
+            outcome = "ok"
+        except Exception as e:
+            outcome = "error"
+            self._release("error", e)
+            raise
+        finally:
+            if outcome == "ok":
+                actual = usage.get("actual_tokens")
+                self._release("ok", tokens_delta=(actual - est_tokens) if actual else 0)
+            elif outcome == "cancelled":
+                # consumer abandoned a stream (GeneratorExit): free the slot only
+                self._release("cancelled")
+
+    def backoff(self, attempt) -> float:
+        """Full-jitter exponential backoff for retry number attempt (1-based)."""
+        return self._rnd.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** (attempt - 1))))
+
+    def call(self, fn, est_tokens=0, usage_fn=None):
+        """
+        Run fn() under admission control with retries. usage_fn(result) may
+        return the actual token count to settle the TPM bucket.
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.slot(est_tokens) as usage:
+                    result = fn()
+                    if usage_fn is not None:
+                        usage["actual_tokens"] = usage_fn(result)
+                    return result
+            except (CircuitOpenError, RateLimitTimeout):
+                raise
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries or not is_retryable(e):
+                    raise
+                with self._cond:
+                    self.counters["retries"] += 1
+                self._sleep(self.backoff(attempt))
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                **self.counters,
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+                "concurrency_limit": round(self.limit, 2),
+                "circuit": self._breaker_state(),
+                "rpm_tokens": round(self.rpm.tokens, 1),
+                "tpm_tokens": round(self.tpm.tokens),
+            }
@@ -0,0 +1,292 @@
+# practice.py
+"""
+Spaced-repetition practice (SM-2) over the question bank.
+
+Review state lives in the reviews table (migration 10), one row per
+question, created by a trigger when the question is saved. jd_id, skill and
+qtype are copied onto the row, so practice filters are answered from the
+reviews indexes and never read the questions table.
+
+Scheduler keeps an in-memory min-heap of (due, question_id) per filter,
+built on first use from reviews and topped up with newly saved questions
+(a write listener flags them; only ids above the last one loaded are read).
+Picking the next card is a heap pop, O(log n). Reviewing a card pushes a
+new entry at its new due time; the old entry goes stale and is dropped when
+it reaches the top. Questions deleted with their JD are noticed when their
+batch is loaded and forgotten then.
+
+PracticeSession is one user's pass through a filter. It prefetches the next
+BATCH_SIZE due cards together with their question text and any stored
+answers, and tops the batch up once half of it has been reviewed.
+"""
+import heapq
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import db_skeleton as db
+import skill_dict
+from db_pool import read_conn, write_conn
+
+DAY = 86400.0
+RELEARN_DELAY = 600.0      # a failed card comes back after 10 minutes
+MIN_EASE = 1.3
+BATCH_SIZE = 10
+MAX_INDEXES = 32           # filters kept in memory
+REFRESH_INTERVAL = 30.0    # seconds; picks up questions saved by another process
+
+# button label -> SM-2 grade (0-5)
+GRADES = {"Again": 1, "Hard": 3, "Good": 4, "Easy": 5}
+
+_COLS = ["question_id", "jd_id", "skill", "qtype", "reps", "interval_days", "ease", "lapses", "due"]
+
+
+@dataclass
+class Card:
+    question_id: int
+    jd_id: int
+    skill: str
+    qtype: str
+    reps: int = 0
+    interval_days: float = 0.0
+    ease: float = 2.5
+    lapses: int = 0
+    due: float = 0.0
+
+
+@dataclass(frozen=True)
+class Filter:
+    jd_id: Optional[int] = None
+    skill: Optional[str] = None
+    qtype: Optional[str] = None
+
+    def matches(self, card: Card) -> bool:
+        return ((self.jd_id is None or card.jd_id == self.jd_id)
+                and (self.skill is None or card.skill == self.skill)
+                and (self.qtype is None or card.qtype == self.qtype))
+
+    def where(self):
+        """SQL conditions on reviews and their parameters."""
+        clauses, params = [], []
+        for col in ("jd_id", "skill", "qtype"):
+            value = getattr(self, col)
+            if value is not None:
+                clauses.append(f"{col} = ?")
+                params.append(value)
+        return " AND ".join(clauses) or "1", params
+
+
+def make_filter(jd_id=None, skill=None, qtype=None) -> Filter:
+    """Filter with skill / qtype normalized like the reviews columns; empty values mean any."""
+    return Filter(jd_id=jd_id, skill=skill_dict.normalize(skill) or None,
+                  qtype=(qtype or "").strip().lower() or None)
+
+
+def sm2(card: Card, quality: int, now: float) -> Card:
+    """
+    Card state after a review graded 0-5. Grades of 3 and up advance the
+    card (1 day, 6 days, then interval x ease); lower grades restart it and
+    bring it back after RELEARN_DELAY, leaving the ease unchanged.
+    """
+    q = max(0, min(5, int(quality)))
+    if q < 3:
+        return replace(card, reps=0, interval_days=1.0, lapses=card.lapses + (1 if card.reps else 0),
+                       due=now + RELEARN_DELAY)
+    ease = max(MIN_EASE, card.ease + 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
+    reps = card.reps + 1
+    if reps == 1:
+        interval = 1.0
+    elif reps == 2:
+        interval = 6.0
+    else:
+        interval = round(card.interval_days * ease, 2)
+    return replace(card, reps=reps, interval_days=interval, ease=ease, due=now + interval * DAY)
+
+
+# --- Queries on reviews ---
+def skills(conn, jd_id=None) -> list:
+    """Distinct (normalized) skills with review cards, optionally for one JD."""
+    f = Filter(jd_id=jd_id)
+    where, params = f.where()
+    cur = conn.execute(f"SELECT DISTINCT skill FROM reviews WHERE {where} AND skill <> '' ORDER BY skill", params)
+    return [r[0] for r in cur.fetchall()]
+
+
+def counts(conn, f: Filter, now: float = None) -> dict:
+    """Cards in the filter: total, due now, never reviewed."""
+    now = time.time() if now is None else now
+    where, params = f.where()
+    (total, due, new) = conn.execute(
+        f"""SELECT count(*), coalesce(sum(due <= ?), 0), coalesce(sum(last_review IS NULL), 0)
+            FROM reviews WHERE {where}""",
+        (now, *params),
+    ).fetchone()
+    return {"total": total, "due": due, "new": new}
+
+
+class Scheduler:
+    """Next-due index over reviews, shared by every session in the process."""
+
+    def __init__(self, pool, clock=time.time):
+        self.pool = pool
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cards = {}
+        self._indexes = OrderedDict()   # Filter -> {"heap", "max_id", "gen", "loaded"}
+        self._generation = 0
+
+    def on_write(self, *tables):
+        """db_skeleton write listener: new questions mean new cards to load."""
+        if "questions" in tables:
+            with self._lock:
+                self._generation += 1
+
+    def _load(self, f, idx):
+        where, params = f.where()
+        with read_conn(self.pool) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLS)} FROM reviews WHERE question_id > ? AND {where} ORDER BY question_id",
+                (idx["max_id"], *params),
+            ).fetchall()
+        for r in rows:
+            card = self._cards.setdefault(r[0], Card(*r))
+            idx["heap"].append((card.due, card.question_id))
+            idx["max_id"] = r[0]
+        heapq.heapify(idx["heap"])
+        idx["gen"] = self._generation
+        idx["loaded"] = self._clock()
+
+    def _index(self, f):
+        idx = self._indexes.get(f)
+        if idx is None:
+            idx = self._indexes[f] = {"heap": [], "max_id": 0, "gen": -1, "loaded": 0.0}
+            while len(self._indexes) > MAX_INDEXES:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(f)
+        if idx["gen"] != self._generation or self._clock() - idx["loaded"] > REFRESH_INTERVAL:
+            self._load(f, idx)
+        return idx
+
+    def _live(self, entry):
+        card = self._cards.get(entry[1])
+        return card is not None and card.due == entry[0]
+
+    def due(self, f: Filter, n: int = BATCH_SIZE, now: float = None, exclude=()) -> list:
+        """Up to n cards of the filter due by now, earliest first, skipping ids in exclude."""
+        now = self._clock() if now is None else now
+        out, keep = [], []
+        with self._lock:
+            heap = self._index(f)["heap"]
+            while heap and len(out) < n and heap[0][0] <= now:
+                entry = heapq.heappop(heap)
+                if not self._live(entry):
+                    continue  # superseded by a later review, or forgotten
+                keep.append(entry)
+                if entry[1] not in exclude:
+                    out.append(replace(self._cards[entry[1]]))
+            for entry in keep:
+                heapq.heappush(heap, entry)
+        return out
+
+    def next_due(self, f: Filter) -> Optional[float]:
+        """Due time of the filter's earliest card, or None when it has no cards."""
+        with self._lock:
+            heap = self._index(f)["heap"]
+            while heap and not self._live(heap[0]):
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
+    def forget(self, question_id):
+        """Drop a card whose question no longer exists."""
+        with self._lock:
+            self._cards.pop(question_id, None)
+
+    def review(self, question_id: int, quality: int, now: float = None) -> Card:
+        """Grade a card: apply SM-2, persist it, and reschedule it in every loaded index."""
+        now = self._clock() if now is None else now
+        with self._lock:
+            card = self._cards.get(question_id)
+        if card is None:
+            with read_conn(self.pool) as conn:
+                row = conn.execute(f"SELECT {', '.join(_COLS)} FROM reviews WHERE question_id = ?",
+                                   (question_id,)).fetchone()
+            if row is None:
+                raise KeyError(question_id)
+            card = Card(*row)
+        new = sm2(card, quality, now)
+        with write_conn(self.pool) as conn:
+            with conn:
+                conn.execute(
+                    """UPDATE reviews SET reps = ?, interval_days = ?, ease = ?, lapses = ?, due = ?,
+                       last_quality = ?, last_review = ? WHERE question_id = ?""",
+                    (new.reps, new.interval_days, new.ease, new.lapses, new.due, int(quality), now, question_id),
+                )
+        with self._lock:
+            self._cards[question_id] = new
+            for f, idx in self._indexes.items():
+                if f.matches(new) and question_id <= idx["max_id"]:
+                    heapq.heappush(idx["heap"], (new.due, question_id))
+        return new
+
+
+class PracticeSession:
+    """One pass through a filter, with the next batch of cards prefetched."""
+
+    def __init__(self, scheduler: Scheduler, f: Filter, batch_size: int = BATCH_SIZE):
+        self.scheduler = scheduler
+        self.filter = f
+        self.batch_size = batch_size
+        self.buffer = deque()
+        self.reviewed = 0
+
+    def _fill(self, now=None):
+        held = {item["id"] for item in self.buffer}
+        cards = self.scheduler.due(self.filter, self.batch_size - len(self.buffer), now=now, exclude=held)
+        if not cards:
+            return
+        with read_conn(self.scheduler.pool) as conn:
+            rows = db.get_questions_by_ids(conn, [c.question_id for c in cards])
+            answers = db.get_answers(conn, [r["canonical_id"] or r["id"] for r in rows.values()])
+        for card in cards:
+            q = rows.get(card.question_id)
+            if q is None:
+                self.scheduler.forget(card.question_id)
+                continue
+            stored = answers.get(q["canonical_id"] or q["id"])
+            if stored:
+                q["answer"] = stored["answer"]
+            q["card"] = card
+            self.buffer.append(q)
+
+    def current(self, now=None):
+        """The card to show, or None when nothing in the filter is due."""
+        if len(self.buffer) <= self.batch_size // 2:
+            self._fill(now)
+        return self.buffer[0] if self.buffer else None
+
+    def grade(self, quality: int, now=None) -> Card:
+        item = self.buffer.popleft()
+        self.reviewed += 1
+        return self.scheduler.review(item["id"], quality, now=now)
+
+    def skip(self):
+        """Move the current card to the end of the batch."""
+        if self.buffer:
+            self.buffer.rotate(-1)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler(pool) -> Scheduler:
+    """Process-wide scheduler shared by all sessions."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None or _scheduler.pool is not pool:
+            if _scheduler is not None and _scheduler.on_write in db.WRITE_LISTENERS:
+                db.WRITE_LISTENERS.remove(_scheduler.on_write)
+            _scheduler = Scheduler(pool)
+            db.WRITE_LISTENERS.append(_scheduler.on_write)
+        return _scheduler
@@ -1,38 +1,51 @@
 # prompts.py
 
+# Bump when get_answer_prompt changes so stored answers record which prompt produced them
+ANSWER_PROMPT_VERSION = "v1"
+
 def get_skills_prompt(jd_text: str, top_k: int) -> str:
     return f"""
-    You are an expert HR Tech system.
-    Analyze the job description below.
-    Extract the top {top_k} technical skills, the domain (1 word), seniority level, and a brief summary.
-    
-    JOB DESCRIPTION:
-    {jd_text}
-    
-    Return ONLY valid JSON in this format:
-    {{
-        "skills": ["skill1", "skill2"...],
+        Extract the top {top_k} skills, one-word domain, seniority, and 1–2 sentence summary
+        from the following job description:
+
+        {jd_text}
+
+        Return ONLY JSON:
+        {{
+        "skills": [...],
         "domain": "...",
         "seniority": "...",
         "summary": "..."
-    }}
-    """
+        }}
+        """
 
-def get_questions_prompt(role_title: str, skills: list) -> str:
-    skills_str = ", ".join(skills)
+def get_questions_prompt(role_title: str, skills: list, num_questions: int = 20) -> str:
     return f"""
-    You are a technical interviewer.
-    Generate 20 distinct interview questions for a '{role_title}' candidate.
-    Focus on these skills: {skills_str}.
-    
-    Return ONLY valid JSON in this format:
+    Generate {num_questions} interview questions for the role: {role_title}
+    The skills to target are: {", ".join(skills)}
+
+    Return ONLY JSON list:
     [
-        {{"skill": "{skills[0] if skills else 'General'}", "qtype": "technical", "prompt": "..."}},
-        {{"skill": "General", "qtype": "behavioral", "prompt": "..."}}
+    {{"skill": "...", "qtype": "...", "prompt": "..."}},
+    ...
     ]
     """
 
-# ... (Keep existing functions)
+def get_extraction_prompt(role_title: str, jd_text: str, top_k: int, num_questions: int) -> str:
+    """Skills, metadata and questions in a single JSON object (used with extraction.SCHEMA)."""
+    return f"""
+    You are an expert HR Tech system and technical interviewer.
+    Read the job description for the role "{role_title}" and return, in a single JSON object:
+    - "skills": the top {top_k} skills the role requires, most important first
+    - "domain": one word
+    - "seniority": the seniority level
+    - "summary": a 1–2 sentence summary of the role
+    - "questions": {num_questions} distinct interview questions spread over those skills, each with
+      "skill" (one of the skills), "qtype" ("technical" or "behavioral") and "prompt"
+
+    JOB DESCRIPTION:
+    {jd_text}
+    """
 
 def get_answer_prompt(question_text: str) -> str:
     return f"""
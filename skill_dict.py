@@ -0,0 +1,197 @@
+# skill_dict.py
+"""
+Canonical skill dictionary.
+
+LLM output names the same skill many ways ("Python", "python3",
+"Python (programming)"). Every skill string is normalized (casefold,
+parenthesized qualifiers and punctuation removed, whitespace collapsed) and
+resolved to one integer id in skill_dict:
+
+  1. the normalized text is looked up in skill_aliases (primary key);
+  2. otherwise a trie of known aliases is searched for the longest alias the
+     text starts with, when the rest is only a version ("python 3.11",
+     "java17"); SEED_ALIASES supplies common abbreviations ("k8s", "golang");
+  3. otherwise the normalized text becomes a new skill.
+
+The spelling resolved is stored as an alias, so each variant costs the trie
+walk once. skills.skill_id and questions.skill_id point at skill_dict; the
+original text stays in the skill columns for display.
+
+Functions take an open connection and do not commit, like dedup.py.
+"""
+import re
+import threading
+import unicodedata
+
+# canonical name -> aliases (all already normalized)
+SEED_ALIASES = {
+    "python": ["py", "python3", "cpython"],
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": ["ts"],
+    "go": ["golang"],
+    "kubernetes": ["k8s", "kube"],
+    "postgresql": ["postgres", "psql"],
+    "node.js": ["node", "nodejs", "node js"],
+    "react": ["react.js", "reactjs", "react js"],
+    "vue": ["vue.js", "vuejs"],
+    "c++": ["cpp"],
+    "c#": ["csharp", "c sharp"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "machine learning": ["ml"],
+    "ci/cd": ["cicd", "ci cd"],
+    "sql": ["structured query language"],
+    "rest": ["rest api", "restful", "restful apis", "rest apis"],
+}
+
+_PARENS = re.compile(r"[(\[{][^)\]}]*[)\]}]")
+_PUNCT = re.compile(r"[^\w\s+#./]")
+_SPACES = re.compile(r"[\s_]+")
+_VERSION = re.compile(r"^\s*v?\d+(\.\d+)*(\.x)?$")
+_MIN_PREFIX = 2
+
+_END = ""  # trie terminal key; never a single character
+
+
+def normalize(text: str) -> str:
+    """Dictionary key for a skill string."""
+    s = unicodedata.normalize("NFKC", text or "").casefold()
+    s = _PARENS.sub(" ", s)
+    s = _PUNCT.sub(" ", s).replace("-", " ")
+    return _SPACES.sub(" ", s).strip().rstrip(".").strip()
+
+
+class Trie:
+    """Character trie mapping alias -> canonical name."""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key: str, value: str):
+        node = self.root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[_END] = value
+
+    def get(self, key: str):
+        node = self.root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node.get(_END)
+
+    def prefixes(self, text: str):
+        """(length, value) for every key that is a prefix of text, longest first."""
+        found, node = [], self.root
+        for i, ch in enumerate(text):
+            node = node.get(ch)
+            if node is None:
+                break
+            if _END in node:
+                found.append((i + 1, node[_END]))
+        return found[::-1]
+
+
+_lock = threading.Lock()
+_trie = Trie()
+for _name, _aliases in SEED_ALIASES.items():
+    for _alias in [_name, *_aliases]:
+        _trie.insert(_alias, _name)
+_loaded = set()   # database files whose alias table is in the trie
+
+
+def match(key: str):
+    """Canonical name for a normalized key from the trie: exact alias, or alias + version suffix."""
+    with _lock:
+        exact = _trie.get(key)
+        if exact is not None:
+            return exact
+        for length, name in _trie.prefixes(key):
+            if length >= _MIN_PREFIX and _VERSION.match(key[length:]):
+                return name
+    return None
+
+
+def _remember(key, name):
+    with _lock:
+        _trie.insert(key, name)
+        _trie.insert(name, name)
+
+
+def _load_aliases(conn):
+    """Put a database's aliases into the trie, once per database file."""
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    if path and path in _loaded:
+        return
+    rows = conn.execute("SELECT a.alias, d.name FROM skill_aliases a JOIN skill_dict d ON d.id = a.skill_id").fetchall()
+    for key, name in rows:
+        _remember(key, name)
+    if path:
+        _loaded.add(path)
+
+
+def lookup(conn, text: str):
+    """skill_dict id for a skill string, or None if it is not known. Never writes."""
+    key = normalize(text)
+    if not key:
+        return None
+    row = conn.execute("SELECT skill_id FROM skill_aliases WHERE alias = ?", (key,)).fetchone()
+    if row:
+        return row[0]
+    _load_aliases(conn)
+    row = conn.execute("SELECT id FROM skill_dict WHERE name = ?", (match(key) or key,)).fetchone()
+    return row[0] if row else None
+
+
+def resolve(conn, text: str):
+    """skill_dict id for a skill string, adding the skill and alias when new. None for empty text."""
+    key = normalize(text)
+    if not key:
+        return None
+    row = conn.execute("SELECT skill_id FROM skill_aliases WHERE alias = ?", (key,)).fetchone()
+    if row:
+        return row[0]
+    _load_aliases(conn)
+    name = match(key) or key
+    conn.execute("INSERT OR IGNORE INTO skill_dict (name, label) VALUES (?, ?)", (name, (text or "").strip()))
+    (skill_id,) = conn.execute("SELECT id FROM skill_dict WHERE name = ?", (name,)).fetchone()
+    conn.execute("INSERT OR IGNORE INTO skill_aliases (alias, skill_id) VALUES (?, ?)", (key, skill_id))
+    _remember(key, name)
+    return skill_id
+
+
+def resolve_many(conn, texts) -> dict:
+    """{text: skill_id} for distinct texts."""
+    return {t: resolve(conn, t) for t in dict.fromkeys(texts)}
+
+
+def add_alias(conn, alias: str, skill: str) -> int:
+    """Map alias to skill's id (creating the skill if needed); existing rows keep their ids."""
+    skill_id = resolve(conn, skill)
+    key = normalize(alias)
+    conn.execute(
+        "INSERT INTO skill_aliases (alias, skill_id) VALUES (?, ?) ON CONFLICT (alias) DO UPDATE SET skill_id = excluded.skill_id",
+        (key, skill_id),
+    )
+    (name,) = conn.execute("SELECT name FROM skill_dict WHERE id = ?", (skill_id,)).fetchone()
+    _remember(key, name)
+    return skill_id
+
+
+def backfill(conn):
+    """Set skill_id on skills and questions rows that have none (migration 11)."""
+    texts = [r[0] for r in conn.execute(
+        "SELECT skill FROM skills WHERE skill_id IS NULL UNION SELECT skill FROM questions WHERE skill_id IS NULL"
+    ).fetchall()]
+    ids = resolve_many(conn, [t for t in texts if t is not None])
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS skill_backfill (skill TEXT PRIMARY KEY, skill_id INTEGER)")
+    conn.execute("DELETE FROM skill_backfill")
+    conn.executemany("INSERT INTO skill_backfill VALUES (?, ?)", [(t, i) for t, i in ids.items() if i is not None])
+    for table in ("skills", "questions"):
+        conn.execute(
+            f"""UPDATE {table} SET skill_id = (SELECT b.skill_id FROM skill_backfill b WHERE b.skill = {table}.skill)
+                WHERE skill_id IS NULL"""
+        )
+    conn.execute("DROP TABLE skill_backfill")
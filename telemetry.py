@@ -0,0 +1,219 @@
+# telemetry.py
+"""
+Per-call LLM telemetry.
+
+Every Gemini call produces one row in llm_metrics: call site, model, prompt
+and response sizes, token usage, latency, cache status, and whether the
+caller managed to parse the output. Rows are queued in memory and written in
+batches by a background thread, so recording never blocks a request.
+
+Call sites wrap their LLM call so the parse outcome lands on the same row:
+
+    with telemetry.llm_call("skills") as rec:
+        raw = _genai_generate(prompt)
+        ...
+        rec["parse_status"] = "ok"
+
+Generators must not yield inside llm_call (the context variable would stay
+set between yields); they build the record, pass it to
+_genai_generate_stream(rec=...) and emit() it when they finish.
+"""
+import atexit
+import contextvars
+import math
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import db_skeleton as db
+import db_pool
+
+FLUSH_INTERVAL = 1.0     # seconds
+FLUSH_BATCH = 200
+QUEUE_SIZE = 10000
+
+COLUMNS = [
+    "ts", "call_site", "model", "prompt_chars", "response_chars", "prompt_tokens", "output_tokens",
+    "total_tokens", "latency_ms", "cache_status", "ok", "parse_status", "jd_tokens_original",
+    "jd_tokens_compacted", "hedged", "hedge_won",
+]
+
+# call sites that run as part of processing a JD (both extraction modes)
+JD_CALL_SITES = ("skills", "questions", "questions_stream", "extract")
+
+_current = contextvars.ContextVar("llm_call", default=None)
+
+
+class MetricsWriter:
+    """Background batch writer for llm_metrics rows."""
+
+    def __init__(self, path=db.DB_PATH):
+        self.path = path
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="llm-metrics-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, row: dict):
+        try:
+            self._queue.put_nowait(tuple(row.get(c) for c in COLUMNS))
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._queue.qsize() >= FLUSH_BATCH:
+            self._wake.set()
+
+    def _drain(self):
+        rows = []
+        while len(rows) < QUEUE_SIZE:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def flush(self):
+        rows = self._drain()
+        if not rows:
+            return
+        marks = ", ".join("?" * len(COLUMNS))
+        try:
+            with db_pool.get_pool(self.path).writer() as conn:
+                with conn:
+                    conn.executemany(f"INSERT INTO llm_metrics ({', '.join(COLUMNS)}) VALUES ({marks})", rows)
+            self.written += len(rows)
+        except Exception as e:
+            print("METRICS WRITE ERROR:", e)
+
+    def _run(self):
+        while True:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer(path=db.DB_PATH) -> MetricsWriter:
+    """The process-wide writer; the first call fixes its database (entry points with --db call it first)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = MetricsWriter(path)
+            atexit.register(_writer.flush)
+        return _writer
+
+
+@contextmanager
+def llm_call(call_site: str, **fields):
+    """Collect fields for one LLM call; the row is emitted on exit."""
+    rec = {"call_site": call_site, **fields}
+    token = _current.set(rec)
+    try:
+        yield rec
+    finally:
+        _current.reset(token)
+        emit(rec)
+
+
+def current():
+    """The record of the enclosing llm_call, or None."""
+    return _current.get()
+
+
+def emit(rec: dict):
+    if "latency_ms" not in rec and "model" not in rec:
+        return  # the block never reached the LLM
+    rec.setdefault("ts", datetime.utcnow().isoformat())
+    rec.setdefault("call_site", "unknown")
+    get_writer().record(rec)
+
+
+def usage_from_response(response) -> dict:
+    """Token counts from a GenerateContentResponse's usage_metadata, if present."""
+    meta = getattr(response, "usage_metadata", None)
+    if meta is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(meta, "prompt_token_count", None),
+        "output_tokens": getattr(meta, "candidates_token_count", None),
+        "total_tokens": getattr(meta, "total_token_count", None),
+    }
+
+
+# --- Read side (dashboard) ---
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))]
+
+
+def summary(conn, days: int = 7) -> list:
+    """Per call site: calls, p50/p95 latency, avg tokens, fallback, cache-hit and hedge rates."""
+    since = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT call_site, latency_ms, total_tokens, parse_status, cache_status, ok, hedged, hedge_won "
+        "FROM llm_metrics WHERE ts >= ?",
+        (since,),
+    )
+    by_site = {}
+    for site, latency, tokens, parse, cache, ok, hedged, hedge_won in cur.fetchall():
+        by_site.setdefault(site, []).append((latency, tokens, parse, cache, ok, hedged, hedge_won))
+
+    out = []
+    for site, rows in sorted(by_site.items()):
+        latencies = [r[0] for r in rows if r[0] is not None]
+        tokens = [r[1] for r in rows if r[1] is not None]
+        parsed = [r[2] for r in rows if r[2] is not None]
+        hedged = sum(1 for r in rows if r[5])
+        out.append({
+            "call_site": site,
+            "calls": len(rows),
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "avg_tokens": (sum(tokens) / len(tokens)) if tokens else 0.0,
+            "fallback_rate": (sum(1 for p in parsed if p == "fallback") / len(parsed)) if parsed else 0.0,
+            "cache_hit_rate": sum(1 for r in rows if r[3] == "hit") / len(rows),
+            "error_rate": sum(1 for r in rows if r[4] == 0) / len(rows),
+            "hedge_rate": hedged / len(rows),
+            "hedge_win_rate": (sum(1 for r in rows if r[6]) / hedged) if hedged else 0.0,
+        })
+    return out
+
+
+def tokens_per_jd(conn, days: int = 7) -> float:
+    """Tokens of the JD_CALL_SITES calls divided by JDs created in the window."""
+    since = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    cur = conn.cursor()
+    marks = ",".join("?" * len(JD_CALL_SITES))
+    cur.execute(
+        f"SELECT coalesce(sum(total_tokens), 0) FROM llm_metrics WHERE ts >= ? AND call_site IN ({marks})",
+        (since, *JD_CALL_SITES),
+    )
+    (tokens,) = cur.fetchone()
+    cur.execute("SELECT count(*) FROM jds WHERE created_at >= ?", (since,))
+    (jds,) = cur.fetchone()
+    return tokens / jds if jds else 0.0
+
+
+def daily_trends(conn, days: int = 30) -> list:
+    """One row per (day, call_site): calls, avg latency, tokens, fallbacks."""
+    since = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT substr(ts, 1, 10) AS day, call_site, count(*), avg(latency_ms), coalesce(sum(total_tokens), 0),
+               sum(CASE WHEN parse_status = 'fallback' THEN 1 ELSE 0 END)
+        FROM llm_metrics WHERE ts >= ?
+        GROUP BY day, call_site ORDER BY day
+        """,
+        (since,),
+    )
+    cols = ["day", "call_site", "calls", "avg_latency_ms", "tokens", "fallbacks"]
+    return [dict(zip(cols, r)) for r in cur.fetchall()]
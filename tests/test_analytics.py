@@ -0,0 +1,107 @@
+# tests/test_analytics.py
+from datetime import datetime
+
+import analytics
+import db_skeleton as db
+from db_skeleton import init_db, save_jd, save_questions, delete_jd, migrate
+
+
+def _consistent(conn):
+    return all(not rows for rows in analytics.check(conn).values())
+
+
+def test_counts_follow_saves_and_deletes():
+    conn = init_db(":memory:")
+    a = save_jd(conn, "Backend", "JD", ["Python", "SQL", "python "], domain="Fintech", seniority="Senior")
+    b = save_jd(conn, "Data", "JD", ["python", "Spark"], domain="fintech", seniority="Mid")
+    save_questions(conn, a, [
+        {"skill": "Python", "qtype": "technical", "prompt": "Explain the GIL."},
+        {"skill": "SQL", "qtype": "behavioral", "prompt": "Tell me about a slow query you fixed."},
+    ])
+    save_questions(conn, b, [{"skill": "Spark", "qtype": "technical", "prompt": "What is a shuffle?"}])
+
+    assert _consistent(conn)
+    top = analytics.skill_frequency(conn, days=1)
+    # "Python" and "python " in one JD count once
+    assert top[0] == {"skill": "python", "jds": 2}
+    assert analytics.domain_distribution(conn, days=1) == [{"domain": "fintech", "jds": 2}]
+    assert analytics.totals(conn, days=1) == {"jds": 2, "questions": 3, "skills": 3}
+    per_skill = {r["skill"]: r for r in analytics.questions_per_skill(conn, days=1)}
+    assert per_skill["sql"]["behavioral"] == 1
+
+    delete_jd(conn, a)
+    assert _consistent(conn)
+    assert analytics.skill_frequency(conn, days=1) == [{"skill": "python", "jds": 1}, {"skill": "spark", "jds": 1}]
+    assert analytics.totals(conn, days=1) == {"jds": 1, "questions": 1, "skills": 2}
+    # rows that drop to zero are removed, not left behind
+    (zero,) = conn.execute("SELECT count(*) FROM stats_skill_daily WHERE jds <= 0").fetchone()
+    assert zero == 0
+
+
+def test_skill_trends_by_day():
+    conn = init_db(":memory:")
+    save_jd(conn, "A", "JD", ["go", "k8s"])
+    old = save_jd(conn, "B", "JD", ["go"])
+    # move one JD back a day; its skill counts move with it
+    conn.execute("UPDATE jds SET created_at = datetime(created_at, '-1 day') WHERE id = ?", (old,))
+    conn.commit()
+    trends = analytics.skill_trends(conn, days=7, top=2)
+    assert len(trends) == 2
+    # k8s resolves to its canonical skill
+    assert all(set(row) == {"go", "kubernetes"} for row in trends.values())
+    assert sum(row["go"] for row in trends.values()) == 2
+    assert _consistent(conn)
+
+
+def test_migration_backfills_existing_rows(tmp_path, monkeypatch):
+    # a database from before the analytics migration
+    monkeypatch.setattr(db, "MIGRATIONS", [m for m in db.MIGRATIONS if m[0] < 9])
+    conn = init_db(str(tmp_path / "jd.db"))
+    now = datetime.utcnow().isoformat()
+    jd_id = conn.execute("INSERT INTO jds (title, jd_text, created_at) VALUES ('Role', 'JD', ?)", (now,)).lastrowid
+    conn.execute("INSERT INTO skills (jd_id, skill) VALUES (?, 'Rust')", (jd_id,))
+    conn.execute("INSERT INTO questions (jd_id, skill, qtype, prompt, created_at) VALUES (?, 'rust', 'technical', 'Explain ownership.', ?)",
+                 (jd_id, now))
+    conn.commit()
+    monkeypatch.undo()
+    migrate(conn)
+    assert analytics.skill_frequency(conn, days=1) == [{"skill": "rust", "jds": 1}]
+    assert _consistent(conn)
+
+
+def test_check_reports_drift_and_rebuild_fixes_it():
+    conn = init_db(":memory:")
+    save_jd(conn, "Role", "JD", ["c++"])
+    conn.execute("UPDATE stats_skill_daily SET jds = 5")
+    conn.commit()
+    diffs = analytics.check(conn)
+    assert [(stored, expected) for _, stored, expected in diffs["stats_skill_daily"]] == [(5, 1)]
+    analytics.rebuild(conn)
+    assert _consistent(conn)
+
+
+def test_aliases_in_one_jd_count_once():
+    conn = init_db(":memory:")
+    for i in range(3):
+        save_jd(conn, f"Role {i}", "JD", ["Python", "python3", "Py", "SQL"])
+    assert analytics.skill_frequency(conn, days=1) == [{"skill": "python", "jds": 3}, {"skill": "sql", "jds": 3}]
+    assert _consistent(conn)
+    delete_jd(conn, 1)
+    assert analytics.skill_frequency(conn, days=1)[0] == {"skill": "python", "jds": 2}
+    assert _consistent(conn)
+
+
+def test_migration_drops_duplicate_skill_rows(tmp_path, monkeypatch):
+    # a database from migration 11, where aliases in one JD were separate rows
+    monkeypatch.setattr(db, "MIGRATIONS", [m for m in db.MIGRATIONS if m[0] < 12])
+    conn = init_db(str(tmp_path / "jd.db"))
+    now = datetime.utcnow().isoformat()
+    jd_id = conn.execute("INSERT INTO jds (title, jd_text, created_at) VALUES ('Role', 'JD', ?)", (now,)).lastrowid
+    conn.executemany("INSERT INTO skills (jd_id, skill) VALUES (?, ?)", [(jd_id, "Python"), (jd_id, "python3")])
+    db.skill_dict.backfill(conn)
+    conn.commit()
+    monkeypatch.undo()
+    migrate(conn)
+    assert db.get_skills_for_jd(conn, jd_id) == ["Python"]
+    assert analytics.skill_frequency(conn, days=1) == [{"skill": "python", "jds": 1}]
+    assert _consistent(conn)
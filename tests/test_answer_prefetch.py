@@ -0,0 +1,90 @@
+# tests/test_answer_prefetch.py
+import threading
+import time
+
+import answer_prefetch
+import db_pool
+from db_skeleton import init_db, save_jd, save_questions, get_answers, get_unanswered_questions
+
+
+def _wait(prefetcher, jd_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        st = prefetcher.status(jd_id)
+        if st and st["finished"]:
+            return st
+        time.sleep(0.01)
+    raise AssertionError("prefetch did not finish")
+
+
+def _setup(tmp_path, n=4):
+    path = str(tmp_path / "p.db")
+    conn = init_db(path)
+    jd_id = save_jd(conn, "Role", "JD", ["s"])
+    save_questions(conn, jd_id, [{"skill": "s", "qtype": "t", "prompt": f"Question {i} about topic {i * 7}?"} for i in range(n)])
+    pool = db_pool.ConnectionPool(path)
+    return pool, jd_id
+
+
+def test_prefetch_records_the_routed_model(tmp_path, monkeypatch):
+    import llm_core
+    from llm_router import ModelRouter
+    monkeypatch.setattr(llm_core, "ROUTER", ModelRouter(tiers={"fast": "fast-model", "standard": None}))
+    monkeypatch.setattr(llm_core, "LLM_MODEL", "sidebar-model")
+    pool, jd_id = _setup(tmp_path, n=1)
+    prefetcher = answer_prefetch.AnswerPrefetcher(generate=lambda p: "An answer.")
+    prefetcher.prefetch(pool, jd_id)
+    _wait(prefetcher, jd_id)
+    with pool.reader() as conn:
+        (model,) = conn.execute("SELECT model FROM answers").fetchone()
+    # answers go through the "answer" route, which is on the fast tier
+    assert model == "fast-model"
+    pool.close()
+
+
+def test_prefetch_stores_answers_and_skips_existing(tmp_path):
+    pool, jd_id = _setup(tmp_path)
+    prompts_seen = []
+    prefetcher = answer_prefetch.AnswerPrefetcher(generate=lambda p: prompts_seen.append(p) or f"A: {p}")
+
+    assert prefetcher.prefetch(pool, jd_id) == 4
+    st = _wait(prefetcher, jd_id)
+    assert st["done"] == 4 and st["failed"] == 0
+    with pool.reader() as conn:
+        assert get_unanswered_questions(conn, jd_id) == []
+        ids = [r[0] for r in conn.execute("SELECT id FROM questions")]
+        stored = get_answers(conn, ids)
+    assert all(a["source"] == "prefetch" for a in stored.values())
+
+    # nothing left to do on a second run
+    assert prefetcher.prefetch(pool, jd_id) == 0
+    assert len(prompts_seen) == 4
+    pool.close()
+
+
+def test_prefetch_cancel_stops_remaining_work(tmp_path):
+    pool, jd_id = _setup(tmp_path, n=6)
+    gate = threading.Event()
+
+    def slow(prompt):
+        gate.wait(5)
+        return "answer"
+
+    prefetcher = answer_prefetch.AnswerPrefetcher(max_workers=1, generate=slow)
+    prefetcher.prefetch(pool, jd_id)
+    prefetcher.cancel(jd_id)
+    gate.set()
+    st = _wait(prefetcher, jd_id)
+    assert st["cancelled"] and st["done"] <= 1
+    pool.close()
+
+
+def test_empty_answers_are_not_stored(tmp_path):
+    pool, jd_id = _setup(tmp_path, n=2)
+    prefetcher = answer_prefetch.AnswerPrefetcher(generate=lambda p: "")
+    prefetcher.prefetch(pool, jd_id)
+    st = _wait(prefetcher, jd_id)
+    assert st["failed"] == 2
+    with pool.reader() as conn:
+        assert len(get_unanswered_questions(conn, jd_id)) == 2
+    pool.close()
@@ -1,4 +1,6 @@
 # tests/test_db.py
+import sqlite3
+
 import pytest
 from db_skeleton import init_db, save_jd, save_questions, get_jds, get_skills_for_jd, get_questions_for_jd, delete_jd
 
@@ -41,3 +43,115 @@ def test_delete_jd_cascades():
     cur.execute("SELECT count(*) FROM questions WHERE jd_id = ?", (jd_id,))
     (c_q,) = cur.fetchone()
     assert c_jd == 0 and c_sk == 0 and c_q == 0
+
+def test_migration_upgrades_existing_db(tmp_path):
+    import sqlite3
+    from db_skeleton import SCHEMA_VERSION
+    path = str(tmp_path / "old.db")
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE jds (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, jd_text TEXT NOT NULL, domain TEXT, seniority TEXT, summary TEXT, created_at TEXT NOT NULL)")
+    old.execute("CREATE TABLE skills (id INTEGER PRIMARY KEY AUTOINCREMENT, jd_id INTEGER NOT NULL, skill TEXT NOT NULL, FOREIGN KEY (jd_id) REFERENCES jds(id) ON DELETE CASCADE)")
+    old.execute("CREATE TABLE questions (id INTEGER PRIMARY KEY AUTOINCREMENT, jd_id INTEGER NOT NULL, skill TEXT, qtype TEXT, prompt TEXT NOT NULL, created_at TEXT NOT NULL, FOREIGN KEY (jd_id) REFERENCES jds(id) ON DELETE CASCADE)")
+    old.execute("INSERT INTO jds (title, jd_text, created_at) VALUES ('Old', 'text', 'now')")
+    old.commit()
+    old.close()
+
+    conn = init_db(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"idx_skills_jd_id", "idx_questions_jd_id"}.issubset(indexes)
+    assert get_jds(conn)[0]["title"] == "Old"
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_failed_migration_leaves_schema_unchanged(tmp_path, monkeypatch):
+    import db_skeleton as db
+    path = str(tmp_path / "m.db")
+    init_db(path).close()
+    version = db.SCHEMA_VERSION
+
+    def fail(conn):
+        raise RuntimeError("step failed")
+    bad = (version + 1, [
+        "ALTER TABLE questions ADD COLUMN difficulty TEXT",
+        "CREATE INDEX idx_questions_difficulty ON questions(difficulty)",
+        fail,
+    ])
+    monkeypatch.setattr(db, "MIGRATIONS", db.MIGRATIONS + [bad])
+    with pytest.raises(RuntimeError):
+        init_db(path)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(questions)")}
+    assert "difficulty" not in cols
+    assert conn.execute("SELECT count(*) FROM sqlite_master WHERE name = 'idx_questions_difficulty'").fetchone()[0] == 0
+
+    # fixed, the migration applies cleanly on the next start
+    bad[1][2] = "SELECT 1"
+    assert init_db(path).execute("PRAGMA user_version").fetchone()[0] == version + 1
+
+def test_save_jd_rolls_back_on_error():
+    conn = init_db(":memory:")
+    try:
+        save_jd(conn, None, "JD text", ["a"])  # title is NOT NULL
+    except Exception:
+        pass
+    assert get_jds(conn) == []
+
+def test_list_jds_keyset_pagination_and_filter():
+    from db_skeleton import list_jds, list_jd_titles, get_jd
+    conn = init_db(":memory:")
+    ids = [save_jd(conn, f"Role {i}" if i % 2 else f"Data_{i}", "JD text", []) for i in range(5)]
+    page1 = list_jds(conn, limit=2)
+    assert [r["id"] for r in page1] == [ids[4], ids[3]]
+    assert set(page1[0]) == {"id", "title", "created_at"}
+    page2 = list_jds(conn, limit=2, before_id=page1[-1]["id"])
+    assert [r["id"] for r in page2] == [ids[2], ids[1]]
+    assert [r["title"] for r in list_jds(conn, title_filter="data_")] == ["Data_4", "Data_2", "Data_0"]
+    assert [r["id"] for r in list_jd_titles(conn)] == ids[::-1]
+    assert get_jd(conn, ids[0])["jd_text"] == "JD text"
+    assert get_jd(conn, 999) is None
+
+def test_question_paging():
+    from db_skeleton import count_questions_for_jd
+    conn = init_db(":memory:")
+    jd_id = save_jd(conn, "Role", "JD", [])
+    save_questions(conn, jd_id, [{"skill": "s", "qtype": "t", "prompt": f"Q{i}"} for i in range(7)])
+    assert count_questions_for_jd(conn, jd_id) == 7
+    assert [q["prompt"] for q in get_questions_for_jd(conn, jd_id, limit=3, offset=3)] == ["Q3", "Q4", "Q5"]
+
+def test_fulltext_search_tracks_inserts_and_deletes():
+    from db_skeleton import search
+    conn = init_db(":memory:")
+    jd_id = save_jd(conn, "Backend Engineer", "Build REST services in Python and PostgreSQL", ["python"])
+    save_questions(conn, jd_id, [{"skill": "sql", "qtype": "technical", "prompt": "How do you optimize slow queries?"}])
+    res = search(conn, "postgre")
+    assert [r["id"] for r in res["jds"]] == [jd_id]
+    assert "**PostgreSQL**" in res["jds"][0]["snippet"]
+    res = search(conn, "optimizing")  # porter stemming
+    assert res["questions"][0]["jd_id"] == jd_id
+    assert search(conn, 'bad "syntax (') == {"jds": [], "questions": []}
+    delete_jd(conn, jd_id)
+    assert search(conn, "python") == {"jds": [], "questions": []}
+
+def test_answers_shared_by_near_duplicates_and_cascade():
+    from db_skeleton import save_answer, get_answers, get_unanswered_questions
+    conn = init_db(":memory:")
+    jd_id = save_jd(conn, "Role", "JD text", ["s"])
+    save_questions(conn, jd_id, [
+        {"skill": "s", "qtype": "t", "prompt": "Describe how you would design a rate limiter for a public API."},
+        {"skill": "s", "qtype": "t", "prompt": "Describe how you would design a rate limiter for a public API service."},
+        {"skill": "s", "qtype": "t", "prompt": "What is a database index?"},
+    ])
+    qs = get_questions_for_jd(conn, jd_id)
+    assert qs[1]["canonical_id"] == qs[0]["id"]
+    assert [t["question_id"] for t in get_unanswered_questions(conn, jd_id)] == [qs[0]["id"], qs[2]["id"]]
+
+    save_answer(conn, qs[0]["id"], "Token bucket per key.", "m", "v1")
+    save_answer(conn, qs[0]["id"], "Sliding window per key.", "m", "v1")  # replaces
+    answers = get_answers(conn, [q["canonical_id"] or q["id"] for q in qs])
+    assert answers[qs[0]["id"]]["answer"] == "Sliding window per key."
+    assert [t["question_id"] for t in get_unanswered_questions(conn, jd_id)] == [qs[2]["id"]]
+
+    delete_jd(conn, jd_id)
+    assert conn.execute("SELECT count(*) FROM answers").fetchone()[0] == 0
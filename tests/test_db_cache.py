@@ -0,0 +1,42 @@
+# tests/test_db_cache.py
+import db_cache
+from db_skeleton import init_db, save_jd, save_questions, delete_jd, save_answer
+
+
+def _setup():
+    db_cache.clear()
+    conn = init_db(":memory:")
+    jd_id = save_jd(conn, "Role", "JD text", ["a"])
+    save_questions(conn, jd_id, [{"skill": "a", "qtype": "t", "prompt": "Explain X."}])
+    return conn, jd_id
+
+
+def test_repeat_reads_hit_cache_and_return_copies():
+    conn, jd_id = _setup()
+    before = dict(db_cache.STATS)
+    first = db_cache.get_questions_for_jd(conn, jd_id)
+    first[0]["answer"] = "mutated by the view"
+    second = db_cache.get_questions_for_jd(conn, jd_id)
+    assert "answer" not in second[0]
+    assert db_cache.STATS["hits"] - before["hits"] == 1
+    assert db_cache.STATS["misses"] - before["misses"] == 1
+
+
+def test_writes_invalidate_dependent_reads():
+    conn, jd_id = _setup()
+    assert db_cache.count_questions_for_jd(conn, jd_id) == 1
+    assert len(db_cache.list_jds(conn)) == 1
+
+    save_questions(conn, jd_id, [{"skill": "a", "qtype": "t", "prompt": "Describe a time you did Y."}])
+    assert db_cache.count_questions_for_jd(conn, jd_id) == 2
+
+    qid = db_cache.get_questions_for_jd(conn, jd_id)[0]["id"]
+    assert db_cache.get_answers(conn, [qid]) == {}
+    save_answer(conn, qid, "Because Z.")
+    assert db_cache.get_answers(conn, [qid])[qid]["answer"] == "Because Z."
+
+    save_jd(conn, "Other", "JD", [])
+    assert len(db_cache.list_jds(conn)) == 2
+    delete_jd(conn, jd_id)
+    assert db_cache.get_jd(conn, jd_id) is None
+    assert db_cache.count_questions_for_jd(conn, jd_id) == 0
@@ -0,0 +1,55 @@
+# tests/test_db_pool.py
+import sqlite3
+import threading
+import pytest
+import db_skeleton as db
+from db_pool import ConnectionPool, PoolTimeout, read_conn, write_conn
+
+def test_reads_see_writes_and_readers_are_read_only(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "p.db"), max_readers=2)
+    with pool.writer() as conn:
+        jd_id = db.save_jd(conn, "Role", "JD", ["python"])
+    with pool.reader() as conn:
+        assert db.get_skills_for_jd(conn, jd_id) == ["python"]
+        with pytest.raises(sqlite3.OperationalError):
+            db.save_jd(conn, "Nope", "JD", [])
+    pool.close()
+
+def test_reader_is_reentrant_per_thread(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "p.db"), max_readers=1, checkout_timeout=0.1)
+    with pool.reader() as outer:
+        with pool.reader() as inner:
+            assert inner is outer
+        # another thread cannot get the only reader
+        errors = []
+        def other():
+            try:
+                with pool.reader():
+                    pass
+            except PoolTimeout as e:
+                errors.append(e)
+        t = threading.Thread(target=other)
+        t.start(); t.join()
+        assert errors
+    assert pool.stats()["read"]["checkouts"] == 1
+    pool.close()
+
+def test_concurrent_writers_are_serialized(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "p.db"))
+    with pool.writer() as conn:
+        jd_id = db.save_jd(conn, "Role", "JD", [])
+    def work(i):
+        with pool.writer() as conn:
+            db.save_questions(conn, jd_id, [{"skill": "s", "qtype": "t", "prompt": f"Q{i}"}])
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(20)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    with pool.reader() as conn:
+        assert len(db.get_questions_for_jd(conn, jd_id)) == 20
+    assert pool.stats()["write"]["checkouts"] == 21
+    pool.close()
+
+def test_helpers_accept_plain_connection():
+    conn = db.init_db(":memory:")
+    with write_conn(conn) as w, read_conn(conn) as r:
+        assert w is conn and r is conn
@@ -0,0 +1,63 @@
+# tests/test_dedup.py
+import dedup
+from db_skeleton import init_db, save_jd, save_questions, save_answer, get_answers, get_questions_for_jd, delete_jd
+
+def _q(prompt, skill="python"):
+    return {"skill": skill, "qtype": "technical", "prompt": prompt}
+
+def test_similarity_of_signatures():
+    a = dedup.minhash("Explain the difference between a list and a tuple in Python.")
+    b = dedup.minhash("Explain the difference between a list and a tuple in Python?")
+    c = dedup.minhash("Describe a time you resolved a conflict with a teammate.")
+    assert dedup.similarity(a, b) == 1.0
+    assert dedup.similarity(a, c) < 0.3
+
+def test_near_duplicates_link_to_canonical_across_jds():
+    conn = init_db(":memory:")
+    jd1 = save_jd(conn, "Backend", "JD", [])
+    save_questions(conn, jd1, [_q("Explain the difference between a list and a tuple in Python."),
+                               _q("How does the GIL affect multithreaded Python programs?")])
+    jd2 = save_jd(conn, "Data", "JD", [])
+    save_questions(conn, jd2, [_q("Explain the difference between a list and a tuple in Python 3."),
+                               _q("What is a window function in SQL?", skill="sql")])
+    first = get_questions_for_jd(conn, jd1)
+    second = get_questions_for_jd(conn, jd2)
+    assert first[0]["canonical_id"] is None
+    assert second[0]["canonical_id"] == first[0]["id"]
+    assert second[0]["canonical_prompt"] == first[0]["prompt"]
+    assert second[1]["canonical_id"] is None
+
+def test_rebuild_and_delete_cleanup():
+    conn = init_db(":memory:")
+    jd1 = save_jd(conn, "A", "JD", [])
+    save_questions(conn, jd1, [_q("How would you design a rate limiter for a public API serving thousands of clients?")])
+    jd2 = save_jd(conn, "B", "JD", [])
+    save_questions(conn, jd2, [_q("How would you design a rate limiter for a public API serving many thousands of clients?")])
+    assert dedup.rebuild(conn) == {"questions": 2, "duplicates": 1}
+    delete_jd(conn, jd1)
+    assert get_questions_for_jd(conn, jd2)[0]["canonical_id"] is None
+    (lsh_rows,) = conn.execute("SELECT count(*) FROM question_lsh").fetchone()
+    assert lsh_rows == dedup.BANDS  # the orphan was promoted to canonical and banded
+    (sigs,) = conn.execute("SELECT count(*) FROM question_minhash").fetchone()
+    assert sigs == 1
+    assert dedup.rebuild(conn) == {"questions": 1, "duplicates": 0}
+
+def test_delete_promotes_an_orphaned_duplicate():
+    conn = init_db(":memory:")
+    prompt = "Explain the difference between a process and a thread in an operating system."
+    jds = []
+    for title, suffix in (("A", ""), ("B", "?"), ("C", " today.")):
+        jds.append(save_jd(conn, title, "JD", []))
+        save_questions(conn, jds[-1], [_q(prompt + suffix)])
+    canonical, dup_b, dup_c = (get_questions_for_jd(conn, j)[0]["id"] for j in jds)
+    assert get_questions_for_jd(conn, jds[2])[0]["canonical_id"] == canonical
+    save_answer(conn, canonical, "Threads share an address space.")
+
+    delete_jd(conn, jds[0])
+    assert get_questions_for_jd(conn, jds[1])[0]["canonical_id"] is None
+    assert get_questions_for_jd(conn, jds[2])[0]["canonical_id"] == dup_b
+    assert get_answers(conn, [dup_b])[dup_b]["answer"] == "Threads share an address space."
+    # the promoted question is banded, so new near-duplicates find it
+    jd4 = save_jd(conn, "D", "JD", [])
+    save_questions(conn, jd4, [_q(prompt + "!")])
+    assert get_questions_for_jd(conn, jd4)[0]["canonical_id"] == dup_b
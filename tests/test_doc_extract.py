@@ -0,0 +1,119 @@
+# tests/test_doc_extract.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import doc_extract
+
+def test_txt_extraction_and_cache(monkeypatch):
+    doc_extract.clear_cache()
+    data = "Senior Python Engineer\nBuild APIs.".encode("utf-8")
+    out = doc_extract.extract_text("jd.txt", data)
+    assert out.text == "Senior Python Engineer\nBuild APIs." and not out.truncated
+
+    calls = []
+    real = doc_extract.iter_text
+    monkeypatch.setattr(doc_extract, "iter_text", lambda *a, **k: calls.append(1) or real(*a, **k))
+    doc_extract.extract_text("jd.txt", data)
+    assert calls == []  # served from cache
+    doc_extract.extract_text("other.txt", b"different")
+    assert calls == [1]
+
+def test_iter_text_streams_large_txt():
+    data = ("x" * (doc_extract.TEXT_CHUNK_CHARS * 2 + 10)).encode("utf-8")
+    chunks = list(doc_extract.iter_text("big.txt", data))
+    assert len(chunks) == 3
+    assert sum(len(c) for c in chunks) == len(data)
+
+def test_unsupported_extension():
+    try:
+        doc_extract.extract_text("jd.rtf", b"{\\rtf1}")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+class _Page:
+    def __init__(self, i):
+        self.i = i
+
+    def extract_text(self):
+        return f"page {self.i}"
+
+
+def _fake_pdf(monkeypatch, n_pages, slow_pages=(), bad_pages=()):
+    """n fake pages, extracted on a thread pool; slow pages block until released."""
+    release = threading.Event()
+    pages = [_Page(i) for i in range(n_pages)]
+
+    def extract(data, start, stop):
+        if any(i in bad_pages for i in range(start, stop)):
+            raise RuntimeError("bad page")
+        if any(i in slow_pages for i in range(start, stop)):
+            release.wait(5)
+        return [pages[i].extract_text() for i in range(start, stop)]
+
+    monkeypatch.setattr(doc_extract, "_pdf_pages", lambda data: pages)
+    monkeypatch.setattr(doc_extract, "_extract_pdf_pages", extract)
+    # a timeout discards the pool, so each extraction gets a fresh one
+    monkeypatch.setattr(doc_extract, "_get_pool", lambda: ThreadPoolExecutor(max_workers=4))
+    monkeypatch.setattr(doc_extract, "PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(doc_extract, "PAGES_PER_TASK", 2)
+    doc_extract.clear_cache()
+    return release
+
+
+def test_parallel_pdf_pages_merge_in_order(monkeypatch):
+    _fake_pdf(monkeypatch, 9)
+    out = doc_extract.extract_text("jd.pdf", b"%PDF")
+    assert out.text.split("\n") == [f"page {i}" for i in range(9)]
+    assert not out.truncated
+    # complete results are cached
+    monkeypatch.setattr(doc_extract, "iter_text", None)
+    assert doc_extract.extract_text("jd.pdf", b"%PDF").text == out.text
+
+
+def test_pdf_timeout_is_reported_and_not_cached(monkeypatch):
+    release = _fake_pdf(monkeypatch, 8, slow_pages={4})
+    out = doc_extract.extract_text("jd.pdf", b"%PDF", timeout=0.2)
+    release.set()
+    assert out.truncated and out.notes == ["pages 5-6 timed out"]
+    assert out.text.split("\n") == ["page 0", "page 1", "page 2", "page 3", "page 6", "page 7"]
+    # the next attempt extracts again and gets the whole document
+    assert not doc_extract.extract_text("jd.pdf", b"%PDF", timeout=5).truncated
+
+
+def test_pdf_page_cap_and_errors_are_reported(monkeypatch):
+    _fake_pdf(monkeypatch, 12, bad_pages={0})
+    out = doc_extract.extract_text("jd.pdf", b"%PDF", max_pages=8)
+    assert out.notes == ["only the first 8 of 12 pages were read", "pages 1-2 could not be read"]
+    assert out.text.split("\n") == [f"page {i}" for i in range(2, 8)]
+    calls = []
+    real = doc_extract.iter_text
+    monkeypatch.setattr(doc_extract, "iter_text", lambda *a, **k: calls.append(1) or real(*a, **k))
+    doc_extract.extract_text("jd.pdf", b"%PDF", max_pages=8)
+    assert calls == [1]  # truncated text was not cached
+
+
+def test_small_pdf_is_bounded_by_the_timeout(monkeypatch):
+    release = _fake_pdf(monkeypatch, 2, slow_pages={1})
+    out = doc_extract.extract_text("jd.pdf", b"%PDF", timeout=0.2)
+    release.set()
+    assert out.notes == ["pages 1-2 timed out"] and out.text == ""
+
+
+def test_discarded_pool_kills_its_workers(monkeypatch):
+    import multiprocessing
+    import time
+    monkeypatch.setattr(doc_extract, "_pool", None)
+    pool = doc_extract._get_pool()
+    stuck = pool.submit(time.sleep, 60)
+    while not stuck.running():
+        time.sleep(0.01)
+    workers = {p.pid for p in multiprocessing.active_children()}
+    doc_extract._discard_pool(pool)
+    deadline = time.monotonic() + 10
+    while workers & {p.pid for p in multiprocessing.active_children()} and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert workers and not workers & {p.pid for p in multiprocessing.active_children()}
+    assert doc_extract._get_pool() is not pool
+    doc_extract._discard_pool(doc_extract._get_pool())
@@ -0,0 +1,88 @@
+# tests/test_extraction.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import fake_gemini
+import jd_logic
+import llm_core
+from db_skeleton import init_db, get_questions_for_jd, get_skills_for_jd
+from extraction import ExtractionError, validate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_validate_normalizes_and_caps():
+    data = {
+        "skills": [" Python ", "python", "", "SQL", 3, "Go"],
+        "domain": " Data ", "seniority": "senior", "summary": None,
+        "questions": [
+            {"skill": "Python", "qtype": "Technical", "prompt": " Explain GIL. "},
+            {"skill": "Python", "qtype": "technical", "prompt": "explain gil."},
+            {"skill": "", "qtype": "trivia", "prompt": "Why SQL?"},
+            {"skill": "SQL", "qtype": "behavioral", "prompt": ""},
+            "not a question",
+        ],
+    }
+    ext = validate(data, top_k=2, num_questions=10)
+    assert ext.skills == ["Python", "SQL"]
+    assert ext.domain == "Data" and ext.summary == ""
+    assert ext.question_dicts() == [
+        {"skill": "Python", "qtype": "technical", "prompt": "Explain GIL."},
+        {"skill": "Python", "qtype": "technical", "prompt": "Why SQL?"},
+    ]
+
+
+@pytest.mark.parametrize("data", [[], {"skills": [], "questions": [{"prompt": "Q"}]}, {"skills": ["a"], "questions": []}])
+def test_validate_rejects_unusable(data):
+    with pytest.raises(ExtractionError):
+        validate(data)
+
+
+def test_single_mode_pipeline_is_one_round_trip(monkeypatch):
+    client = fake_gemini.FakeClient(sleep=lambda s: None)
+    configs = []
+    monkeypatch.setattr(llm_core, "LLM_CLIENT", client)
+    monkeypatch.setattr(llm_core, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm_core, "_gen_config", lambda t, m, schema=None, thinking=None: configs.append(schema))
+    monkeypatch.setattr(jd_logic.telemetry, "emit", lambda rec: None)
+    conn = init_db(":memory:")
+    jd_id, parsed, questions, stats = jd_logic.run_jd_pipeline(conn, "Data Engineer", "Python and SQL",
+                                                               top_k=4, num_questions=8, mode="single")
+    assert client.calls == 1 and configs[0] is not None  # JSON mode with the schema
+    assert parsed["domain"] == "Data" and get_skills_for_jd(conn, jd_id) == parsed["skills"]
+    assert len(parsed["skills"]) == 4
+    assert len(get_questions_for_jd(conn, jd_id)) == len(questions) == 8
+    assert stats["generated"] == 8
+
+
+def test_extraction_falls_back_or_raises(monkeypatch):
+    monkeypatch.setattr(jd_logic, "_genai_generate", lambda prompt, **kwargs: "not json at all")
+    ext = jd_logic.call_llm_for_extraction("Role", "jd", top_k=2)
+    assert ext.skills == ["Skill A", "Skill B"] and ext.questions
+    with pytest.raises(jd_logic.LLMOutputError):
+        jd_logic.call_llm_for_extraction("Role", "jd", fallback=False)
+
+
+def test_two_call_is_the_default_mode():
+    env = {k: v for k, v in os.environ.items() if k != "JD_EXTRACTION_MODE"}
+    out = subprocess.run([sys.executable, "-c", "import jd_logic; print(jd_logic.EXTRACTION_MODE)"],
+                         cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "two_call"
+
+
+def test_single_mode_saves_jd_and_questions_together(monkeypatch):
+    monkeypatch.setattr(llm_core, "LLM_CLIENT", fake_gemini.FakeClient(sleep=lambda s: None))
+    monkeypatch.setattr(llm_core, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(jd_logic.telemetry, "emit", lambda rec: None)
+
+    def fail(*a, **k):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(jd_logic.db, "_insert_questions", fail)
+    conn = init_db(":memory:")
+    with pytest.raises(RuntimeError):
+        jd_logic.run_jd_pipeline(conn, "Data Engineer", "Python and SQL", mode="single")
+    assert conn.execute("SELECT count(*) FROM jds").fetchone()[0] == 0
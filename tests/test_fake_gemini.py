@@ -0,0 +1,41 @@
+# tests/test_fake_gemini.py
+import json
+import pytest
+import fake_gemini
+
+def test_canned_shapes_and_usage():
+    client = fake_gemini.FakeClient()
+    resp = client.models.generate_content(model="m", contents="Extract the top 6 skills ...")
+    assert json.loads(resp.text)["skills"]
+    resp = client.models.generate_content(model="m", contents="Generate 5 interview questions for the role: X\n"
+                                                              "    The skills to target are: Go, Rust\n")
+    questions = json.loads(resp.text)
+    assert len(questions) == 5 and {q["skill"] for q in questions} == {"Go", "Rust"}
+    assert resp.usage_metadata.total_token_count > 0
+    assert client.calls == 2
+
+def test_error_injection_and_latency_distribution():
+    slept = []
+    client = fake_gemini.FakeClient(latency=fake_gemini.ConstantLatency(0.25), error_rate=1.0,
+                                    error_codes=(429,), sleep=slept.append)
+    with pytest.raises(fake_gemini.FakeAPIError) as exc:
+        client.models.generate_content(model="m", contents="hi")
+    assert exc.value.code == 429 and slept == [0.25]
+
+def test_stream_reassembles_to_full_text():
+    client = fake_gemini.FakeClient(chunk_chars=16, sleep=lambda s: None)
+    full = client.models.generate_content(model="m", contents="answer please").text
+    chunks = list(client.models.generate_content_stream(model="m", contents="answer please"))
+    assert len(chunks) > 1 and "".join(c.text for c in chunks) == full
+
+def test_pipeline_end_to_end_with_fake_client(monkeypatch):
+    import llm_core
+    import jd_logic
+    from db_skeleton import init_db, get_questions_for_jd
+    monkeypatch.setattr(llm_core, "LLM_CLIENT", fake_gemini.FakeClient(sleep=lambda s: None))
+    monkeypatch.setattr(llm_core, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(jd_logic.telemetry, "emit", lambda rec: None)
+    conn = init_db(":memory:")
+    jd_id, parsed, questions, _ = jd_logic.run_jd_pipeline(conn, "Data Engineer", "Python and SQL", num_questions=12)
+    assert parsed["domain"] == "Data"
+    assert len(get_questions_for_jd(conn, jd_id)) == 12
@@ -0,0 +1,62 @@
+# tests/test_ingest.py
+import ingest_cli as mod
+from db_skeleton import init_db, get_jds, get_checkpoint
+
+def _fake_llm(monkeypatch, calls):
+    def skills(jd_text, top_k=6):
+        calls.append("skills")
+        return {"skills": ["python"], "domain": "Data", "seniority": "mid", "summary": "s"}
+    def questions(title, skills, num_questions=40):
+        calls.append("questions")
+        return [{"skill": "python", "qtype": "technical", "prompt": f"Q for {title}"}]
+    monkeypatch.setattr(mod.llm, "call_llm_for_skills", skills)
+    monkeypatch.setattr(mod.llm, "call_llm_for_questions", questions)
+
+def test_ingest_and_resume(tmp_path, monkeypatch):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text(f"JD text for {name}")
+    (tmp_path / "ignore.md").write_text("not a JD")
+    calls = []
+    _fake_llm(monkeypatch, calls)
+    conn = init_db(":memory:")
+
+    summary = mod.run_ingest(str(tmp_path), conn, workers=2, rpm=0)
+    assert summary["done"] == 2 and summary["failed"] == 0
+    assert len(get_jds(conn)) == 2
+    assert get_checkpoint(conn, str(tmp_path / "a.txt"))["status"] == "done"
+
+    # Second run resumes: nothing left to do
+    calls.clear()
+    summary = mod.run_ingest(str(tmp_path), conn, workers=2, rpm=0)
+    assert summary["skipped"] == 2 and summary["done"] == 0
+    assert calls == []
+
+    # Changed content is re-ingested
+    (tmp_path / "a.txt").write_text("updated JD text")
+    summary = mod.run_ingest(str(tmp_path), conn, workers=2, rpm=0)
+    assert summary["done"] == 1 and summary["skipped"] == 1
+
+def test_save_and_done_checkpoint_commit_together(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("JD text")
+    _fake_llm(monkeypatch, [])
+    conn = init_db(":memory:")
+
+    def fail(*a, **k):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(mod.db, "_insert_questions", fail)
+    summary = mod.run_ingest(str(tmp_path), conn, workers=1, rpm=0)
+    assert summary["failed"] == 1
+    # nothing from the failed save was kept, so a re-run starts clean
+    assert get_jds(conn) == []
+    assert get_checkpoint(conn, str(tmp_path / "a.txt"))["status"] == "failed"
+
+    monkeypatch.undo()
+    _fake_llm(monkeypatch, [])
+    assert mod.run_ingest(str(tmp_path), conn, workers=1, rpm=0)["done"] == 1
+    cp = get_checkpoint(conn, str(tmp_path / "a.txt"))
+    assert cp["status"] == "done" and cp["jd_id"] == get_jds(conn)[0]["id"]
+
+def test_percentile():
+    assert mod.percentile([], 50) == 0.0
+    assert mod.percentile([1, 2, 3, 4], 50) == 2
+    assert mod.percentile(list(range(1, 101)), 95) == 95
@@ -0,0 +1,66 @@
+# tests/test_jd_compact.py
+from jd_compact import compact_jd, estimate_tokens
+
+JD = """
+ACME Corp  |  Careers          Page 1
+
+Senior   Data Engineer
+
+Responsibilities:
+- Build   batch and streaming pipelines in Python and Spark
+- Own our Airflow deployment
+
+ACME Corp  |  Careers          Page 1
+
+Benefits
+- Unlimited PTO
+- 401k matching
+
+Requirements
+- 5+ years with SQL
+
+ACME is an equal opportunity employer. All qualified applicants will receive consideration.
+"""
+
+def test_strips_boilerplate_and_repeats():
+    res = compact_jd(JD)
+    text = res["text"]
+    assert text.count("ACME Corp | Careers Page 1") == 1
+    assert "Build batch and streaming pipelines in Python and Spark" in text
+    assert "Unlimited PTO" not in text and "401k" not in text
+    assert "Requirements" in text and "5+ years with SQL" in text
+    assert "equal opportunity" not in text
+    assert res["compacted_tokens"] < res["original_tokens"]
+
+def test_unlisted_heading_ends_boilerplate_section():
+    jd = "Perks\n- Free lunch\n- Gym stipend\nTech Stack:\n- Rust and Kafka\nBenefits\n- 401k\nOUR STACK\n- Postgres"
+    text = compact_jd(jd)["text"]
+    assert "Free lunch" not in text and "401k" not in text
+    assert "Tech Stack:\n- Rust and Kafka" in text
+    assert "OUR STACK\n- Postgres" in text
+
+def test_trims_to_token_budget():
+    long_jd = "\n".join(f"Line {i} about distributed systems and Kubernetes." for i in range(500))
+    res = compact_jd(long_jd, max_tokens=100)
+    assert res["compacted_tokens"] <= 100
+    assert res["text"].startswith("Line 0 ")
+
+def test_never_empty_for_nonempty_input():
+    assert compact_jd("Benefits\nFree lunch")["text"]
+    assert estimate_tokens("") == 0
+
+def test_repeated_bullets_survive_and_repeated_heading_ends_boilerplate():
+    jd = ("Backend Engineer\nRequirements:\n- Python\n- Postgres\nNice to have:\n- Python\n"
+          "Benefits\n- Dental\nRequirements:\n- Kafka")
+    text = compact_jd(jd)["text"]
+    assert text.count("- Python") == 2
+    assert "Dental" not in text
+    assert text.endswith("Requirements:\n- Kafka")
+
+def test_budget_drops_low_value_sections_before_requirements():
+    about = "\n".join(f"Our company story, chapter {i}, told at length." for i in range(40))
+    jd = f"Platform Engineer\nAbout us:\n{about}\nRequirements:\n- Terraform\n- 3+ years of Go"
+    text = compact_jd(jd, max_tokens=40)["text"]
+    assert "Requirements:\n- Terraform\n- 3+ years of Go" in text
+    assert text.startswith("Platform Engineer")
+    assert "chapter 39" not in text
@@ -0,0 +1,248 @@
+# tests/test_jobs.py
+import pytest
+
+import jd_logic
+import jobs
+import db_pool
+import llm_core
+from db_skeleton import init_db, get_questions_for_jd, get_jds
+
+
+@pytest.fixture(autouse=True)
+def _llm_client(monkeypatch):
+    # jobs only run with a configured client; the LLM calls themselves are faked
+    monkeypatch.setattr(llm_core, "LLM_CLIENT", object())
+
+
+def _pool(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    init_db(path)
+    return db_pool.ConnectionPool(path)
+
+
+def _fake_llm(monkeypatch, calls, fail_questions_for=()):
+    def skills(jd_text, top_k=6, compact=True, fallback=True):
+        calls.append("skills")
+        return {"skills": ["Python", "SQL"], "domain": "Data", "seniority": "senior", "summary": "s"}
+
+    def questions(title, skills, num_questions=40, fallback=True):
+        calls.append(("questions", tuple(skills)))
+        if skills and skills[0] in fail_questions_for and not fallback:
+            fail_questions_for.remove(skills[0])
+            raise jd_logic.LLMOutputError("bad output")
+        return [{"skill": skills[0], "qtype": "technical", "prompt": f"{skills[0]} question {i}?"}
+                for i in range(num_questions)]
+
+    monkeypatch.setattr(jd_logic, "call_llm_for_skills", skills)
+    monkeypatch.setattr(jd_logic, "stream_questions", questions)
+
+
+def test_job_runs_all_stages(tmp_path, monkeypatch):
+    calls = []
+    _fake_llm(monkeypatch, calls)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Data Eng", "JD text", top_k=2, num_questions=4, mode="two_call")
+
+    assert jobs.run_one(pool, "w1") is True
+    assert jobs.run_one(pool, "w1") is False  # queue empty
+
+    with pool.reader() as conn:
+        job = jobs.get_job(conn, job_id)
+        assert job["status"] == "done" and job["stage"] == "done"
+        assert job["progress_done"] == job["progress_total"] == 4
+        qs = get_questions_for_jd(conn, job["jd_id"])
+    assert job["result"]["questions"] == 4 and len(qs) == 4
+    pool.close()
+
+
+def test_retry_resumes_without_duplicating_work(tmp_path, monkeypatch):
+    calls = []
+    _fake_llm(monkeypatch, calls, fail_questions_for=["SQL"])
+    monkeypatch.setattr(jobs, "RETRY_BASE", 0.0)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Data Eng", "JD text", top_k=2, num_questions=4, mode="two_call")
+
+    jobs.run_one(pool, "w1")
+    with pool.reader() as conn:
+        job = jobs.get_job(conn, job_id)
+    assert job["status"] == "queued" and job["error"] == "bad output"
+    assert job["state"]["done_chunks"] == [0]
+
+    jobs.run_one(pool, "w2")
+    with pool.reader() as conn:
+        job = jobs.get_job(conn, job_id)
+        assert job["status"] == "done" and job["attempts"] == 2
+        assert len(get_jds(conn)) == 1
+        qs = get_questions_for_jd(conn, job["jd_id"])
+    assert sorted(q["skill"] for q in qs) == ["Python", "Python", "SQL", "SQL"]
+    # skills and the Python chunk were not re-run
+    assert calls.count("skills") == 1
+    assert calls.count(("questions", ("Python",))) == 1
+    pool.close()
+
+
+def test_expired_lease_is_reclaimed_and_old_worker_stops(tmp_path, monkeypatch):
+    calls = []
+    _fake_llm(monkeypatch, calls)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Role", "JD text", num_questions=2, mode="two_call")
+        first = jobs.claim_job(conn, "dead", now=1000.0)
+        assert jobs.claim_job(conn, "other", now=1001.0) is None  # still leased
+        second = jobs.claim_job(conn, "alive", now=1000.0 + jobs.LEASE_SECONDS + 1)
+    assert first["id"] == second["id"] == job_id and second["attempts"] == 2
+
+    with pytest.raises(jobs.LeaseLost):
+        jobs.run_jd_job(pool, first, "dead")
+    pool.close()
+
+
+def test_cancel_stops_job(tmp_path, monkeypatch):
+    calls = []
+    _fake_llm(monkeypatch, calls)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Role", "JD text")
+        assert jobs.cancel_job(conn, job_id)
+    assert jobs.run_one(pool, "w1") is False
+    with pool.reader() as conn:
+        assert jobs.get_job(conn, job_id)["status"] == "cancelled"
+    assert calls == []
+    pool.close()
+
+
+def test_single_call_mode_job(tmp_path, monkeypatch):
+    import fake_gemini
+    import llm_core
+    monkeypatch.setattr(llm_core, "LLM_CLIENT", fake_gemini.FakeClient(sleep=lambda s: None))
+    monkeypatch.setattr(llm_core, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(jd_logic.telemetry, "emit", lambda rec: None)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Data Eng", "JD text", top_k=3, num_questions=5, mode="single")
+    jobs.run_one(pool, "w1")
+    with pool.reader() as conn:
+        job = jobs.get_job(conn, job_id)
+        assert job["status"] == "done" and job["progress_total"] == 5
+        assert len(get_questions_for_jd(conn, job["jd_id"])) == 5
+    assert job["result"]["reuse"]["generated"] == 5
+    assert llm_core.LLM_CLIENT.calls == 1
+    pool.close()
+
+
+def test_questions_saved_in_skill_order(tmp_path, monkeypatch):
+    import time as _time
+    delays = {"python": 0.06, "sql": 0.03, "docker": 0.0}   # earlier skills finish last
+
+    def skills(jd_text, top_k=6, compact=True, fallback=True):
+        return {"skills": ["python", "sql", "docker"], "domain": "", "seniority": "", "summary": ""}
+
+    def questions(title, skills, num_questions=40, fallback=True):
+        _time.sleep(delays[skills[0]])
+        return [{"skill": skills[0], "qtype": "technical", "prompt": f"{skills[0]} question?"}]
+
+    monkeypatch.setattr(jd_logic, "call_llm_for_skills", skills)
+    monkeypatch.setattr(jd_logic, "stream_questions", questions)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Role", "JD text", top_k=3, num_questions=3, mode="two_call")
+    jobs.run_one(pool, "w1")
+    with pool.reader() as conn:
+        job = jobs.get_job(conn, job_id)
+        assert job["status"] == "done"
+        assert [q["skill"] for q in get_questions_for_jd(conn, job["jd_id"])] == ["python", "sql", "docker"]
+    assert job["state"]["done_chunks"] == [0, 1, 2]
+    pool.close()
+
+
+def test_jd_row_and_job_pointer_commit_together(tmp_path, monkeypatch):
+    calls = []
+    _fake_llm(monkeypatch, calls)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Role", "JD text", num_questions=2, mode="two_call")
+        job = jobs.claim_job(conn, "w1")
+
+    # skills are done; the job is cancelled before the JD row is written
+    job["state"]["parsed"] = {"skills": ["Python"], "domain": "", "seniority": "", "summary": ""}
+    with pool.writer() as conn:
+        jobs.cancel_job(conn, job_id)
+
+    # the failed checkpoint rolls back the JD insert it shares a transaction with
+    with pytest.raises(jobs.JobCancelled):
+        jobs.run_jd_job(pool, job, "w1")
+    with pool.reader() as conn:
+        assert get_jds(conn) == []
+        assert jobs.get_job(conn, job_id)["jd_id"] is None
+    pool.close()
+
+
+def test_retry_resumes_inside_a_partly_saved_chunk(tmp_path, monkeypatch):
+    calls = []
+    _fake_llm(monkeypatch, calls)
+    monkeypatch.setattr(jobs, "RETRY_BASE", 0.0)
+
+    cut = ["SQL"]
+
+    def questions(title, skills, num_questions=40, fallback=True):
+        calls.append(("questions", tuple(skills), num_questions))
+        for i in range(num_questions):
+            if i == 1 and skills[0] in cut:
+                cut.remove(skills[0])
+                raise jd_logic.LLMOutputError("stream cut off")
+            yield {"skill": skills[0], "qtype": "technical", "prompt": f"{skills[0]} {num_questions}/{i}?"}
+
+    monkeypatch.setattr(jd_logic, "stream_questions", questions)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Data Eng", "JD text", top_k=2, num_questions=6, mode="two_call")
+
+    jobs.run_one(pool, "w1")
+    with pool.reader() as conn:
+        job = jobs.get_job(conn, job_id)
+    assert job["status"] == "queued"
+    assert job["state"]["done_chunks"] == [0] and job["state"]["chunk_saved"] == 1
+    assert job["progress_done"] == 4
+
+    jobs.run_one(pool, "w2")
+    with pool.reader() as conn:
+        job = jobs.get_job(conn, job_id)
+        qs = get_questions_for_jd(conn, job["jd_id"])
+    assert job["status"] == "done" and job["progress_done"] == job["progress_total"] == 6
+    # only the two missing SQL questions were asked for again
+    assert calls[-1] == ("questions", ("SQL",), 2)
+    assert [q["prompt"] for q in qs] == ["Python 3/0?", "Python 3/1?", "Python 3/2?", "SQL 3/0?", "SQL 2/0?", "SQL 2/1?"]
+    pool.close()
+
+
+def test_job_waits_for_an_llm_client_without_using_attempts(tmp_path, monkeypatch):
+    calls = []
+    _fake_llm(monkeypatch, calls)
+    monkeypatch.setattr(llm_core, "LLM_CLIENT", None)
+    monkeypatch.setattr(llm_core, "configure_llm", lambda *a, **k: None)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Role", "JD text", num_questions=2, mode="two_call", max_attempts=1)
+    assert jobs.run_one(pool, "w1") is True
+    with pool.reader() as conn:
+        job = jobs.get_job(conn, job_id)
+        assert get_jds(conn) == []
+    assert job["status"] == "queued" and job["attempts"] == 0 and "not configured" in job["error"]
+    assert job["run_after"] > 0 and calls == []
+    pool.close()
+
+
+def test_last_attempt_never_saves_fallback_placeholders(tmp_path, monkeypatch):
+    monkeypatch.setattr(jd_logic, "_genai_generate", lambda prompt, **kwargs: "")
+    monkeypatch.setattr(jd_logic.telemetry, "emit", lambda rec: None)
+    pool = _pool(tmp_path)
+    with pool.writer() as conn:
+        job_id = jobs.enqueue_jd(conn, "Role", "JD text", num_questions=2, mode="two_call", max_attempts=1)
+    jobs.run_one(pool, "w1")
+    with pool.reader() as conn:
+        job = jobs.get_job(conn, job_id)
+        assert get_jds(conn) == []
+    assert job["status"] == "failed"
+    pool.close()
@@ -0,0 +1,46 @@
+# tests/test_json_stream.py
+import json
+from json_stream import JSONArrayStream, parse_array_prefix
+
+QUESTIONS = [
+    {"skill": "python", "qtype": "technical", "prompt": "Explain {braces} and [brackets]."},
+    {"skill": "sql", "qtype": "behavioral", "prompt": 'Say "hi" to the \\DBA'},
+    {"skill": "go", "qtype": "technical", "prompt": "Nested", "tags": [{"a": 1}]},
+]
+
+def test_yields_each_object_as_it_closes():
+    text = "Sure! Here you go:\n" + json.dumps(QUESTIONS) + "\nHope this helps."
+    parser = JSONArrayStream()
+    seen = []
+    for i in range(0, len(text), 7):
+        seen.extend(parser.feed(text[i:i + 7]))
+    assert seen == QUESTIONS
+    assert parser.done and not parser.truncated
+
+def test_item_available_before_array_closes():
+    parser = JSONArrayStream()
+    first = json.dumps(QUESTIONS[0])
+    assert parser.feed("[" + first[:-1]) == []
+    assert parser.feed("}, {") == [QUESTIONS[0]]
+
+def test_truncated_output_keeps_valid_prefix():
+    text = json.dumps(QUESTIONS)
+    cut = text[: text.index('"Nested"')]
+    assert parse_array_prefix(cut) == QUESTIONS[:2]
+    assert parse_array_prefix("no json here") is None
+
+def test_malformed_element_is_skipped():
+    parser = JSONArrayStream()
+    items = parser.feed('[{"a": 1}, {"b": tru}, {"c": 3}]')
+    assert items == [{"a": 1}, {"c": 3}]
+    assert parser.errors == 1
+
+def test_bracketed_prose_before_the_array_is_skipped():
+    text = "Here are the questions [Note: based on the JD]\n" + json.dumps(QUESTIONS)
+    parser = JSONArrayStream()
+    seen = []
+    for i in range(0, len(text), 5):
+        seen.extend(parser.feed(text[i:i + 5]))
+    assert seen == QUESTIONS and parser.done
+    assert parse_array_prefix("See [{oops}] below: " + json.dumps(QUESTIONS[:1])) == QUESTIONS[:1]
+    assert parse_array_prefix("[]") == []
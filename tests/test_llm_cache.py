@@ -0,0 +1,58 @@
+# tests/test_llm_cache.py
+from llm_cache import LLMCache, make_key
+
+def test_key_depends_on_all_params():
+    base = make_key("m", "p", 0.2, 100)
+    assert base == make_key("m", "p", 0.2, 100)
+    assert base != make_key("m2", "p", 0.2, 100)
+    assert base != make_key("m", "p", 0.3, 100)
+    assert base != make_key("m", "p", 0.2, 200)
+    schema = {"type": "object", "properties": {"skills": {"type": "array"}}}
+    json_mode = make_key("m", "p", 0.2, 100, response_mime_type="application/json", response_schema=schema)
+    assert json_mode != base
+    assert json_mode == make_key("m", "p", 0.2, 100, response_schema=schema, response_mime_type="application/json")
+    assert json_mode != make_key("m", "p", 0.2, 100, response_mime_type="application/json", response_schema={})
+
+def test_hit_miss_and_persistence(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = LLMCache(path)
+    key = make_key("m", "prompt", 0.2, 100)
+    assert cache.get(key) is None
+    cache.put(key, "answer")
+    assert cache.get(key) == "answer"
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+    # New instance has an empty memory tier but reads from SQLite
+    reopened = LLMCache(path)
+    assert reopened.get(key) == "answer"
+    assert reopened.stats()["memory_hits"] == 0
+
+def test_empty_response_not_cached(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"))
+    cache.put("k", "")
+    assert cache.get("k") is None
+
+def test_ttl_expiry(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), ttl=-1)
+    cache.put("k", "v")
+    assert cache.get("k") is None
+
+def test_size_bounded_eviction(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), max_entries=3, memory_entries=2)
+    for i in range(5):
+        cache.put(f"k{i}", f"v{i}")
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["memory_entries"] == 2
+    assert stats["evictions"] == 2
+
+def test_memory_hits_refresh_last_used_for_eviction(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put("hot", "v")
+    cache.put("cold", "v")
+    cache.conn.execute("UPDATE llm_cache SET last_used = 0 WHERE key = 'hot'")
+    assert cache.get("hot") == "v" and cache.stats()["memory_hits"] == 1
+    cache.put("new", "v")  # pending touches are written before evicting the LRU row
+    keys = {k for (k,) in cache.conn.execute("SELECT key FROM llm_cache")}
+    assert keys == {"hot", "new"}
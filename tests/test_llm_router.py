@@ -0,0 +1,96 @@
+# tests/test_llm_router.py
+import time
+
+import fake_gemini
+import llm_core
+import telemetry
+from llm_router import ModelRouter, Route
+
+
+class SequenceLatency:
+    """Latency i for the i-th call (last value repeats)."""
+
+    def __init__(self, *seconds):
+        self.seconds = list(seconds)
+        self.i = 0
+
+    def sample(self, rnd):
+        value = self.seconds[min(self.i, len(self.seconds) - 1)]
+        self.i += 1
+        return value
+
+
+def _warm(router, name, ms=20.0):
+    for _ in range(router.min_samples):
+        router.record(name, ms)
+
+
+def test_no_hedge_until_route_has_samples():
+    router = ModelRouter(routes={"r": Route("r")})
+    result, info = router.run(router.route("r"), lambda: "ok")
+    assert result == "ok" and info == {"hedged": 0, "hedge_won": 0}
+    assert router.stats()["r"]["calls"] == 1
+
+
+def test_slow_primary_is_hedged_and_hedge_wins():
+    router = ModelRouter(routes={"r": Route("r", hedge_min_ms=10)})
+    _warm(router, "r")
+    client = fake_gemini.FakeClient(latency=SequenceLatency(1.0, 0.01))
+    t0 = time.perf_counter()
+    resp, info = router.run(router.route("r"), lambda: client.models.generate_content(model="m", contents="hi"))
+    assert time.perf_counter() - t0 < 0.5
+    assert resp.text and info == {"hedged": 1, "hedge_won": 1}
+    stats = router.stats()["r"]
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    assert 10 <= stats["hedge_delay_ms"] < 1000
+
+
+def test_hedge_skipped_when_traffic_is_queueing():
+    router = ModelRouter(routes={"r": Route("r", hedge_min_ms=10)})
+    _warm(router, "r")
+    client = fake_gemini.FakeClient(latency=SequenceLatency(0.1, 0.0))
+    _, info = router.run(router.route("r"), lambda: client.models.generate_content(model="m", contents="hi"),
+                         can_hedge=lambda: False)
+    assert info["hedged"] == 0 and client.calls == 1
+
+
+def test_generate_uses_route_settings_and_records_hedge(monkeypatch):
+    seen = []
+    client = fake_gemini.FakeClient(latency=SequenceLatency(1.0, 0.01))
+    orig = client._respond
+    monkeypatch.setattr(client, "_respond", lambda model, contents, config: seen.append((model, config)) or orig(model, contents, config))
+    router = ModelRouter(routes={"answer": Route("answer", tier="fast", temperature=0.3, max_output_tokens=256,
+                                                 hedge_min_ms=10)},
+                         tiers={"fast": "tiny-model"})
+    _warm(router, "answer")
+    monkeypatch.setattr(llm_core, "LLM_CLIENT", client)
+    monkeypatch.setattr(llm_core, "ROUTER", router)
+    monkeypatch.setattr(llm_core, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm_core, "_gen_config", lambda t, m, schema=None, thinking=None: (t, m))
+    records = []
+    monkeypatch.setattr(telemetry, "emit", records.append)
+
+    with telemetry.llm_call("answer"):
+        text = llm_core._genai_generate("Explain caching.", route="answer")
+    assert text
+    assert seen[0] == ("tiny-model", (0.3, 256))
+    assert records[0]["hedged"] == 1 and records[0]["hedge_won"] == 1 and records[0]["model"] == "tiny-model"
+
+
+def test_explicit_model_overrides_tiers_and_thinking_is_capped(monkeypatch):
+    router = ModelRouter(routes={"skills": Route("skills", tier="fast", max_output_tokens=2048, thinking_budget=512)},
+                         tiers={"fast": "tiny-model"})
+    monkeypatch.setattr(llm_core, "ROUTER", router)
+    monkeypatch.setattr(llm_core, "LLM_MODEL", llm_core.DEFAULT_MODEL)
+    monkeypatch.setattr(llm_core, "MODEL_PINNED", False)
+    assert llm_core.model_for_route("skills") == "tiny-model"
+    assert llm_core.model_for_route("unrouted") == llm_core.DEFAULT_MODEL
+
+    monkeypatch.setattr(llm_core, "LLM_MODEL", "gemini-2.5-pro")
+    monkeypatch.setattr(llm_core, "MODEL_PINNED", True)  # sidebar / --model choice
+    assert llm_core.model_for_route("skills") == "gemini-2.5-pro"
+    r = router.route("skills")
+    assert llm_core._thinking_budget(r, "gemini-2.5-pro") == 512
+    assert llm_core._thinking_budget(r, "tiny-model") is None
+    fields = llm_core._config_fields(0.1, 2048, thinking_budget=512)
+    assert fields["thinking_config"] == {"thinking_budget": 512}
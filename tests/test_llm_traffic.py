@@ -0,0 +1,89 @@
+# tests/test_llm_traffic.py
+import pytest
+from llm_traffic import TrafficController, TokenBucket, CircuitOpenError, is_retryable, error_code
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+    def sleep(self, secs):
+        self.now += secs
+
+class APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"{code} error")
+        self.code = code
+
+def _controller(**kwargs):
+    clock = FakeClock()
+    tc = TrafficController(clock=clock, sleep=clock.sleep, **kwargs)
+    return tc, clock
+
+def test_error_classification():
+    assert error_code(APIError(429)) == 429
+    assert error_code(Exception("503 UNAVAILABLE")) == 503
+    assert is_retryable(APIError(429)) and not is_retryable(APIError(400))
+    assert is_retryable(Exception("RESOURCE_EXHAUSTED: quota"))
+
+def test_token_bucket_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)   # 1 per second
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.sleep(2)
+    assert bucket.wait_time(1) == 0.0
+
+def test_retries_with_backoff_then_succeeds():
+    tc, clock = _controller(max_retries=3)
+    attempts = []
+    def fn():
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise APIError(429)
+        return "ok"
+    assert tc.call(fn) == "ok"
+    stats = tc.stats()
+    assert stats["retries"] == 2 and stats["throttled"] == 2 and stats["ok"] == 1
+    assert stats["concurrency_limit"] < 4   # halved twice, then +1/limit
+
+def test_non_retryable_error_is_raised_immediately():
+    tc, _ = _controller()
+    calls = []
+    def fn():
+        calls.append(1)
+        raise APIError(400)
+    with pytest.raises(APIError):
+        tc.call(fn)
+    assert len(calls) == 1 and tc.stats()["circuit"] == "closed"
+
+def test_circuit_breaker_opens_and_recovers():
+    tc, clock = _controller(max_retries=0, breaker_threshold=2, breaker_cooldown=10)
+    def boom():
+        raise APIError(503)
+    for _ in range(2):
+        with pytest.raises(APIError):
+            tc.call(boom)
+    with pytest.raises(CircuitOpenError):
+        tc.call(lambda: "never")
+    clock.sleep(10)
+    assert tc.call(lambda: "ok") == "ok"    # half-open trial succeeds
+    assert tc.stats()["circuit"] == "closed"
+
+def test_aimd_increases_on_success():
+    tc, _ = _controller(initial_concurrency=2, max_concurrency=3)
+    for _ in range(20):
+        tc.call(lambda: None)
+    assert tc.stats()["concurrency_limit"] == 3
+
+def test_abandoned_stream_frees_slot():
+    tc, _ = _controller()
+    def stream():
+        with tc.slot(10):
+            yield "a"
+            yield "b"
+    gen = stream()
+    next(gen)
+    assert tc.stats()["in_flight"] == 1
+    gen.close()
+    assert tc.stats()["in_flight"] == 0
@@ -0,0 +1,129 @@
+# tests/test_pipeline.py
+import json
+import time
+import jd_logic as mod
+from db_skeleton import init_db, get_questions_for_jd, get_skills_for_jd
+
+def _fake_generate(prompt, **kwargs):
+    if "Extract the top" in prompt:
+        return json.dumps({"skills": ["python", "sql", "docker"], "domain": "Data",
+                           "seniority": "mid", "summary": "Do stuff"})
+    # make earlier skills finish last to exercise the ordering buffer
+    for delay, skill in ((0.05, "python"), (0.02, "sql"), (0.0, "docker")):
+        if f"skills to target are: {skill}" in prompt:
+            time.sleep(delay)
+            return json.dumps([{"skill": skill, "qtype": "technical", "prompt": f"Q about {skill}"}])
+    return ""
+
+def _patch_llm(monkeypatch, gen):
+    # skills come from one call, question chunks are streamed
+    monkeypatch.setattr(mod, "_genai_generate", gen)
+    monkeypatch.setattr(mod, "_genai_generate_stream", lambda prompt, **kwargs: (t for t in [gen(prompt, **kwargs)]))
+
+def test_pipeline_saves_in_skill_order(monkeypatch):
+    _patch_llm(monkeypatch, _fake_generate)
+    conn = init_db(":memory:")
+    progress = []
+    jd_id, parsed, questions, _ = mod.run_jd_pipeline(
+        conn, "Role", "jd text", num_questions=6, on_progress=lambda d, t: progress.append((d, t))
+    )
+    assert get_skills_for_jd(conn, jd_id) == ["python", "sql", "docker"]
+    stored = [q["skill"] for q in get_questions_for_jd(conn, jd_id)]
+    assert stored == ["python", "sql", "docker"]
+    assert [q["skill"] for q in questions] == stored
+    assert progress[-1] == (3, 3)
+
+def test_pipeline_chunk_fallback(monkeypatch):
+    def gen(prompt, **kwargs):
+        if "Extract the top" in prompt:
+            return '{"skills": ["terraform"], "domain": "", "seniority": "", "summary": ""}'
+        return "sorry cannot generate"
+    _patch_llm(monkeypatch, gen)
+    conn = init_db(":memory:")
+    jd_id, _, questions, _ = mod.run_jd_pipeline(conn, "SRE", "jd text")
+    assert questions and all("terraform" in q["prompt"] for q in questions)
+    assert len(get_questions_for_jd(conn, jd_id)) == len(questions)
+
+def test_split_question_budget():
+    assert mod._split_question_budget(["a", "b", "c"], 40) == [14, 13, 13]
+
+def test_generate_answer_stream_yields_chunks(monkeypatch):
+    monkeypatch.setattr(mod, "_genai_generate_stream", lambda prompt, **kwargs: (c for c in ["Use ", "STAR."]))
+    assert list(mod.generate_answer_stream("Tell me about a conflict.")) == ["Use ", "STAR."]
+
+def test_stream_questions_yields_progressively(monkeypatch):
+    chunks = ['Here: [{"skill": "a", "qtype": "t", "prompt": "Q1"}', ', {"skill": "a", "qtype": "t", "prom']
+    monkeypatch.setattr(mod, "_genai_generate_stream", lambda prompt, **kwargs: (c for c in chunks))
+    assert [q["prompt"] for q in mod.stream_questions("Role", ["a"])] == ["Q1"]
+
+def test_stream_questions_fallback(monkeypatch):
+    monkeypatch.setattr(mod, "_genai_generate_stream", lambda prompt, **kwargs: (c for c in ["nope"]))
+    out = list(mod.stream_questions("Role", ["terraform"]))
+    assert out and "terraform" in out[0]["prompt"]
+
+def test_pipeline_reuses_question_bank(monkeypatch):
+    conn = init_db(":memory:")
+    calls = []
+    def gen(prompt, **kwargs):
+        calls.append(prompt)
+        return _fake_generate(prompt, **kwargs)
+    _patch_llm(monkeypatch, gen)
+    mod.run_jd_pipeline(conn, "Role", "jd text", num_questions=3)
+    calls.clear()
+
+    # Same skills again: every chunk is served from the bank, only the skills call hits the LLM
+    jd_id, _, questions, stats = mod.run_jd_pipeline(conn, "Role 2", "jd text", num_questions=3)
+    assert len(calls) == 1
+    assert stats == {"reused": 3, "generated": 0, "reuse_ratio": 1.0}
+    assert [q["skill"] for q in get_questions_for_jd(conn, jd_id)] == ["python", "sql", "docker"]
+
+    # Larger budget: only the shortfall is generated
+    calls.clear()
+    _, _, _, stats = mod.run_jd_pipeline(conn, "Role 3", "jd text", num_questions=6)
+    assert stats["reused"] == 3 and stats["generated"] == 3
+    assert len(calls) == 4
+
+def test_generate_questions_with_bank_scopes_prompt(monkeypatch):
+    conn = init_db(":memory:")
+    jd_id = mod.db.save_jd(conn, "Old", "jd", ["python"])
+    mod.db.save_questions(conn, jd_id, [{"skill": "Python", "qtype": "technical", "prompt": "Explain decorators."}])
+    seen = []
+    def fake_questions(title, skills, num_questions=40):
+        seen.append((skills, num_questions))
+        return [{"skill": "sql", "qtype": "technical", "prompt": "Explain joins."}]
+    monkeypatch.setattr(mod, "call_llm_for_questions", fake_questions)
+    questions, stats = mod.generate_questions_with_bank(conn, "New", ["python", "sql"], num_questions=2)
+    assert seen == [(["sql"], 1)]
+    assert [q["prompt"] for q in questions] == ["Explain decorators.", "Explain joins."]
+    assert stats["reuse_ratio"] == 0.5
+
+def test_chunk_questions_saved_as_they_stream(tmp_path, monkeypatch):
+    import sqlite3
+    from db_pool import ConnectionPool
+    path = str(tmp_path / "jd.db")
+    init_db(path)
+    pool = ConnectionPool(path)
+    seen = []
+
+    def stream(prompt, **kwargs):
+        if "Extract the top" in prompt:
+            yield '{"skills": ["python"], "domain": "", "seniority": "", "summary": ""}'
+            return
+        yield '[{"skill": "python", "qtype": "technical", "prompt": "Q1"}, '
+        # the first question is stored before the rest of the stream arrives
+        reader = sqlite3.connect(path)
+        deadline = time.time() + 2
+        while not reader.execute("SELECT count(*) FROM questions").fetchone()[0] and time.time() < deadline:
+            time.sleep(0.01)
+        seen.append(reader.execute("SELECT prompt FROM questions").fetchall())
+        reader.close()
+        yield '{"skill": "python", "qtype": "technical", "prompt": "Q2"}]'
+
+    monkeypatch.setattr(mod, "_genai_generate", lambda prompt, **kwargs: "".join(stream(prompt)))
+    monkeypatch.setattr(mod, "_genai_generate_stream", stream)
+    jd_id, _, questions, stats = mod.run_jd_pipeline(pool, "Role", "jd text", num_questions=2)
+    assert seen == [[("Q1",)]]
+    with pool.reader() as conn:
+        assert [q["prompt"] for q in get_questions_for_jd(conn, jd_id)] == ["Q1", "Q2"]
+    assert stats["generated"] == 2
+    pool.close()
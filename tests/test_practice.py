@@ -0,0 +1,127 @@
+# tests/test_practice.py
+import time
+
+import db_skeleton as db
+import practice
+from db_skeleton import init_db, save_jd, save_questions, save_answer, delete_jd, migrate
+
+
+def _bank(conn):
+    a = save_jd(conn, "Backend", "JD", ["python", "sql"])
+    save_questions(conn, a, [
+        {"skill": "Python", "qtype": "technical", "prompt": "Explain the GIL."},
+        {"skill": "SQL", "qtype": "technical", "prompt": "What does an index cost on writes?"},
+        {"skill": "Python", "qtype": "behavioral", "prompt": "Tell me about a refactor you led."},
+    ])
+    b = save_jd(conn, "Data", "JD", ["spark"])
+    save_questions(conn, b, [{"skill": "Spark", "qtype": "technical", "prompt": "What is a shuffle?"}])
+    return a, b
+
+
+def test_sm2_intervals():
+    card = practice.Card(1, 1, "python", "technical")
+    now = 1000.0
+    card = practice.sm2(card, 4, now)
+    assert (card.reps, card.interval_days) == (1, 1.0)
+    card = practice.sm2(card, 4, now)
+    assert (card.reps, card.interval_days) == (2, 6.0)
+    card = practice.sm2(card, 5, now)
+    assert card.interval_days == round(6.0 * card.ease, 2) and card.ease > 2.5
+    failed = practice.sm2(card, 1, now)
+    assert failed.reps == 0 and failed.lapses == 1 and failed.ease == card.ease
+    assert failed.due == now + practice.RELEARN_DELAY
+    assert practice.sm2(practice.Card(1, 1, "", ""), 3, now).ease >= practice.MIN_EASE
+
+
+def test_reviews_created_for_new_and_existing_questions(tmp_path, monkeypatch):
+    conn = init_db(":memory:")
+    _bank(conn)
+    (n,) = conn.execute("SELECT count(*) FROM reviews").fetchone()
+    assert n == 4
+
+    # a database from before the reviews migration
+    monkeypatch.setattr(db, "MIGRATIONS", [m for m in db.MIGRATIONS if m[0] < 10])
+    old = init_db(str(tmp_path / "jd.db"))
+    jd_id = old.execute("INSERT INTO jds (title, jd_text, created_at) VALUES ('Role', 'JD', '2024-01-01T00:00:00')").lastrowid
+    old.executemany(
+        "INSERT INTO questions (jd_id, skill, qtype, prompt, created_at) VALUES (?, 'Go', 'technical', ?, '2024-01-01T00:00:00')",
+        [(jd_id, "Explain goroutines."), (jd_id, "What does a channel close do?")],
+    )
+    old.commit()
+    monkeypatch.undo()
+    migrate(old)
+    assert practice.counts(old, practice.Filter())["total"] == 2
+    assert practice.skills(old) == ["go"]
+
+
+def test_filters_and_due_order():
+    conn = init_db(":memory:")
+    a, b = _bank(conn)
+    sched = practice.Scheduler(conn)
+    now = time.time() + 1
+    assert [c.skill for c in sched.due(practice.make_filter(jd_id=a), now=now)] == ["python", "sql", "python"]
+    assert [c.skill for c in sched.due(practice.make_filter(skill=" Python ", qtype="technical"), now=now)] == ["python"]
+    assert [c.jd_id for c in sched.due(practice.make_filter(jd_id=b), now=now)] == [b]
+    assert practice.skills(conn, jd_id=a) == ["python", "sql"]
+
+
+def test_review_reschedules_and_persists():
+    conn = init_db(":memory:")
+    a, _ = _bank(conn)
+    sched = practice.Scheduler(conn)
+    f = practice.make_filter(jd_id=a)
+    now = time.time() + 1
+    first = sched.due(f, n=1, now=now)[0]
+    sched.review(first.question_id, 4, now=now)
+    assert first.question_id not in [c.question_id for c in sched.due(f, now=now)]
+    # the other loaded index sees the new due time too
+    assert first.question_id not in [c.question_id for c in sched.due(practice.Filter(), now=now)]
+    row = conn.execute("SELECT reps, interval_days, last_quality FROM reviews WHERE question_id = ?",
+                       (first.question_id,)).fetchone()
+    assert row == (1, 1.0, 4)
+    assert sched.next_due(f) <= now
+    # a fresh scheduler (new process) reads the persisted state
+    later = practice.Scheduler(conn).due(f, now=now + practice.DAY + 1)
+    assert first.question_id in [c.question_id for c in later]
+
+
+def test_new_questions_and_deletes_reach_the_index():
+    conn = init_db(":memory:")
+    a, b = _bank(conn)
+    sched = practice.Scheduler(conn)
+    db.WRITE_LISTENERS.append(sched.on_write)
+    try:
+        f = practice.Filter()
+        now = time.time() + 1
+        assert len(sched.due(f, now=now)) == 4
+        save_questions(conn, b, [{"skill": "Spark", "qtype": "technical", "prompt": "Explain lazy evaluation."}])
+        assert len(sched.due(f, now=now + 1)) == 5
+
+        session = practice.PracticeSession(sched, f, batch_size=10)
+        delete_jd(conn, a)
+        session.current(now=now + 1)
+        assert [q["jd_id"] for q in session.buffer] == [b, b]
+    finally:
+        db.WRITE_LISTENERS.remove(sched.on_write)
+
+
+def test_session_prefetches_batches_with_answers():
+    conn = init_db(":memory:")
+    a, _ = _bank(conn)
+    first_id = conn.execute("SELECT min(id) FROM questions").fetchone()[0]
+    save_answer(conn, first_id, "It serializes bytecode execution.")
+    sched = practice.Scheduler(conn)
+    session = practice.PracticeSession(sched, practice.Filter(), batch_size=2)
+    now = time.time() + 1
+
+    item = session.current(now=now)
+    assert item["id"] == first_id and item["answer"].startswith("It serializes")
+    assert len(session.buffer) == 2
+
+    seen = []
+    while (item := session.current(now=now)) is not None:
+        seen.append(item["id"])
+        session.grade(5, now=now)
+    assert len(seen) == len(set(seen)) == 4
+    assert session.reviewed == 4
+    assert session.scheduler.next_due(practice.Filter()) > now
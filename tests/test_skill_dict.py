@@ -0,0 +1,78 @@
+# tests/test_skill_dict.py
+from datetime import datetime
+
+import db_skeleton as db
+import skill_dict
+from db_skeleton import init_db, save_jd, save_questions, get_bank_questions, get_skills_for_jd, migrate
+
+
+def test_normalize():
+    assert skill_dict.normalize("  Python (programming) ") == "python"
+    assert skill_dict.normalize("Node.JS") == "node.js"
+    assert skill_dict.normalize("C++") == "c++"
+    assert skill_dict.normalize("scikit-learn!") == "scikit learn"
+    assert skill_dict.normalize(".NET") == ".net"
+    assert skill_dict.normalize(None) == ""
+
+
+def test_trie_prefix_match():
+    trie = skill_dict.Trie()
+    trie.insert("java", "java")
+    trie.insert("javascript", "javascript")
+    assert trie.get("java") == "java" and trie.get("jav") is None
+    assert trie.prefixes("javascript es6") == [(10, "javascript"), (4, "java")]
+    assert skill_dict.match("golang") == "go"
+    assert skill_dict.match("python 3.11") == "python"
+    assert skill_dict.match("k8s") == "kubernetes"
+    assert skill_dict.match("pythonic") is None
+
+
+def test_aliases_resolve_to_one_id():
+    conn = init_db(":memory:")
+    ids = {skill_dict.resolve(conn, s) for s in ["Python", "python3", "Python (programming)", "PY", "Python 3.12"]}
+    assert len(ids) == 1
+    assert skill_dict.resolve(conn, "Terraform") == skill_dict.resolve(conn, "terraform 1.5")
+    assert skill_dict.resolve(conn, "") is None
+    assert skill_dict.lookup(conn, "Rust") is None
+    # explicit aliases for names the normalizer cannot relate
+    sid = skill_dict.add_alias(conn, "Amazon DynamoDB", "dynamodb")
+    assert skill_dict.resolve(conn, "amazon dynamodb") == sid == skill_dict.lookup(conn, "DynamoDB")
+
+
+def test_rows_link_to_canonical_skills():
+    conn = init_db(":memory:")
+    a = save_jd(conn, "Backend", "JD", ["Python", "PostgreSQL"])
+    save_questions(conn, a, [{"skill": "Postgres", "qtype": "technical", "prompt": "How does MVCC work?"}])
+    # display text is kept as given
+    assert get_skills_for_jd(conn, a) == ["Python", "PostgreSQL"]
+    (n,) = conn.execute(
+        "SELECT count(*) FROM skills s JOIN questions q ON q.skill_id = s.skill_id WHERE s.jd_id = ?", (a,)
+    ).fetchone()
+    assert n == 1
+    # bank lookups go through the alias table and the integer index
+    assert [q["prompt"] for q in get_bank_questions(conn, "psql", 5)] == ["How does MVCC work?"]
+    plan = " ".join(r[-1] for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM questions WHERE skill_id = 1 AND canonical_id IS NULL ORDER BY id"
+    ))
+    assert "idx_questions_skill_id" in plan
+
+
+def test_migration_backfills_skill_ids(tmp_path, monkeypatch):
+    # a database from before the skill dictionary
+    monkeypatch.setattr(db, "MIGRATIONS", [m for m in db.MIGRATIONS if m[0] < 11])
+    conn = init_db(str(tmp_path / "jd.db"))
+    now = datetime.utcnow().isoformat()
+    jd_id = conn.execute("INSERT INTO jds (title, jd_text, created_at) VALUES ('Role', 'JD', ?)", (now,)).lastrowid
+    conn.executemany("INSERT INTO skills (jd_id, skill) VALUES (?, ?)", [(jd_id, "Golang"), (jd_id, "Go")])
+    conn.execute("INSERT INTO questions (jd_id, skill, qtype, prompt, created_at) VALUES (?, 'go (lang)', 'technical', 'Explain goroutines.', ?)",
+                 (jd_id, now))
+    conn.commit()
+    monkeypatch.undo()
+    migrate(conn)
+
+    ids = {r[0] for r in conn.execute("SELECT skill_id FROM skills UNION SELECT skill_id FROM questions")}
+    assert len(ids) == 1 and None not in ids
+    # "Golang" and "Go" in one JD count once
+    assert conn.execute("SELECT skill, jds FROM stats_skill_daily").fetchall() == [("go", 1)]
+    assert conn.execute("SELECT skill FROM reviews").fetchall() == [("go",)]
+    assert conn.execute("SELECT count(*) FROM sqlite_master WHERE name = 'idx_questions_skill_norm'").fetchone()[0] == 0
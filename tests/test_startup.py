@@ -0,0 +1,48 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+import types
+
+import llm_core
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_heavy_sdks_are_not_imported_at_module_load():
+    code = ("import sys, llm_core, doc_extract, jd_logic; "
+            "print(sorted(m for m in ('google.genai', 'PyPDF2', 'docx') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_configure_llm_reuses_client_until_key_changes(monkeypatch):
+    built = []
+
+    class Client:
+        def __init__(self, api_key):
+            built.append(api_key)
+
+    genai = types.ModuleType("google.genai")
+    genai.Client = Client
+    google = types.ModuleType("google")
+    google.genai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.genai", genai)
+    monkeypatch.setattr(llm_core, "LLM_CLIENT", None)
+    monkeypatch.setattr(llm_core, "_CLIENT_KEY", None)
+    monkeypatch.setattr(llm_core, "LLM_MODEL", llm_core.DEFAULT_MODEL)
+    monkeypatch.setattr(llm_core, "MODEL_PINNED", False)
+    monkeypatch.setenv("GEMINI_API_KEY", "k1")
+
+    first = llm_core.configure_llm()
+    assert llm_core.configure_llm() is first
+    assert llm_core.configure_llm(model="gemini-2.5-pro") is first
+    assert llm_core.LLM_MODEL == "gemini-2.5-pro" and llm_core.MODEL_PINNED
+    llm_core.configure_llm()  # no model: keeps the one chosen in the sidebar
+    assert llm_core.LLM_MODEL == "gemini-2.5-pro"
+    assert built == ["k1"]
+
+    monkeypatch.setenv("GEMINI_API_KEY", "k2")
+    assert llm_core.configure_llm() is not first
+    assert built == ["k1", "k2"]
@@ -0,0 +1,69 @@
+# tests/test_telemetry.py
+import contextvars
+import types
+import jd_logic
+import telemetry
+from db_skeleton import init_db, save_jd
+
+def test_llm_call_collects_fields_and_writer_persists(tmp_path, monkeypatch):
+    path = str(tmp_path / "m.db")
+    init_db(path)
+    writer = telemetry.MetricsWriter(path)
+    monkeypatch.setattr(telemetry, "get_writer", lambda path=None: writer)
+
+    with telemetry.llm_call("skills") as rec:
+        assert telemetry.current() is rec
+        rec.update(model="m", latency_ms=120.0, total_tokens=300, cache_status="miss", ok=1)
+        rec["parse_status"] = "fallback"
+    with telemetry.llm_call("skills") as rec:
+        rec.update(model="m", latency_ms=80.0, total_tokens=100, cache_status="hit", ok=1, parse_status="ok")
+    with telemetry.llm_call("questions"):
+        pass  # never reached the LLM: not recorded
+    assert telemetry.current() is None
+
+    writer.flush()
+    assert writer.written == 2
+
+    conn = init_db(path)
+    save_jd(conn, "Role", "JD", [])
+    (site,) = telemetry.summary(conn)
+    assert site["call_site"] == "skills" and site["calls"] == 2
+    assert site["p50_ms"] == 80.0 and site["p95_ms"] == 120.0
+    assert site["fallback_rate"] == 0.5 and site["cache_hit_rate"] == 0.5
+    assert telemetry.tokens_per_jd(conn) == 400
+    assert telemetry.daily_trends(conn)[0]["calls"] == 2
+
+def test_usage_from_response():
+    resp = types.SimpleNamespace(usage_metadata=types.SimpleNamespace(
+        prompt_token_count=10, candidates_token_count=5, total_token_count=15))
+    assert telemetry.usage_from_response(resp) == {"prompt_tokens": 10, "output_tokens": 5, "total_tokens": 15}
+    assert telemetry.usage_from_response(object()) == {}
+
+def test_stream_generators_do_not_hold_the_context(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(telemetry, "emit", emitted.append)
+
+    def fake_stream(prompt, rec=None, **kwargs):
+        rec.update(model="m", latency_ms=1.0)
+        yield "Use "
+        yield "STAR."
+    monkeypatch.setattr(jd_logic, "_genai_generate_stream", fake_stream)
+
+    gen = jd_logic.generate_answer_stream("Tell me about a conflict.")
+    assert next(gen) == "Use "
+    assert telemetry.current() is None  # nothing set between yields
+    # Streamlit may close the generator from another context
+    contextvars.copy_context().run(gen.close)
+    assert [r["call_site"] for r in emitted] == ["answer_stream"]
+
+def test_tokens_per_jd_counts_every_jd_call_site(tmp_path):
+    path = str(tmp_path / "m.db")
+    conn = init_db(path)
+    writer = telemetry.MetricsWriter(path)
+    for site, tokens in (("extract", 500), ("questions_stream", 300), ("skills", 100), ("answer", 1000)):
+        writer.record({"ts": telemetry.datetime.utcnow().isoformat(), "call_site": site, "total_tokens": tokens})
+    writer.flush()
+    save_jd(conn, "Role", "JD", [])
+    save_jd(conn, "Role 2", "JD", [])
+    # answers are not part of processing a JD
+    assert telemetry.tokens_per_jd(conn) == 450
@@ -1,6 +1,10 @@
 # ui_components.py
 import streamlit as st
+import db_skeleton as db
 import jd_logic as llm
+import llm_core
+import prompts
+from db_pool import write_conn
 
 def render_sidebar():
     """Renders the settings sidebar."""
@@ -24,15 +28,25 @@ def render_sidebar():
 
     st.sidebar.markdown("---")
 
-def render_question_card(q, index):
+@st.fragment
+def render_question_card(q, index, pool=None):
     """
     Renders a question card using native Streamlit containers 
     to allow for interactive buttons and state management.
+    Each card is a fragment: its buttons rerun only this card, not the page.
+    A stored answer (q["answer"]) is shown directly; answers generated here
+    are saved through pool when one is given.
     """
     # 1. Create unique keys for state management
     # Use database ID if available, otherwise fallback to index (for unsaved previews)
     q_id = q.get('id', f"new_{index}")
-    ans_key = f"answer_{q_id}"
+    # Near-duplicates share their canonical question's answer
+    ans_key = f"answer_{q.get('canonical_id') or q_id}"
+    answer_prompt = q.get('canonical_prompt') or q.get('prompt')
+    stored_answer = q.get('answer')
+    hidden_key = f"hidden_{ans_key}"
+    if stored_answer and ans_key not in st.session_state and not st.session_state.get(hidden_key):
+        st.session_state[ans_key] = stored_answer
     
     # 2. Visual Card Container
     with st.container(border=True):
@@ -70,7 +84,14 @@ def render_question_card(q, index):
             # Close Button to clear the answer from view
             if st.button("Close", key=f"close_{q_id}"):
                 del st.session_state[ans_key]
-                st.rerun()
+                st.session_state[hidden_key] = True
+                st.rerun(scope="fragment")
+
+        # Scenario A, closed: a stored answer exists but is hidden
+        elif stored_answer:
+            if st.button("Show Answer", key=f"show_{q_id}"):
+                st.session_state[hidden_key] = False
+                st.rerun(scope="fragment")
 
         # Scenario B: No answer yet (Show Generate Button)
         else:
@@ -78,17 +99,23 @@ def render_question_card(q, index):
                 # 1. Ensure connection
                 llm.configure_llm()
                 
-                # 2. Show loading spinner while generating
-                with st.spinner("Drafting a high-quality answer..."):
-                    try:
-                        # Call the logic layer
-                        answer = llm.generate_answer(q.get('prompt'))
-                        
-                        # Save result to session state
-                        st.session_state[ans_key] = answer
-                        
-                        # Reload to show the result (Scenario A)
-                        st.rerun()
-                        
-                    except Exception as e:
-                        st.error(f"Generation failed: {e}")
\ No newline at end of file
+                # 2. Stream tokens into the card as they arrive
+                st.markdown("---")
+                st.markdown("##### 💡 Sample Answer")
+                try:
+                    # Call the logic layer
+                    answer = st.write_stream(llm.generate_answer_stream(answer_prompt))
+                    if not isinstance(answer, str):
+                        answer = "".join(str(a) for a in answer)
+
+                    # Save result to session state; next rerun shows it via Scenario A
+                    st.session_state[ans_key] = answer
+                    if not answer.strip():
+                        st.error("⚠️ The LLM returned an empty response. Check your API Key and terminal logs.")
+                    elif pool is not None and 'id' in q:
+                        with write_conn(pool) as conn:
+                            db.save_answer(conn, q.get('canonical_id') or q['id'], answer,
+                                           llm_core.model_for_route("answer"), prompts.ANSWER_PROMPT_VERSION)
+
+                except Exception as e:
+                    st.error(f"Generation failed: {e}")
@@ -1,26 +1,144 @@
 # ui_views.py
+import time
 import streamlit as st
-import docx, PyPDF2
-import db_skeleton as db
+import db_cache
 import jd_logic as llm
+import doc_extract
+import telemetry
+import analytics
+import practice
+import llm_core
+import answer_prefetch
+import jobs
+from db_pool import read_conn, write_conn
 from ui_components import render_question_card
 
-def view_upload_jd(conn):
+JD_PAGE_SIZE = 50
+QUESTION_PAGE_SIZE = 10
+
+def _saved_jd_picker(pool):
+    """Title-filtered, keyset-paginated JD selectbox. Returns the selected JD id."""
+    title_filter = st.text_input("Filter by title", key="jd_title_filter")
+
+    # Stack of before_id cursors, one per page visited; reset when the filter changes
+    if st.session_state.get("jd_filter_seen") != title_filter:
+        st.session_state.jd_filter_seen = title_filter
+        st.session_state.jd_cursors = [None]
+    cursors = st.session_state.setdefault("jd_cursors", [None])
+
+    # fetch one extra row to know whether an older page exists
+    rows = db_cache.list_jds(pool, limit=JD_PAGE_SIZE + 1, before_id=cursors[-1], title_filter=title_filter)
+    has_older = len(rows) > JD_PAGE_SIZE
+    rows = rows[:JD_PAGE_SIZE]
+
+    if not rows:
+        st.info("No JDs saved yet." if not title_filter else "No JDs match this filter.")
+        return None
+
+    options = {f"{r['id']}: {r['title']}": r["id"] for r in rows}
+    sel = st.selectbox("Saved JDs", list(options.keys()))
+
+    c_newer, c_older = st.columns(2)
+    with c_newer:
+        if st.button("◀ Newer", key="jd_newer", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with c_older:
+        if st.button("Older ▶", key="jd_older", disabled=not has_older):
+            cursors.append(rows[-1]["id"])
+            st.rerun()
+
+    return options.get(sel)
+
+def _search_panel(pool):
+    """Full-text search over saved JDs and questions."""
+    query = st.text_input("🔎 Search JDs and questions", key="fts_query")
+    if not query.strip():
+        return
+    res = db_cache.search(pool, query, limit=20)
+    if not res["jds"] and not res["questions"]:
+        st.caption("No matches.")
+        return
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown(f"**JDs ({len(res['jds'])})**")
+        for r in res["jds"]:
+            st.markdown(f"`{r['id']}` **{r['title']}** — {r['snippet']}")
+    with c2:
+        st.markdown(f"**Questions ({len(res['questions'])})**")
+        for r in res["questions"]:
+            st.markdown(f"`JD {r['jd_id']}` {r['skill'] or 'General'} — {r['snippet']}")
+
+@st.fragment(run_every=2)
+def _jobs_panel(pool):
+    """Recent JD jobs with live progress; polls the queue without blocking the page."""
+    with read_conn(pool) as conn:
+        recent = jobs.list_jobs(conn, limit=5)
+    if not recent:
+        return
+
+    # A job finished since the last poll: reload the page once so the JD list
+    # shows it (cache dropped too, in case a separate worker process wrote it)
+    done_ids = {j["id"] for j in recent if j["status"] == "done"}
+    seen = st.session_state.setdefault("jobs_done_seen", done_ids)
+    if done_ids - seen:
+        st.session_state.jobs_done_seen = seen | done_ids
+        db_cache.invalidate()
+        st.rerun()
+
+    st.markdown("**Processing**")
+    for job in recent:
+        title = job["payload"].get("title", "Untitled")
+        if job["status"] in jobs.ACTIVE:
+            total = max(job["progress_total"], 1)
+            label = f"#{job['id']} {title}: {job['stage'] or 'queued'}"
+            if job["stage"] == "questions":
+                label += f" {job['progress_done']}/{job['progress_total']}"
+            if job["attempts"] > 1:
+                label += f" (attempt {job['attempts']}/{job['max_attempts']})"
+            c1, c2 = st.columns([5, 1])
+            with c1:
+                st.progress(job["progress_done"] / total, text=label)
+            with c2:
+                if st.button("Cancel", key=f"job_cancel_{job['id']}"):
+                    with write_conn(pool) as conn:
+                        jobs.cancel_job(conn, job["id"])
+        elif job["status"] == "done":
+            res = job["result"] or {}
+            reuse = res.get("reuse", {})
+            st.caption(f"#{job['id']} {title}: saved JD id={res.get('jd_id')} "
+                       f"({reuse.get('reused', 0)} of {res.get('questions', 0)} questions reused from the bank)")
+        else:
+            st.caption(f"#{job['id']} {title}: {job['status']}" + (f" — {job['error']}" if job["error"] else ""))
+
+def _prefetch_status(pool, jd_id):
+    """Background answer prefetch progress for a JD, with start / cancel controls."""
+    prefetcher = answer_prefetch.get_prefetcher()
+    status = prefetcher.status(jd_id)
+    if status is None or status["finished"]:
+        if st.button("Prefetch sample answers", key=f"prefetch_{jd_id}"):
+            queued = prefetcher.prefetch(pool, jd_id)
+            st.toast(f"Queued {queued} answers" if queued else "All answers already stored")
+        elif status is not None and not status["cancelled"]:
+            st.caption(f"Prefetched {status['done']} answers ({status['failed']} failed)")
+        return
+    total = max(status["total"], 1)
+    st.progress((status["done"] + status["failed"]) / total,
+                text=f"Prefetching answers: {status['done']}/{status['total']}")
+    if st.button("Cancel prefetch", key=f"prefetch_cancel_{jd_id}"):
+        prefetcher.cancel(jd_id)
+        st.rerun()
+
+def view_upload_jd(pool):
     st.header("Upload / Paste JD")
+    _search_panel(pool)
 
     col_left, spacer, col_right = st.columns([3, 0.2, 1])
 
     # --- Right Column: Saved JDs ---
     with col_right:
         st.subheader("Saved JDs")
-        jds = db.get_jds(conn)
-        selected_jd = None
-        if not jds:
-            st.info("No JDs saved yet.")
-        else:
-            options = {f"{r['id']}: {r['title']}": r for r in jds}
-            sel = st.selectbox("Saved JDs", list(options.keys()))
-            selected_jd = options.get(sel)
+        selected_id = _saved_jd_picker(pool)
 
     # --- Left Column: Form ---
     with col_left:
@@ -28,55 +146,39 @@ def view_upload_jd(conn):
         uploaded_file = st.file_uploader("Upload JD file (PDF, TXT, DOCX)", type=["pdf", "txt", "docx"])
         jd_text = st.text_area("Paste JD here", height=150)
         num_skills = st.slider("Top skills to extract", 4, 10, 6)
+        modes = {"two_call": "Two calls (reuses question bank)", "single": "Single call (skills + questions together)"}
+        mode = st.selectbox("Extraction", list(modes), format_func=modes.get,
+                            index=list(modes).index(llm.EXTRACTION_MODE) if llm.EXTRACTION_MODE in modes else 0)
+        prefetch_answers = st.checkbox("Prefetch sample answers in background", value=False)
 
         # File Parsing Logic
         if uploaded_file:
             try:
-                ext = uploaded_file.name.split(".")[-1].lower()
-                if ext == "txt":
-                    jd_text = uploaded_file.read().decode("utf-8", errors="ignore")
-                elif ext == "pdf":
-                    reader = PyPDF2.PdfReader(uploaded_file)
-                    jd_text = "\n".join([page.extract_text() or "" for page in reader.pages])
-                elif ext == "docx":
-                    doc = docx.Document(uploaded_file)
-                    jd_text = "\n".join([p.text for p in doc.paragraphs])
+                extracted = doc_extract.extract_text(uploaded_file.name, uploaded_file.getvalue())
+                jd_text = extracted.text
+                if extracted.truncated:
+                    st.warning("Only part of the file was read (" + "; ".join(extracted.notes) + ").")
             except Exception as e:
                 st.error(f"Failed to extract text: {e}")
 
-        # Extraction Logic
+        # Extraction runs in the background job queue; this rerun only enqueues
         if st.button("Extract & Save", key="extract_save"):
             if not jd_text.strip():
                 st.warning("Please paste a job description first.")
                 return
 
             llm.configure_llm() # Ensure Client is ready
+            with write_conn(pool) as conn:
+                job_id = jobs.enqueue_jd(conn, title or "Untitled", jd_text, top_k=num_skills,
+                                         prefetch_answers=prefetch_answers, mode=mode)
+            st.toast(f"Queued JD job #{job_id}")
 
-            try:
-                with st.spinner("Extracting skills..."):
-                    parsed = llm.call_llm_for_skills(jd_text, top_k=num_skills)
-                
-                jd_id = db.save_jd(
-                    conn, 
-                    title or "Untitled", 
-                    jd_text, 
-                    parsed.get("skills", []), 
-                    parsed.get("domain", ""), 
-                    parsed.get("seniority", ""), 
-                    parsed.get("summary", "")
-                )
-                
-                with st.spinner("Generating questions..."):
-                    questions = llm.call_llm_for_questions(title or "Untitled", parsed.get("skills", []))
-                
-                db.save_questions(conn, jd_id, questions)
-                st.success(f"Saved JD id={jd_id}")
-                st.rerun()
-                
-            except Exception as e:
-                st.error(f"Process failed: {e}")
+        _jobs_panel(pool)
 
-        # View Logic (Saved JD)
+        # View Logic (Saved JD): full row is only loaded for the selected JD
+        selected_jd = None
+        if selected_id is not None:
+            selected_jd = db_cache.get_jd(pool, selected_id)
         if selected_jd:
             st.markdown("---")
             st.subheader(f"Viewing Saved JD: {selected_jd['title']}")
@@ -86,16 +188,191 @@ def view_upload_jd(conn):
             with c3: st.write(f"**Date:** {selected_jd.get('created_at', '')[:10]}")
             st.write(f"**Summary:** {selected_jd.get('summary', '')}")
 
-            qlist = db.get_questions_for_jd(conn, selected_jd["id"])
-            if qlist:
-                st.subheader(f"Questions ({len(qlist)})")
-                for i, q in enumerate(qlist, 1):
-                    render_question_card(q, i)
+            _prefetch_status(pool, selected_jd["id"])
+
+            total = db_cache.count_questions_for_jd(pool, selected_jd["id"])
+            if total:
+                st.subheader(f"Questions ({total})")
+                pages = (total + QUESTION_PAGE_SIZE - 1) // QUESTION_PAGE_SIZE
+                page = 1
+                if pages > 1:
+                    page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                                           key=f"qpage_{selected_jd['id']}")
+                offset = (page - 1) * QUESTION_PAGE_SIZE
+                qlist = db_cache.get_questions_for_jd(pool, selected_jd["id"], limit=QUESTION_PAGE_SIZE, offset=offset)
+                # one query for the whole page's stored answers
+                answers = db_cache.get_answers(pool, [q["canonical_id"] or q["id"] for q in qlist])
+                for i, q in enumerate(qlist, offset + 1):
+                    stored = answers.get(q["canonical_id"] or q["id"])
+                    if stored:
+                        q["answer"] = stored["answer"]
+                    render_question_card(q, i, pool)
+
+def _fmt_wait(seconds):
+    if seconds < 3600:
+        return f"{max(1, round(seconds / 60))}m"
+    if seconds < practice.DAY:
+        return f"{round(seconds / 3600)}h"
+    return f"{round(seconds / practice.DAY)}d"
 
-def view_practice(conn):
+def view_practice(pool):
     st.header("Practice")
-    st.info("Practice UI: TODO - implement session flow")
 
-def view_dashboard(conn):
+    jds = db_cache.list_jd_titles(pool)  # every JD, not one page of the JD list
+    jd_options = {"All JDs": None}
+    jd_options.update({f"{r['id']}: {r['title']}": r["id"] for r in jds})
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        jd_id = jd_options[st.selectbox("JD", list(jd_options), key="practice_jd")]
+    with read_conn(pool) as conn:
+        skill_options = ["All skills"] + practice.skills(conn, jd_id)
+    with c2:
+        skill = st.selectbox("Skill", skill_options, key="practice_skill")
+    with c3:
+        qtype = st.selectbox("Type", ["All types", "technical", "behavioral"], key="practice_qtype")
+    f = practice.make_filter(jd_id, None if skill == "All skills" else skill, None if qtype == "All types" else qtype)
+
+    session = st.session_state.get("practice_session")
+    if session is None or session.filter != f:
+        session = st.session_state.practice_session = practice.PracticeSession(practice.get_scheduler(pool), f)
+
+    with read_conn(pool) as conn:
+        counts = practice.counts(conn, f)
+    m1, m2, m3 = st.columns(3)
+    with m1: st.metric("Due now", counts["due"])
+    with m2: st.metric("Not yet practiced", counts["new"])
+    with m3: st.metric("Reviewed this session", session.reviewed)
+
+    item = session.current()
+    if item is None:
+        next_due = session.scheduler.next_due(f)
+        if next_due is None:
+            st.info("No questions match these filters yet.")
+        else:
+            st.success(f"All caught up. Next card due in {_fmt_wait(next_due - time.time())}.")
+        return
+
+    render_question_card(item, session.reviewed + 1, pool)
+    now = time.time()
+    cols = st.columns(len(practice.GRADES) + 1)
+    for col, (label, quality) in zip(cols, practice.GRADES.items()):
+        wait = practice.sm2(item["card"], quality, now).due - now
+        with col:
+            if st.button(f"{label} · {_fmt_wait(wait)}", key=f"grade_{label}", use_container_width=True):
+                session.grade(quality)
+                st.rerun()
+    with cols[-1]:
+        if st.button("Skip", key="practice_skip", use_container_width=True):
+            session.skip()
+            st.rerun()
+
+def view_dashboard(pool):
     st.header("Dashboard")
-    st.info("Dashboard: TODO - implement metrics")
\ No newline at end of file
+
+    days = st.selectbox("Window", [1, 7, 30, 90], index=1, format_func=lambda d: f"Last {d} days")
+    with read_conn(pool) as conn:
+        sites = telemetry.summary(conn, days=days)
+        per_jd = telemetry.tokens_per_jd(conn, days=days)
+        trends = telemetry.daily_trends(conn, days=days)
+        bank = analytics.totals(conn, days=days)
+        top_skills = analytics.skill_frequency(conn, days=days, limit=15)
+        skill_trends = analytics.skill_trends(conn, days=days, top=5)
+        per_skill = analytics.questions_per_skill(conn, days=days, limit=15)
+        domains = analytics.domain_distribution(conn, days=days)
+        seniority = analytics.seniority_distribution(conn, days=days)
+
+    st.subheader("Question bank")
+    b1, b2, b3 = st.columns(3)
+    with b1: st.metric("JDs", bank["jds"])
+    with b2: st.metric("Questions", bank["questions"])
+    with b3: st.metric("Distinct skills", bank["skills"])
+    if top_skills:
+        st.caption("Most requested skills (JDs)")
+        st.bar_chart({r["skill"]: r["jds"] for r in top_skills})
+        if len(skill_trends) > 1:
+            st.caption("Top skills per day (JDs)")
+            st.line_chart(skill_trends)
+        st.caption("Questions per skill")
+        st.bar_chart({r["skill"]: {"technical": r["technical"], "behavioral": r["behavioral"]} for r in per_skill})
+        d1, d2 = st.columns(2)
+        with d1:
+            st.caption("Domains")
+            st.dataframe(domains, use_container_width=True, hide_index=True)
+        with d2:
+            st.caption("Seniority")
+            st.dataframe(seniority, use_container_width=True, hide_index=True)
+
+    st.subheader("Traffic control (this process)")
+    traffic = llm_core.TRAFFIC.stats()
+    t1, t2, t3, t4, t5 = st.columns(5)
+    with t1: st.metric("In flight", traffic["in_flight"])
+    with t2: st.metric("Queued", traffic["queue_depth"])
+    with t3: st.metric("Concurrency limit", traffic["concurrency_limit"])
+    with t4: st.metric("Throttled / retries", f"{traffic['throttled']} / {traffic['retries']}")
+    with t5: st.metric("Circuit", traffic["circuit"])
+
+    routes = llm_core.ROUTER.stats()
+    if routes:
+        st.caption("Model routes (this process)")
+        st.dataframe(
+            [
+                {
+                    "Route": name,
+                    "Calls": r["calls"],
+                    "p50 (ms)": round(r["p50_ms"]),
+                    "p95 (ms)": round(r["p95_ms"]),
+                    "Hedge delay (ms)": round(r["hedge_delay_ms"]) if r["hedge_delay_ms"] is not None else "warming up",
+                    "Hedged": r["hedged"],
+                    "Hedge wins": r["hedge_wins"],
+                    "Errors": r["errors"],
+                }
+                for name, r in routes.items()
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    st.subheader("LLM calls")
+    if not sites:
+        st.info("No LLM calls recorded in this window yet.")
+        return
+
+    c1, c2, c3 = st.columns(3)
+    total_calls = sum(s["calls"] for s in sites)
+    with c1: st.metric("Calls", total_calls)
+    with c2: st.metric("Tokens per JD", f"{per_jd:,.0f}")
+    with c3: st.metric("Cache hit rate", f"{sum(s['cache_hit_rate'] * s['calls'] for s in sites) / total_calls:.0%}")
+
+    st.dataframe(
+        [
+            {
+                "Call site": s["call_site"],
+                "Calls": s["calls"],
+                "p50 (ms)": round(s["p50_ms"]),
+                "p95 (ms)": round(s["p95_ms"]),
+                "Avg tokens": round(s["avg_tokens"]),
+                "Fallback rate": f"{s['fallback_rate']:.0%}",
+                "Cache hits": f"{s['cache_hit_rate']:.0%}",
+                "Errors": f"{s['error_rate']:.0%}",
+                "Hedged": f"{s['hedge_rate']:.0%}",
+                "Hedge wins": f"{s['hedge_win_rate']:.0%}",
+            }
+            for s in sites
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    if trends:
+        st.subheader("Trends")
+        def _pivot(field):
+            table = {}
+            for r in trends:
+                table.setdefault(r["day"], {})[r["call_site"]] = r[field] or 0
+            return table
+        st.caption("Average latency (ms) per day")
+        st.line_chart(_pivot("avg_latency_ms"))
+        st.caption("Tokens per day")
+        st.bar_chart(_pivot("tokens"))
+        st.caption("Fallbacks per day")
+        st.bar_chart(_pivot("fallbacks"))
\ No newline at end of file